@@ -0,0 +1,202 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache for the results of idempotent actions."""
+
+import copy
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Dict, Optional, Tuple
+
+from nemoguardrails.actions.actions import ActionCacheOptions, ActionResult
+from nemoguardrails.server.datastore.datastore import DataStore
+from nemoguardrails.utils import new_uuid
+
+log = logging.getLogger(__name__)
+
+# The parameters that are never used in the default cache key, as they change
+# with every call.
+EXCLUDED_KEY_PARAMS = ["events", "state"]
+
+_JSON_TYPES = (str, int, float, bool, type(None), list, dict)
+
+
+def _get_param_value(params: Dict[str, Any], path: str) -> Any:
+    """Returns the value of a parameter, using a dotted path for nested values."""
+    value = params
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _encode(value: Any) -> str:
+    """Encodes a result to be saved in a data store."""
+    if isinstance(value, ActionResult):
+        return json.dumps({"action_result": asdict(value)})
+    return json.dumps({"value": value})
+
+
+def _decode(value: str) -> Any:
+    """Decodes a result loaded from a data store."""
+    data = json.loads(value)
+    if "action_result" in data:
+        return ActionResult(**data["action_result"])
+    return data["value"]
+
+
+def _refresh_events(result: Any) -> Any:
+    """Assigns new unique ids to the events returned by a cached result."""
+    if isinstance(result, ActionResult) and result.events:
+        for event in result.events:
+            if isinstance(event, dict) and "uid" in event:
+                event["uid"] = new_uuid()
+    return result
+
+
+class ActionResultCache:
+    """A cache for the results of the actions declared using `@action(cache=...)`.
+
+    The results are kept in memory, in LRU order, up to `max_size` entries per action
+    and, if a `ttl` is set, for at most `ttl` seconds.
+
+    If a `DataStore` is provided, the results are saved there instead, so that they can
+    be shared between multiple processes. In this case, the results must be JSON
+    serializable, and the eviction is left to the data store.
+    """
+
+    def __init__(
+        self,
+        datastore: Optional[DataStore] = None,
+        key_prefix: str = "action_cache:",
+        enabled: bool = True,
+    ):
+        """Constructor.
+
+        Args:
+            datastore: [Optional] An external data store where the results are saved.
+            key_prefix: The prefix for the keys saved in the data store.
+            enabled: Whether the results should be cached.
+        """
+        self.datastore = datastore
+        self.key_prefix = key_prefix
+        self.enabled = enabled
+
+        # Dict[action_name, OrderedDict[key, (expires_at, result)]]
+        self._entries: Dict[str, OrderedDict] = {}
+
+        # Dict[action_name, {"hits": int, "misses": int}]
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def get_key(
+        action_name: str, params: Dict[str, Any], options: ActionCacheOptions
+    ) -> str:
+        """Computes the cache key for an action call.
+
+        If `options.key_params` is set, only the specified parameters are used,
+        otherwise all the parameters with JSON values are used, except `events`
+        and `state`.
+        """
+        if options.key_params is not None:
+            values = {
+                path: _get_param_value(params, path) for path in options.key_params
+            }
+        else:
+            values = {
+                k: v
+                for k, v in params.items()
+                if k not in EXCLUDED_KEY_PARAMS and isinstance(v, _JSON_TYPES)
+            }
+
+        data = json.dumps([action_name, values], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _record(self, action_name: str, hit: bool):
+        stats = self.stats.setdefault(action_name, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+    async def get(
+        self, action_name: str, key: str, options: ActionCacheOptions
+    ) -> Tuple[bool, Any]:
+        """Looks up the result of an action call.
+
+        Returns:
+            A tuple with a flag indicating if the result was found and the result.
+        """
+        found, result = False, None
+
+        if self.datastore is not None:
+            value = await self.datastore.get(self.key_prefix + key)
+            if value is not None:
+                expires_at, encoded = json.loads(value)
+                if expires_at is None or expires_at >= time.time():
+                    found, result = True, _decode(encoded)
+        else:
+            entries = self._entries.get(action_name)
+            if entries is not None and key in entries:
+                expires_at, value = entries[key]
+                if expires_at is not None and expires_at < time.monotonic():
+                    del entries[key]
+                else:
+                    entries.move_to_end(key)
+                    found, result = True, copy.deepcopy(value)
+
+        self._record(action_name, found)
+        if found:
+            log.info(f"Using cached result for action: {action_name}")
+            result = _refresh_events(result)
+
+        return found, result
+
+    async def set(
+        self, action_name: str, key: str, result: Any, options: ActionCacheOptions
+    ):
+        """Saves the result of an action call."""
+        if self.datastore is not None:
+            expires_at = time.time() + options.ttl if options.ttl is not None else None
+            try:
+                value = json.dumps([expires_at, _encode(result)])
+            except (TypeError, ValueError):
+                log.warning(
+                    f"The result of action '{action_name}' is not JSON serializable "
+                    f"and can't be cached."
+                )
+                return
+
+            await self.datastore.set(self.key_prefix + key, value)
+            return
+
+        expires_at = time.monotonic() + options.ttl if options.ttl is not None else None
+        entries = self._entries.setdefault(action_name, OrderedDict())
+        entries[key] = (expires_at, copy.deepcopy(result))
+        entries.move_to_end(key)
+
+        while len(entries) > options.max_size:
+            entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns the number of hits and misses for each cached action."""
+        return copy.deepcopy(self.stats)
+
+    def clear(self):
+        """Removes all the in-memory results and resets the stats."""
+        self._entries = {}
+        self.stats = {}
@@ -15,28 +15,43 @@
 
 """Module for the calling proper action endpoints based on events received at action server endpoint"""
 
+import asyncio
+import contextvars
+import functools
 import importlib.util
 import inspect
 import logging
 import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from langchain.chains.base import Chain
 from langchain_core.runnables import Runnable
 
+from nemoguardrails.actions.action_cache import ActionResultCache
 from nemoguardrails.actions.llm.utils import LLMCallException
 from nemoguardrails.logging.callbacks import logging_callbacks
 
 log = logging.getLogger(__name__)
 
 
+class _ActionTimeoutError(Exception):
+    """Wraps a `TimeoutError` raised by an action itself, so that it is not mistaken
+    for the expiration of the action's timeout."""
+
+
 class ActionDispatcher:
     def __init__(
         self,
         load_all_actions: bool = True,
         config_path: Optional[str] = None,
         import_paths: Optional[List[str]] = None,
+        offload_sync_actions: bool = False,
+        thread_pool_max_workers: Optional[int] = None,
+        process_pool_max_workers: Optional[int] = None,
+        action_cache: Optional[ActionResultCache] = None,
     ):
         """
         Initializes an actions dispatcher.
@@ -47,11 +62,35 @@ class ActionDispatcher:
                 If there are actions at the specified path, it loads them as well.
             import_paths (List[str], optional): Additional imported paths from which actions
                 should be loaded.
+            offload_sync_actions (bool, optional): Whether all synchronous actions should
+                be executed in a thread pool, so that they don't block the event loop.
+                Otherwise, only the actions marked with `@action(blocking=True)` are.
+            thread_pool_max_workers (int, optional): The maximum number of threads used
+                for synchronous actions.
+            process_pool_max_workers (int, optional): The maximum number of processes used
+                for CPU-bound actions.
+            action_cache (ActionResultCache, optional): The cache used for the results of
+                the actions declared using `@action(cache=...)`. If not set, the results
+                are not cached.
         """
         log.info("Initializing action dispatcher")
 
         self._registered_actions = {}
 
+        # The executors for synchronous actions are created lazily, when first needed.
+        self._offload_sync_actions = offload_sync_actions
+        self._thread_pool_max_workers = thread_pool_max_workers
+        self._process_pool_max_workers = process_pool_max_workers
+        self._thread_pool = None
+        self._process_pool = None
+
+        self.action_cache = action_cache or ActionResultCache(enabled=False)
+
+        # The semaphores for the actions that have a `max_concurrency` limit, for every
+        # event loop (as they can't be shared between event loops).
+        # Dict[loop, Dict[action_name, Semaphore]]
+        self._action_semaphores = weakref.WeakKeyDictionary()
+
         if load_all_actions:
             # TODO: check for better way to find actions dir path or use constants.py
             current_file_path = Path(__file__).resolve()
@@ -164,11 +203,112 @@ class ActionDispatcher:
         """
         return self._registered_actions.get(name)
 
+    async def _run_sync(self, fn: Callable, action_meta: dict, *args, **kwargs):
+        """Runs a synchronous function without blocking the event loop.
+
+        CPU-bound actions are executed in a process pool. The blocking actions (or all
+        of them, if `offload_sync_actions` is set) are executed in a thread pool, with a
+        copy of the current context (so that context variables are available).
+        """
+        loop = asyncio.get_running_loop()
+
+        if action_meta.get("cpu_bound"):
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self._process_pool_max_workers
+                )
+            return await loop.run_in_executor(
+                self._process_pool, functools.partial(fn, *args, **kwargs)
+            )
+
+        if not (self._offload_sync_actions or action_meta.get("blocking")):
+            return fn(*args, **kwargs)
+
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self._thread_pool_max_workers,
+                thread_name_prefix="nemoguardrails-actions",
+            )
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._thread_pool, functools.partial(context.run, fn, *args, **kwargs)
+        )
+
+    def _get_semaphore(
+        self, action_name: str, max_concurrency: int
+    ) -> asyncio.Semaphore:
+        """Returns the semaphore of an action for the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphores = self._action_semaphores.setdefault(loop, {})
+        if action_name not in semaphores:
+            semaphores[action_name] = asyncio.Semaphore(max_concurrency)
+
+        return semaphores[action_name]
+
+    async def _execute_wrapping_timeout(
+        self, fn: Any, params: Dict[str, Any], action_meta: dict
+    ) -> Union[str, Dict[str, Any]]:
+        """Executes an action, wrapping the `TimeoutError` it raises itself."""
+        try:
+            return await self._execute(fn, params, action_meta)
+        except asyncio.TimeoutError as e:
+            raise _ActionTimeoutError() from e
+
+    async def _execute(
+        self, fn: Any, params: Dict[str, Any], action_meta: dict
+    ) -> Union[str, Dict[str, Any]]:
+        """Executes an action, according to its type."""
+        # We support both functions and classes as actions
+        if inspect.isfunction(fn) or inspect.ismethod(fn):
+            # We support both sync and async actions.
+            if inspect.iscoroutinefunction(fn):
+                result = await fn(**params)
+            else:
+                result = await self._run_sync(fn, action_meta, **params)
+
+                # Synchronous functions can also return a coroutine.
+                if inspect.iscoroutine(result):
+                    result = await result
+
+        elif isinstance(fn, Chain):
+            try:
+                chain = fn
+
+                # For chains with only one output key, we use the `arun` function
+                # to return directly the result.
+                if len(chain.output_keys) == 1:
+                    result = await chain.arun(**params, callbacks=logging_callbacks)
+                else:
+                    # Otherwise, we return the dict with the output keys.
+                    result = await chain.acall(
+                        inputs=params,
+                        return_only_outputs=True,
+                        callbacks=logging_callbacks,
+                    )
+            except NotImplementedError:
+                # Not ideal, but for now we fall back to sync execution
+                # if the async is not available
+                result = await self._run_sync(fn.run, action_meta, **params)
+        elif isinstance(fn, Runnable):
+            # If it's a Runnable, we invoke it as well
+            runnable = fn
+
+            result = await runnable.ainvoke(input=params)
+        else:
+            # TODO: there should be a common base class here
+            result = await self._run_sync(fn.run, action_meta, **params)
+
+        return result
+
     async def execute_action(
         self, action_name: str, params: Dict[str, Any]
     ) -> Tuple[Union[str, Dict[str, Any]], str]:
         """Execute a registered action.
 
+        Synchronous actions are executed in a thread pool (or a process pool, for
+        CPU-bound actions). The `timeout`, `max_concurrency` and `cache` options declared
+        using the `@action` decorator are also handled here.
+
         Args:
             action_name (str): The name of the action to execute.
             params (Dict[str, Any]): Parameters for the action.
@@ -188,54 +328,65 @@ class ActionDispatcher:
                 self._registered_actions[action_name] = fn
 
             if fn is not None:
+                action_meta = getattr(fn, "action_meta", None) or {}
+
+                cache_options = action_meta.get("cache")
+                if not self.action_cache.enabled:
+                    cache_options = None
+
+                if cache_options is not None:
+                    cache_key = self.action_cache.get_key(
+                        action_name, params, cache_options
+                    )
+                    found, result = await self.action_cache.get(
+                        action_name, cache_key, cache_options
+                    )
+                    if found:
+                        return result, "success"
+
+                semaphore = None
+                if action_meta.get("max_concurrency"):
+                    semaphore = self._get_semaphore(
+                        action_name, action_meta["max_concurrency"]
+                    )
+
+                # The semaphore is acquired before the `try`, so that it is released
+                # only if it was acquired (e.g., not if the task is cancelled while
+                # waiting for it).
+                if semaphore:
+                    await semaphore.acquire()
+
+                timeout = action_meta.get("timeout")
                 try:
-                    # We support both functions and classes as actions
-                    if inspect.isfunction(fn) or inspect.ismethod(fn):
-                        # We support both sync and async actions.
-                        result = fn(**params)
-                        if inspect.iscoroutine(result):
-                            result = await result
-                        else:
-                            log.warning(
-                                f"Synchronous action `{action_name}` has been called."
-                            )
-
-                    elif isinstance(fn, Chain):
-                        try:
-                            chain = fn
-
-                            # For chains with only one output key, we use the `arun` function
-                            # to return directly the result.
-                            if len(chain.output_keys) == 1:
-                                result = await chain.arun(
-                                    **params, callbacks=logging_callbacks
-                                )
-                            else:
-                                # Otherwise, we return the dict with the output keys.
-                                result = await chain.acall(
-                                    inputs=params,
-                                    return_only_outputs=True,
-                                    callbacks=logging_callbacks,
-                                )
-                        except NotImplementedError:
-                            # Not ideal, but for now we fall back to sync execution
-                            # if the async is not available
-                            result = fn.run(**params)
-                    elif isinstance(fn, Runnable):
-                        # If it's a Runnable, we invoke it as well
-                        runnable = fn
-
-                        result = await runnable.ainvoke(input=params)
+                    execution = self._execute_wrapping_timeout(fn, params, action_meta)
+                    if timeout is not None:
+                        result = await asyncio.wait_for(execution, timeout=timeout)
                     else:
-                        # TODO: there should be a common base class here
-                        result = fn.run(**params)
+                        result = await execution
+
+                    if cache_options is not None:
+                        await self.action_cache.set(
+                            action_name, cache_key, result, cache_options
+                        )
+
                     return result, "success"
 
                 # We forward LLM Call exceptions
                 except LLMCallException as e:
                     raise e
 
+                # Only raised when the timeout expires, as the `TimeoutError` raised
+                # by the action itself is wrapped.
+                except asyncio.TimeoutError:
+                    log.warning(
+                        "Action '%s' timed out after %s seconds.",
+                        action_name,
+                        timeout,
+                    )
+
                 except Exception as e:
+                    if isinstance(e, _ActionTimeoutError):
+                        e = e.__cause__
                     filtered_params = {
                         k: v
                         for k, v in params.items()
@@ -249,6 +400,10 @@ class ActionDispatcher:
                     )
                     log.exception(e)
 
+                finally:
+                    if semaphore:
+                        semaphore.release()
+
         return None, "failed"
 
     def get_registered_actions(self) -> List[str]:
@@ -342,12 +497,23 @@ class ActionDispatcher:
         return action_objects
 
 
+# The root folder of the package, for the built-in actions.
+_PACKAGE_PATH = Path(__file__).resolve().parents[1]
+
+
 def is_action_file(filepath):
     """Heuristics for determining if a Python file can have actions or not.
 
-    Currently, it only excludes the `__init__.py files.
+    Currently, it excludes the `__init__.py files and the modules of this package that
+    don't use the `action` decorator, so that they (and their dependencies) are not
+    loaded needlessly.
     """
     if "__init__.py" in filepath:
         return False
 
+    if _PACKAGE_PATH in Path(filepath).resolve().parents:
+        with open(filepath, encoding="utf-8") as f:
+            if "action(" not in f.read():
+                return False
+
     return True
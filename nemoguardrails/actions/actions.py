@@ -14,13 +14,37 @@
 # limitations under the License.
 
 from dataclasses import dataclass, field
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Union
+
+
+@dataclass
+class ActionCacheOptions:
+    """Data class representing the caching options of an action.
+
+    Attributes:
+        key_params (Optional[List[str]]): The parameters used to compute the cache key.
+            Nested values can be selected using dotted paths, e.g. `context.user_message`.
+            If not set, all the parameters with JSON values, except `events` and
+            `state`, are used.
+        ttl (Optional[float]): The number of seconds after which a result expires.
+        max_size (int): The maximum number of results kept in memory for the action.
+    """
+
+    key_params: Optional[List[str]] = None
+    ttl: Optional[float] = None
+    max_size: int = 1024
 
 
 def action(
     is_system_action: bool = False,
     name: Optional[str] = None,
     execute_async: bool = False,
+    timeout: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+    cpu_bound: bool = False,
+    blocking: bool = False,
+    cache: Union[bool, dict, ActionCacheOptions] = False,
+    prefetch: Union[bool, List[str]] = False,
 ):
     """Decorator to mark a function or class as an action.
 
@@ -28,11 +52,37 @@ def action(
         is_system_action (bool): Flag indicating if the action is a system action.
         name (Optional[str]): The name to associate with the action.
         execute_async: Whether the function should be executed in async mode.
+        timeout (Optional[float]): The maximum number of seconds the action can run
+            before it is considered failed.
+        max_concurrency (Optional[int]): The maximum number of concurrent executions
+            of the action.
+        cpu_bound (bool): Whether a synchronous action is CPU-bound, in which case it is
+            executed in a process pool rather than a thread pool. The function and its
+            parameters must be picklable.
+        blocking (bool): Whether a synchronous action blocks (e.g., on I/O), in which
+            case it is executed in a thread pool, so that it doesn't block the event loop.
+            The action must be thread-safe, and can't rely on thread-local state.
+        cache (Union[bool, dict, ActionCacheOptions]): Whether the results of the action
+            should be cached. Use `True` for the default options, or a dict or an
+            `ActionCacheOptions` instance to customize them. Only use this for
+            idempotent actions.
+        prefetch (Union[bool, List[str]]): Whether the action can be started as soon as
+            the user message is known, before it is reached in a flow (Colang 1.0 only).
+            The prefetched result is used only if the parameters have the same values
+            when the action is reached. Use a list to specify the parameters to compare
+            (with dotted paths for nested values, e.g. `context.last_user_message`).
 
     Returns:
         callable: The decorated function or class.
     """
 
+    if cache is True:
+        cache_options = ActionCacheOptions()
+    elif isinstance(cache, dict):
+        cache_options = ActionCacheOptions(**cache)
+    else:
+        cache_options = cache or None
+
     def decorator(fn_or_cls):
         """Inner decorator function to add metadata to the action.
 
@@ -53,6 +103,12 @@ def action(
             "name": name or fn_or_cls.__name__,
             "is_system_action": is_system_action,
             "execute_async": execute_async,
+            "timeout": timeout,
+            "max_concurrency": max_concurrency,
+            "cpu_bound": cpu_bound,
+            "blocking": blocking,
+            "cache": cache_options,
+            "prefetch": prefetch,
         }
         return fn_or_cls
 
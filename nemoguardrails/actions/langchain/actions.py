@@ -17,21 +17,23 @@
 import os
 
 from nemoguardrails.actions import action
-from nemoguardrails.actions.langchain.safetools import (
-    ApifyWrapperSafe,
-    BingSearchAPIWrapperSafe,
-    GoogleSearchAPIWrapperSafe,
-    GoogleSerperAPIWrapperSafe,
-    OpenWeatherMapAPIWrapperSafe,
-    SearxSearchWrapperSafe,
-    SerpAPIWrapperSafe,
-    WikipediaAPIWrapperSafe,
-    WolframAlphaAPIWrapperSafe,
-    ZapierNLAWrapperSafe,
-)
 
 # TODO: Document this env variable.
 if os.environ.get("NEMO_GUARDRAILS_DEMO_ACTIONS"):
+    # The LangChain tools are imported only when the demo actions are enabled.
+    from nemoguardrails.actions.langchain.safetools import (
+        ApifyWrapperSafe,
+        BingSearchAPIWrapperSafe,
+        GoogleSearchAPIWrapperSafe,
+        GoogleSerperAPIWrapperSafe,
+        OpenWeatherMapAPIWrapperSafe,
+        SearxSearchWrapperSafe,
+        SerpAPIWrapperSafe,
+        WikipediaAPIWrapperSafe,
+        WolframAlphaAPIWrapperSafe,
+        ZapierNLAWrapperSafe,
+    )
+
     apify = action(name="apify")(ApifyWrapperSafe)
     bing_search = action(name="bing_search")(BingSearchAPIWrapperSafe)
     google_search = action(name="google_search")(GoogleSearchAPIWrapperSafe)
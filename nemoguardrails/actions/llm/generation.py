@@ -25,12 +25,13 @@ import uuid
 from ast import literal_eval
 from functools import lru_cache
 from time import time
-from typing import Callable, List, Optional, cast
+from typing import Callable, Dict, List, Optional, Tuple, cast
 
 from jinja2 import Environment, meta
 from langchain.llms import BaseLLM
 
 from nemoguardrails.actions.actions import ActionResult, action
+from nemoguardrails.actions.llm.speculation import SpeculativeTasks
 from nemoguardrails.actions.llm.utils import (
     flow_to_colang,
     get_first_nonempty_line,
@@ -50,16 +51,17 @@ from nemoguardrails.context import (
     generation_options_var,
     llm_call_info_var,
     raw_llm_request,
+    speculative_tasks_var,
     streaming_handler_var,
 )
 from nemoguardrails.embeddings.index import EmbeddingsIndex, IndexItem
+from nemoguardrails.embeddings.progress import IndexingProgress
 from nemoguardrails.kb.kb import KnowledgeBase
 from nemoguardrails.llm.params import llm_params
 from nemoguardrails.llm.prompts import get_prompt
 from nemoguardrails.llm.taskmanager import LLMTaskManager
 from nemoguardrails.llm.types import Task
 from nemoguardrails.logging.explain import LLMCallInfo
-from nemoguardrails.patch_asyncio import check_sync_call_from_async_loop
 from nemoguardrails.rails.llm.config import EmbeddingSearchProvider, RailsConfig
 from nemoguardrails.rails.llm.options import GenerationOptions
 from nemoguardrails.streaming import StreamingHandler
@@ -70,6 +72,9 @@ log = logging.getLogger(__name__)
 
 local_streaming_handlers = {}
 
+# The maximum number of texts embedded in a single call, when building the indexes.
+EMBEDDINGS_BATCH_SIZE = 64
+
 
 class LLMGenerationActions:
     """A container objects for multiple related actions."""
@@ -83,10 +88,12 @@ class LLMGenerationActions:
             [Optional[EmbeddingSearchProvider]], EmbeddingsIndex
         ],
         verbose: bool = False,
+        indexing_progress: Optional[IndexingProgress] = None,
     ):
         self.config = config
         self.llm = llm
         self.verbose = verbose
+        self.indexing_progress = indexing_progress or IndexingProgress()
 
         # We extract the user/bot messages from the config as we might alter them.
         self.user_messages = config.user_messages.copy()
@@ -103,13 +110,11 @@ class LLMGenerationActions:
 
         # There are still some edge cases not covered by nest_asyncio.
         # Using a separate thread always for now.
-        loop = asyncio.get_event_loop()
-        if True or check_sync_call_from_async_loop():
-            t = threading.Thread(target=asyncio.run, args=(self.init(),))
-            t.start()
-            t.join()
-        else:
-            loop.run_until_complete(self.init())
+        # This also means the actions can be created from a thread without an event loop
+        # (e.g., when the server initializes a configuration in the background).
+        t = threading.Thread(target=asyncio.run, args=(self.init(),))
+        t.start()
+        t.join()
 
         self.llm_task_manager = llm_task_manager
 
@@ -120,17 +125,34 @@ class LLMGenerationActions:
         # calling the LLM with the user input.
         self.passthrough_fn = None
 
+        # If set, this function is used to run the output rails on chunks of the
+        # bot message while it is being streamed. It receives the text of the chunk
+        # and the current context, and returns (passed, text).
+        self.output_rails_streaming_fn = None
+
     async def init(self):
         # For Colang 2.x we need to do some initial processing
         if self.config.colang_version == "2.x":
             self._process_flows()
 
-        await asyncio.gather(
-            self._init_user_message_index(),
-            self._init_bot_message_index(),
-            self._init_flows_index(),
+        indexes_items = self._get_indexes_items()
+        for name, items in indexes_items.items():
+            if items:
+                self.indexing_progress.start(name, total=len(items))
+
+        # The embeddings are computed once for all the indexes, and the indexes are
+        # then built concurrently.
+        embeddings = await self._get_shared_embeddings(indexes_items)
+        indexes = await asyncio.gather(
+            *[
+                self._init_index(name, items, embeddings)
+                for name, items in indexes_items.items()
+            ]
         )
 
+        for name, index in zip(indexes_items.keys(), indexes):
+            setattr(self, name, index)
+
     def _extract_user_message_example(self, flow: Flow):
         """Heuristic to extract user message examples from a flow."""
         elements = [
@@ -207,58 +229,26 @@ class LLMGenerationActions:
             if flow.name.startswith("bot "):
                 self._extract_bot_message_example(flow)
 
-    async def _init_user_message_index(self):
-        """Initializes the index of user messages."""
-
-        if not self.user_messages:
-            return
-
+    def _get_user_message_index_items(self) -> List[IndexItem]:
+        """Returns the items for the index of user messages."""
         items = []
         for intent, utterances in self.user_messages.items():
             for text in utterances:
                 items.append(IndexItem(text=text, meta={"intent": intent}))
 
-        # If we have no patterns, we stop.
-        if len(items) == 0:
-            return
-
-        self.user_message_index = self.get_embedding_search_provider_instance(
-            self.config.core.embedding_search_provider
-        )
-        await self.user_message_index.add_items(items)
-
-        # NOTE: this should be very fast, otherwise needs to be moved to separate thread.
-        await self.user_message_index.build()
-
-    async def _init_bot_message_index(self):
-        """Initializes the index of bot messages."""
-
-        if not self.bot_messages:
-            return
+        return items
 
+    def _get_bot_message_index_items(self) -> List[IndexItem]:
+        """Returns the items for the index of bot messages."""
         items = []
         for intent, utterances in self.bot_messages.items():
             for text in utterances:
                 items.append(IndexItem(text=intent, meta={"text": text}))
 
-        # If we have no patterns, we stop.
-        if len(items) == 0:
-            return
-
-        self.bot_message_index = self.get_embedding_search_provider_instance(
-            self.config.core.embedding_search_provider
-        )
-        await self.bot_message_index.add_items(items)
-
-        # NOTE: this should be very fast, otherwise needs to be moved to separate thread.
-        await self.bot_message_index.build()
-
-    async def _init_flows_index(self):
-        """Initializes the index of flows."""
-
-        if not self.config.flows:
-            return
+        return items
 
+    def _get_flows_index_items(self) -> List[IndexItem]:
+        """Returns the items for the index of flows."""
         items = []
         for flow in self.config.flows:
             # We don't include the system flows in the index because we don't want
@@ -278,17 +268,86 @@ class LLMGenerationActions:
                 if line.strip() != "":
                     items.append(IndexItem(text=line, meta={"flow": colang_flow}))
 
+        return items
+
+    def _get_indexes_items(self) -> Dict[str, List[IndexItem]]:
+        """Returns the items for each of the indexes, keyed by the attribute name."""
+        return {
+            "user_message_index": self._get_user_message_index_items(),
+            "bot_message_index": self._get_bot_message_index_items(),
+            "flows_index": self._get_flows_index_items(),
+        }
+
+    async def _get_shared_embeddings(
+        self, indexes_items: Dict[str, List[IndexItem]]
+    ) -> Optional[Dict[str, List[float]]]:
+        """Computes the embeddings for the items of all the indexes, in a single batch.
+
+        Identical texts, which are common across the indexes (e.g., the user and bot
+        intents used in the flows), are embedded only once. This is done only for the
+        default embedding search provider; other providers compute their own.
+
+        Returns:
+            A dict mapping each text to its embedding, or None.
+        """
+        esp_config = self.config.core.embedding_search_provider
+        if esp_config.name != "default":
+            return None
+
+        texts = list(
+            dict.fromkeys(
+                item.text for items in indexes_items.values() for item in items
+            )
+        )
+        if not texts:
+            return None
+
+        index = self.get_embedding_search_provider_instance(esp_config)
+
+        self.indexing_progress.start("embeddings", total=len(texts))
+        embeddings = []
+        for i in range(0, len(texts), EMBEDDINGS_BATCH_SIZE):
+            batch = texts[i : i + EMBEDDINGS_BATCH_SIZE]
+            embeddings.extend(await index._get_embeddings(batch))
+            self.indexing_progress.advance("embeddings", len(batch))
+        self.indexing_progress.finish("embeddings")
+
+        return dict(zip(texts, embeddings))
+
+    async def _init_index(
+        self,
+        name: str,
+        items: List[IndexItem],
+        embeddings: Optional[Dict[str, List[float]]] = None,
+    ) -> Optional[EmbeddingsIndex]:
+        """Creates and builds an index with the provided items.
+
+        Args:
+            name: The name of the index, used for reporting the progress.
+            items: The items to add to the index.
+            embeddings: The precomputed embeddings for the texts of the items, if any.
+
+        Returns:
+            The index, or None if there are no items.
+        """
         # If we have no patterns, we stop.
         if len(items) == 0:
-            return
+            return None
 
-        self.flows_index = self.get_embedding_search_provider_instance(
+        index = self.get_embedding_search_provider_instance(
             self.config.core.embedding_search_provider
         )
-        await self.flows_index.add_items(items)
+        if embeddings is not None:
+            await index.add_items(
+                items, embeddings=[embeddings[item.text] for item in items]
+            )
+        else:
+            await index.add_items(items)
+
+        await index.build()
+        self.indexing_progress.finish(name)
 
-        # NOTE: this should be very fast, otherwise needs to be moved to separate thread.
-        await self.flows_index.build()
+        return index
 
     def _get_general_instructions(self):
         """Helper to extract the general instruction."""
@@ -328,6 +387,56 @@ class LLMGenerationActions:
 
         return sample_conversation
 
+    @action(is_system_action=True)
+    async def start_speculative_dialog(
+        self,
+        events: List[dict],
+        context: dict,
+        config: RailsConfig,
+        llm: Optional[BaseLLM] = None,
+    ):
+        """Starts generating the user intent.
+
+        This is called before the input rails run, when `rails.input.speculative_dialog`
+        is enabled. The result is used by `generate_user_intent` only if the input
+        rails don't block or alter the user message.
+
+        The relevant chunks are already being retrieved, as `retrieve_relevant_chunks`
+        is a prefetched action.
+        """
+        speculative_tasks: SpeculativeTasks = speculative_tasks_var.get()
+        if speculative_tasks is None:
+            return
+
+        # If the dialog rails are disabled, the user intent is not needed.
+        generation_options: GenerationOptions = generation_options_var.get()
+        if generation_options and generation_options.rails.dialog is False:
+            return
+
+        user_message = context.get("user_message")
+        if not user_message:
+            return
+
+        # The events as they will be when the user intent is generated, if the input
+        # rails don't alter anything.
+        events = events + [new_event_dict("UserMessage", text=user_message)]
+
+        # We only speculate when the user intent is generated using the dedicated
+        # prompt, and not when the bot message is generated (and possibly streamed)
+        # directly.
+        if (
+            self.user_messages
+            and not self.config.rails.dialog.single_call.enabled
+            and not self.config.passthrough
+        ):
+            speculative_tasks.start(
+                "generate_user_intent",
+                user_message,
+                self._generate_user_intent(
+                    events=events, context=context, config=config, llm=llm
+                ),
+            )
+
     @action(is_system_action=True)
     async def generate_user_intent(
         self,
@@ -344,6 +453,29 @@ class LLMGenerationActions:
                 events=events, llm=llm, kb=kb
             )
 
+        # If the user intent was generated speculatively for the same user message
+        # (i.e., the input rails have not altered it), we use it.
+        speculative_tasks: SpeculativeTasks = speculative_tasks_var.get()
+        if speculative_tasks and "generate_user_intent" in speculative_tasks:
+            event = get_last_user_utterance_event(events)
+            found, result = await speculative_tasks.consume(
+                "generate_user_intent", event["text"]
+            )
+            if found:
+                return result
+
+        return await self._generate_user_intent(
+            events=events, context=context, config=config, llm=llm
+        )
+
+    async def _generate_user_intent(
+        self,
+        events: List[dict],
+        context: dict,
+        config: RailsConfig,
+        llm: Optional[BaseLLM] = None,
+    ):
+        """Generates the user intent using the LLM (or the embeddings)."""
         # The last event should be the "StartInternalSystemAction" and the one before it the "UtteranceUserActionFinished".
         event = get_last_user_utterance_event(events)
         assert event["type"] == "UserMessage"
@@ -704,6 +836,133 @@ class LLMGenerationActions:
 
         return template.render(render_context)
 
+    def _use_output_rails_streaming(self) -> bool:
+        """Whether the output rails should be applied while streaming the bot message."""
+        if (
+            self.output_rails_streaming_fn is None
+            or not self.config.rails.output.flows
+            or not self.config.rails.output.streaming.enabled
+        ):
+            return False
+
+        generation_options: GenerationOptions = generation_options_var.get()
+        if generation_options and not generation_options.rails.output:
+            return False
+
+        return True
+
+    async def _run_output_rails_on_stream(
+        self,
+        llm_streaming_handler: StreamingHandler,
+        streaming_handler: StreamingHandler,
+        context: dict,
+    ) -> Tuple[bool, str]:
+        """Runs the output rails on chunks of the stream.
+
+        The tokens from `llm_streaming_handler` are grouped into chunks, and each chunk is
+        checked by the output rails as soon as it is complete, concurrently with the
+        generation. The chunks are released to `streaming_handler`, in order, only after
+        they pass the output rails. If a chunk is blocked, the response from the output
+        rails is streamed and the stream is closed.
+
+        Returns:
+            (passed, text) When passed, the text that has been released. Otherwise, the
+              response from the output rails that blocked the message.
+        """
+        streaming_config = self.config.rails.output.streaming
+        checks = asyncio.Queue()
+
+        def _check(chunk_tokens: List[str]):
+            checks.put_nowait(
+                asyncio.create_task(
+                    self.output_rails_streaming_fn("".join(chunk_tokens), context)
+                )
+            )
+
+        async def _split_in_chunks():
+            chunk_tokens = []
+            async for token in llm_streaming_handler:
+                chunk_tokens.append(token)
+
+                if len(chunk_tokens) >= streaming_config.chunk_size or (
+                    streaming_config.sentence_boundaries
+                    and token.rstrip(" ")[-1:] in [".", "!", "?", "\n"]
+                ):
+                    _check(chunk_tokens)
+                    chunk_tokens = []
+
+            if chunk_tokens:
+                _check(chunk_tokens)
+            checks.put_nowait(None)
+
+        splitter = asyncio.create_task(_split_in_chunks())
+        released_text = ""
+        try:
+            while True:
+                check = await checks.get()
+                if check is None:
+                    return True, released_text
+
+                passed, text = await check
+                if not passed:
+                    log.info(f"Output rails blocked the streamed chunk: {text}")
+                    # The response from the output rails is streamed instead.
+                    await streaming_handler.push_chunk(text)
+                    return False, text
+
+                released_text += text
+                await streaming_handler.push_chunk(text)
+        finally:
+            splitter.cancel()
+            while not checks.empty():
+                check = checks.get_nowait()
+                if check is not None:
+                    check.cancel()
+
+            # We close the stream.
+            await streaming_handler.push_chunk("")
+
+    async def _llm_call_with_output_rails_streaming(
+        self,
+        llm: BaseLLM,
+        prompt,
+        llm_streaming_handler: StreamingHandler,
+        streaming_handler: StreamingHandler,
+        context: dict,
+    ) -> Tuple[Optional[str], bool, str]:
+        """Calls the LLM while running the output rails on the streamed chunks.
+
+        If a chunk is blocked, the LLM call is cancelled.
+
+        Returns:
+            (result, passed, text) The result of the LLM call (None if it was cancelled),
+              and the result of running the output rails on the stream.
+        """
+        llm_task = asyncio.create_task(
+            llm_call(llm, prompt, custom_callback_handlers=[llm_streaming_handler])
+        )
+        rails_task = asyncio.create_task(
+            self._run_output_rails_on_stream(
+                llm_streaming_handler, streaming_handler, context
+            )
+        )
+
+        done, _ = await asyncio.wait(
+            [llm_task, rails_task], return_when=asyncio.FIRST_COMPLETED
+        )
+
+        if llm_task in done and llm_task.exception() is not None:
+            rails_task.cancel()
+            raise llm_task.exception()
+
+        passed, text = await rails_task
+        if not passed:
+            llm_task.cancel()
+            await asyncio.gather(llm_task, return_exceptions=True)
+            return None, passed, text
+
+        return await llm_task, passed, text
+
     @action(is_system_action=True)
     async def generate_bot_message(
         self, events: List[dict], context: dict, llm: Optional[BaseLLM] = None
@@ -722,6 +981,10 @@ class LLMGenerationActions:
 
         streaming_handler = streaming_handler_var.get()
 
+        # The result of running the output rails on the stream, if applicable.
+        output_rails_passed = None
+        output_rails_text = None
+
         if bot_intent in self.config.bot_messages:
             # Choose a message randomly from self.config.bot_messages[bot_message]
             # However, in test mode, we always choose the first one, to keep it predictable.
@@ -831,9 +1094,24 @@ class LLMGenerationActions:
                             (generation_options and generation_options.llm_params) or {}
                         ),
                     ):
-                        result = await llm_call(
-                            llm, prompt, custom_callback_handlers=[streaming_handler]
-                        )
+                        if streaming_handler and self._use_output_rails_streaming():
+                            (
+                                result,
+                                output_rails_passed,
+                                output_rails_text,
+                            ) = await self._llm_call_with_output_rails_streaming(
+                                llm,
+                                prompt,
+                                StreamingHandler(),
+                                streaming_handler,
+                                context,
+                            )
+                        else:
+                            result = await llm_call(
+                                llm,
+                                prompt,
+                                custom_callback_handlers=[streaming_handler],
+                            )
 
                     log.info(
                         "--- :: LLM Bot Message Generation passthrough call took %.2f seconds",
@@ -869,14 +1147,20 @@ class LLMGenerationActions:
 
                 t0 = time()
 
-                if streaming_handler:
+                # When the output rails run in streaming mode, the LLM streams into
+                # an inner handler, and the chunks are released only after they pass.
+                llm_streaming_handler = streaming_handler
+                if streaming_handler and self._use_output_rails_streaming():
+                    llm_streaming_handler = StreamingHandler()
+
+                if llm_streaming_handler:
                     # TODO: Figure out a more generic way to deal with this
                     if prompt_config.output_parser == "verbose_v1":
-                        streaming_handler.set_pattern(
+                        llm_streaming_handler.set_pattern(
                             prefix='Bot message: "', suffix='"'
                         )
                     else:
-                        streaming_handler.set_pattern(prefix='  "', suffix='"')
+                        llm_streaming_handler.set_pattern(prefix='  "', suffix='"')
 
                 # Initialize the LLMCallInfo object
                 llm_call_info_var.set(LLMCallInfo(task=Task.GENERATE_BOT_MESSAGE.value))
@@ -886,27 +1170,50 @@ class LLMGenerationActions:
                     llm,
                     **((generation_options and generation_options.llm_params) or {}),
                 ):
-                    result = await llm_call(
-                        llm, prompt, custom_callback_handlers=[streaming_handler]
-                    )
+                    if llm_streaming_handler is not streaming_handler:
+                        (
+                            result,
+                            output_rails_passed,
+                            output_rails_text,
+                        ) = await self._llm_call_with_output_rails_streaming(
+                            llm,
+                            prompt,
+                            llm_streaming_handler,
+                            streaming_handler,
+                            context,
+                        )
+                    else:
+                        result = await llm_call(
+                            llm, prompt, custom_callback_handlers=[streaming_handler]
+                        )
 
                 log.info(
                     "--- :: LLM Bot Message Generation call took %.2f seconds",
                     time() - t0,
                 )
 
-                # Parse the output using the associated parser
-                result = self.llm_task_manager.parse_task_output(
-                    Task.GENERATE_BOT_MESSAGE, output=result
-                )
+                if result is not None:
+                    # Parse the output using the associated parser
+                    result = self.llm_task_manager.parse_task_output(
+                        Task.GENERATE_BOT_MESSAGE, output=result
+                    )
 
-                # TODO: catch openai.error.InvalidRequestError from exceeding max token length
+                    # TODO: catch openai.error.InvalidRequestError from exceeding max token length
 
-                result = get_multiline_response(result)
-                result = strip_quotes(result)
+                    result = get_multiline_response(result)
+                    result = strip_quotes(result)
 
             bot_utterance = result
 
+            # If the output rails have been applied on the stream, the bot message is
+            # the streamed text (or the output rails response, if it was blocked),
+            # and the output rails don't run again on the full message.
+            if output_rails_passed is not None and (
+                not output_rails_passed or output_rails_text
+            ):
+                bot_utterance = output_rails_text
+                context_updates["skip_output_rails"] = True
+
             # Context variable starting with "_" are considered private (not used in tests or logging)
             context_updates["_last_bot_prompt"] = prompt
 
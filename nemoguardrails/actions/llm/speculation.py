@@ -0,0 +1,161 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Support for the speculative execution of the dialog generation steps."""
+
+import asyncio
+import logging
+from time import time
+from typing import Any, Awaitable, Dict, List, Tuple
+
+from nemoguardrails.context import llm_stats_var
+from nemoguardrails.logging.processing_log import processing_log_var
+
+log = logging.getLogger(__name__)
+
+
+class SpeculativeTask:
+    """A task started speculatively, together with the key of its inputs."""
+
+    def __init__(self, name: str, key: str, task: asyncio.Task, log: List[dict]):
+        self.name = name
+        self.key = key
+        self.task = task
+
+        # The processing log entries (i.e., the LLM calls) recorded by the task.
+        self.log = log
+
+
+class SpeculativeTasks:
+    """The tasks started speculatively during the processing of a request.
+
+    A speculative task computes the result of a generation step (e.g., the user intent)
+    before the step is actually reached, e.g., while the input rails are running. When
+    the step is reached, the result is used only if the step has the same key (e.g.,
+    the user message was not altered by the input rails). Otherwise, or if the step is
+    never reached (e.g., an input rail has blocked the message), the task is cancelled.
+
+    The LLM calls made by a speculative task are recorded separately and added to the
+    processing log only if the result is used. The discarded tasks are recorded in the
+    processing log as `speculation` entries, and in the LLM stats.
+    """
+
+    def __init__(self, stats_prefix: str = "speculative"):
+        """Constructor.
+
+        Args:
+            stats_prefix: The prefix for the names of the LLM stats, e.g.,
+              `speculative_tasks`.
+        """
+        self.stats_prefix = stats_prefix
+        self._tasks: Dict[str, SpeculativeTask] = {}
+
+    def __contains__(self, name: str):
+        return name in self._tasks
+
+    @staticmethod
+    async def _run(coro: Awaitable, task_log: List[dict]):
+        # The task has its own copy of the context, so this does not affect the
+        # processing log of the request.
+        processing_log_var.set(task_log)
+        return await coro
+
+    def start(self, name: str, key: str, coro: Awaitable):
+        """Starts a speculative task.
+
+        Args:
+            name: The name of the generation step, e.g., `generate_user_intent`.
+            key: The key identifying the inputs of the step.
+            coro: The coroutine computing the result of the step.
+        """
+        if name in self._tasks:
+            self._discard(self._tasks.pop(name))
+
+        task_log = []
+        task = asyncio.get_running_loop().create_task(self._run(coro, task_log))
+        self._tasks[name] = SpeculativeTask(name, key, task, task_log)
+
+        llm_stats = llm_stats_var.get()
+        if llm_stats:
+            llm_stats.inc(f"{self.stats_prefix}_tasks")
+
+    def _record(self, speculative_task: SpeculativeTask, status: str):
+        llm_calls = [
+            entry["data"]
+            for entry in speculative_task.log
+            if entry["type"] == "llm_call_info"
+        ]
+
+        processing_log = processing_log_var.get()
+        if processing_log is not None:
+            if status == "used":
+                processing_log.extend(speculative_task.log)
+            processing_log.append(
+                {
+                    "type": "speculation",
+                    "timestamp": time(),
+                    "data": {
+                        "kind": self.stats_prefix,
+                        "name": speculative_task.name,
+                        "status": status,
+                        "llm_calls": llm_calls,
+                    },
+                }
+            )
+
+        llm_stats = llm_stats_var.get()
+        if llm_stats and status == "discarded":
+            llm_stats.inc(f"{self.stats_prefix}_tasks_discarded")
+            llm_stats.inc(f"{self.stats_prefix}_llm_calls_discarded", len(llm_calls))
+
+    def _discard(self, speculative_task: SpeculativeTask):
+        log.info(f"Discarding speculative result for {speculative_task.name}.")
+        speculative_task.task.cancel()
+        self._record(speculative_task, "discarded")
+
+    async def consume(self, name: str, key: str) -> Tuple[bool, Any]:
+        """Returns the result of a speculative task, if its key matches.
+
+        Args:
+            name: The name of the generation step.
+            key: The key identifying the actual inputs of the step.
+
+        Returns:
+            A tuple with a flag indicating if the result can be used and the result.
+        """
+        speculative_task = self._tasks.pop(name, None)
+        if speculative_task is None:
+            return False, None
+
+        if speculative_task.key != key:
+            self._discard(speculative_task)
+            return False, None
+
+        try:
+            result = await speculative_task.task
+        except Exception as e:
+            log.info(f"Speculative task for {name} failed: {e}")
+            self._record(speculative_task, "discarded")
+            return False, None
+
+        log.info(f"Using speculative result for {name}.")
+        self._record(speculative_task, "used")
+        return True, result
+
+    def cancel_all(self):
+        """Cancels all the speculative tasks that have not been used."""
+        for speculative_task in self._tasks.values():
+            self._discard(speculative_task)
+        self._tasks = {}
@@ -24,7 +24,7 @@ from langchain.schema import AIMessage, HumanMessage, SystemMessage
 
 from nemoguardrails.colang.v2_x.lang.colang_ast import Flow
 from nemoguardrails.colang.v2_x.runtime.flows import InternalEvent, InternalEvents
-from nemoguardrails.context import llm_call_info_var
+from nemoguardrails.context import llm_call_info_var, llm_response_cache_var
 from nemoguardrails.logging.callbacks import logging_callbacks
 from nemoguardrails.logging.explain import LLMCallInfo
 
@@ -47,7 +47,10 @@ async def llm_call(
     stop: Optional[List[str]] = None,
     custom_callback_handlers: Optional[List[AsyncCallbackHandler]] = None,
 ) -> str:
-    """Calls the LLM with a prompt and returns the generated text."""
+    """Calls the LLM with a prompt and returns the generated text.
+
+    If prompt caching is enabled, the responses of the deterministic calls are cached.
+    """
 
     # We initialize a new LLM call if we don't have one already
     llm_call_info = llm_call_info_var.get()
@@ -63,6 +66,19 @@ async def llm_call(
     else:
         all_callbacks = logging_callbacks
 
+    # The calls that stream the response are never cached.
+    cache = llm_response_cache_var.get()
+    cache_key = None
+    if (
+        cache is not None
+        and not (custom_callback_handlers and custom_callback_handlers != [None])
+        and cache.is_cacheable(llm)
+    ):
+        cache_key = cache.get_key(llm, prompt, stop)
+        response = cache.get(cache_key)
+        if response is not None:
+            return response
+
     if isinstance(prompt, str):
         # stop sinks here
         try:
@@ -72,9 +88,6 @@ async def llm_call(
         except Exception as e:
             raise LLMCallException(e)
         llm_call_info.raw_response = result.llm_output
-
-        # TODO: error handling
-        return result.generations[0][0].text
     else:
         # We first need to translate the array of messages into LangChain message format
         messages = []
@@ -99,7 +112,13 @@ async def llm_call(
 
         llm_call_info.raw_response = result.llm_output
 
-        return result.generations[0][0].text
+    # TODO: error handling
+    response = result.generations[0][0].text
+
+    if cache_key is not None:
+        cache.set(cache_key, response)
+
+    return response
 
 
 def get_colang_history(
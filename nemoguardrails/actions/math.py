@@ -18,8 +18,6 @@ import os
 from typing import Optional
 from urllib import parse
 
-import aiohttp
-
 from nemoguardrails.actions import action
 from nemoguardrails.actions.actions import ActionResult
 from nemoguardrails.utils import new_event_dict
@@ -46,6 +44,8 @@ async def wolfram_alpha_request(
     Raises:
         Exception: If no query is provided to Wolfram Alpha.
     """
+    import aiohttp
+
     # If we don't have an explicit query, we take the last user message
     if query is None and context is not None:
         query = context.get("last_user_message") or "2+3"
@@ -22,7 +22,15 @@ from nemoguardrails.kb.kb import KnowledgeBase
 log = logging.getLogger(__name__)
 
 
-@action(is_system_action=True)
+@action(
+    is_system_action=True,
+    prefetch=[
+        "context.last_user_message",
+        "context.relevant_chunks",
+        "context.relevant_chunks_sep",
+        "context.kb_filter",
+    ],
+)
 async def retrieve_relevant_chunks(
     context: Optional[dict] = None,
     kb: Optional[KnowledgeBase] = None,
@@ -41,7 +49,8 @@ async def retrieve_relevant_chunks(
 
     Note:
         This action retrieves relevant chunks from the KnowledgeBase based on the user's last message
-        and updates the context with the information.
+        and updates the context with the information. If the `kb_filter` context variable is set
+        (e.g., `{"collection": "product_a"}`), only the matching chunks are retrieved.
 
     Example:
         ```
@@ -61,9 +70,11 @@ async def retrieve_relevant_chunks(
 
         context_updates["retrieved_for"] = user_message
 
-        chunks = [
-            chunk["body"] for chunk in await kb.search_relevant_chunks(user_message)
-        ]
+        results = await kb.search_relevant_chunks(
+            user_message, filter=context.get("kb_filter")
+        )
+
+        chunks = [chunk["body"] for chunk in results]
 
         context_updates["relevant_chunks"] = "\n".join(chunks)
         context_updates["relevant_chunks_sep"] = chunks
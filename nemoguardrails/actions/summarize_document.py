@@ -13,8 +13,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from langchain.chains import AnalyzeDocumentChain
-from langchain.chains.summarize import load_summarize_chain
 from langchain.llms import BaseLLM
 
 from nemoguardrails.actions.actions import action
@@ -43,6 +41,9 @@ class SummarizeDocument:
         self.document_path = document_path
 
     def run(self):
+        from langchain.chains import AnalyzeDocumentChain
+        from langchain.chains.summarize import load_summarize_chain
+
         summary_chain = load_summarize_chain(self.llm, "map_reduce")
         summarize_document_chain = AnalyzeDocumentChain(
             combine_docs_chain=summary_chain
@@ -18,7 +18,7 @@ import logging
 import re
 import textwrap
 from ast import literal_eval
-from typing import Any, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain.llms import BaseLLM
 from rich.text import Text
@@ -47,7 +47,7 @@ from nemoguardrails.colang.v2_x.runtime.statemachine import (
     get_element_from_head,
     get_event_from_element,
 )
-from nemoguardrails.embeddings.index import EmbeddingsIndex, IndexItem
+from nemoguardrails.embeddings.index import IndexItem
 from nemoguardrails.llm.filters import colang
 from nemoguardrails.llm.params import llm_params
 from nemoguardrails.llm.types import Task
@@ -74,40 +74,20 @@ class LLMGenerationActionsV2dotx(LLMGenerationActions):
     It overrides some methods.
     """
 
-    async def _init_colang_flows_index(
-        self, flows: List[str]
-    ) -> Optional[EmbeddingsIndex]:
-        """Initialize an index with colang flows.
+    async def init(self):
+        await super().init()
 
-        The flows are expected to have full definition.
+        # If we don't have an instruction_flows_index, we fall back to using the main one
+        if self.instruction_flows_index is None:
+            self.instruction_flows_index = self.flows_index
 
-        Args
-            flows: The list of flows, i.e. the flow definition from the source code.
+    def _get_indexes_items(self) -> Dict[str, List[IndexItem]]:
+        """Returns the items for each of the indexes, keyed by the attribute name.
 
-        Returns
-            An initialized index.
+        The flows are indexed using their full definition, and the flows that have
+        instructions, i.e. docstring at the beginning, also have a separate index.
         """
-        items = []
-        for source_code in flows:
-            items.append(IndexItem(text=source_code, meta={"flow": source_code}))
-
-        # If we have no patterns, we stop.
-        if len(items) == 0:
-            return None
-
-        flows_index = self.get_embedding_search_provider_instance(
-            self.config.core.embedding_search_provider
-        )
-        await flows_index.add_items(items)
-        await flows_index.build()
-
-        return flows_index
-
-    async def _init_flows_index(self) -> None:
-        """Initializes the index of flows."""
-
-        if not self.config.flows:
-            return
+        indexes_items = super()._get_indexes_items()
 
         # The list of all flows that will be added to the index
         all_flows = []
@@ -135,14 +115,16 @@ class LLMGenerationActionsV2dotx(LLMGenerationActions):
                     if first_line.startswith("#") or first_line.startswith('"""'):
                         instruction_flows.append(colang_flow)
 
-        self.flows_index = await self._init_colang_flows_index(all_flows)
-        self.instruction_flows_index = await self._init_colang_flows_index(
-            instruction_flows
-        )
+        indexes_items["flows_index"] = [
+            IndexItem(text=source_code, meta={"flow": source_code})
+            for source_code in all_flows
+        ]
+        indexes_items["instruction_flows_index"] = [
+            IndexItem(text=source_code, meta={"flow": source_code})
+            for source_code in instruction_flows
+        ]
 
-        # If we don't have an instruction_flows_index, we fall back to using the main one
-        if self.instruction_flows_index is None:
-            self.instruction_flows_index = self.flows_index
+        return indexes_items
 
     async def _collect_user_intent_and_examples(
         self, state: State, user_action: str, max_example_flows: int
@@ -13,10 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
-from typing import Dict, Optional
+import zlib
+from typing import Any, Callable, Dict, List, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.routing import APIRoute
 from pydantic import BaseModel, Field
 
 from nemoguardrails.actions.action_dispatcher import ActionDispatcher
@@ -25,12 +29,80 @@ log = logging.getLogger(__name__)
 
 api_description = """Guardrails Action Sever API."""
 
+# The maximum size, in bytes, of a (decompressed) request body.
+DEFAULT_MAX_BODY_SIZE = 32 * 1024 * 1024
+
+
+def _decompress_gzip(body: bytes, max_size: int) -> bytes:
+    """Decompresses a gzip encoded body, without producing more than `max_size` bytes.
+
+    Raises:
+        HTTPException: If the decompressed body is larger than `max_size`.
+    """
+    chunks = []
+    size = 0
+    data = body
+    try:
+        # A gzip file can contain multiple members.
+        while data:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            chunk = decompressor.decompress(data, max_size - size + 1)
+            size += len(chunk)
+            if size > max_size:
+                raise HTTPException(status_code=413, detail="Request body too large.")
+            chunks.append(chunk)
+
+            if not decompressor.eof:
+                raise HTTPException(status_code=400, detail="Invalid gzip body.")
+            data = decompressor.unused_data
+    except zlib.error:
+        raise HTTPException(status_code=400, detail="Invalid gzip body.")
+
+    return b"".join(chunks)
+
+
+class GzipRequest(Request):
+    """A request that decompresses the gzip encoded bodies."""
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            max_size = getattr(self.app, "max_body_size", DEFAULT_MAX_BODY_SIZE)
+            body = await super().body()
+            if "gzip" in self.headers.getlist("Content-Encoding"):
+                body = _decompress_gzip(body, max_size)
+            elif len(body) > max_size:
+                raise HTTPException(status_code=413, detail="Request body too large.")
+            self._body = body
+        return self._body
+
+
+class GzipRoute(APIRoute):
+    """A route that supports gzip encoded request bodies."""
+
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def custom_route_handler(request: Request) -> Response:
+            request = GzipRequest(request.scope, request.receive)
+            return await original_route_handler(request)
+
+        return custom_route_handler
+
+
 app = FastAPI(
     title="Guardrails Action Server API",
     description=api_description,
     version="0.1.0",
     license_info={"name": "Apache License, Version 2.0"},
 )
+app.router.route_class = GzipRoute
+
+# The maximum size of the request bodies, after decompression.
+app.max_body_size = DEFAULT_MAX_BODY_SIZE
+
+# Large responses (e.g., for batches of actions) are compressed when the client
+# accepts it.
+app.add_middleware(GZipMiddleware, minimum_size=64 * 1024)
 
 
 # Create action dispatcher object to communicate with actions
@@ -77,6 +149,63 @@ async def run_action(body: RequestBody):
     return resp
 
 
+class BatchRequestBody(BaseModel):
+    """Request body for executing a batch of actions."""
+
+    actions: List[RequestBody] = Field(
+        default_factory=list, description="The list of actions to execute."
+    )
+
+
+class BatchResponseItem(BaseModel):
+    """The result of an action in a batch."""
+
+    status: str = "success"  # success / failed
+    result: Optional[Any] = None
+
+
+class BatchResponseBody(BaseModel):
+    """Response body for the execution of a batch of actions."""
+
+    results: List[BatchResponseItem] = Field(
+        default_factory=list,
+        description="The results of the actions, in the same order as in the request.",
+    )
+
+
+@app.post(
+    "/v1/actions/run_batch",
+    summary="Execute a batch of actions",
+    response_model=BatchResponseBody,
+)
+async def run_actions_batch(body: BatchRequestBody):
+    """Execute the specified actions concurrently and return the results.
+
+    The request body can be gzip encoded, using the `Content-Encoding` header.
+
+    Args:
+        body (BatchRequestBody): The request body containing the list of actions.
+
+    Returns:
+        dict: The response containing the execution status and result for each action.
+    """
+
+    log.info(f"Batch request with {len(body.actions)} actions.")
+    outputs = await asyncio.gather(
+        *[
+            app.action_dispatcher.execute_action(
+                action.action_name, action.action_parameters
+            )
+            for action in body.actions
+        ]
+    )
+    resp = {
+        "results": [{"status": status, "result": result} for result, status in outputs]
+    }
+    log.info(f"Response: {resp}")
+    return resp
+
+
 @app.get(
     "/v1/actions/list",
     summary="List available actions",
@@ -0,0 +1,225 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Client for executing actions using an actions server."""
+
+import asyncio
+import gzip
+import json
+import logging
+import weakref
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urljoin
+
+import aiohttp
+
+log = logging.getLogger(__name__)
+
+# The maximum number of actions sent in a single batch request.
+DEFAULT_MAX_BATCH_SIZE = 32
+
+# The size, in bytes, above which the request payloads are compressed.
+DEFAULT_COMPRESSION_THRESHOLD = 64 * 1024
+
+
+class BatchingNotSupportedError(Exception):
+    """Raised when the actions server does not have the batch endpoint."""
+
+
+class ActionsServerClient:
+    """A client for the actions server, using a persistent connection pool.
+
+    The actions requested while processing the same event loop iteration (e.g., the
+    actions started concurrently by the same or by different conversations) are
+    grouped and sent using a single request to the `/v1/actions/run_batch` endpoint.
+    If the server does not support batching, the client falls back to sending one
+    request per action. The connection pools must be released using `close`.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        compression_threshold: Optional[int] = DEFAULT_COMPRESSION_THRESHOLD,
+    ):
+        """Constructor.
+
+        Args:
+            url: The URL of the actions server.
+            max_batch_size: The maximum number of actions sent in a single request.
+            compression_threshold: The size, in bytes, above which the request payloads
+              are compressed using gzip. If None, the payloads are never compressed.
+        """
+        self.url = url
+        self.max_batch_size = max_batch_size
+        self.compression_threshold = compression_threshold
+
+        # The actions waiting to be sent, as (data, future) tuples.
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+
+        # The running flush tasks, to keep a reference to them.
+        self._flush_tasks = set()
+
+        # Whether the server supports the batch endpoint (None when not known yet).
+        self._supports_batching: Optional[bool] = None
+
+        # The session for every event loop, as they can't be shared between loops.
+        self._sessions = weakref.WeakKeyDictionary()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the session for the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession()
+            self._sessions[loop] = session
+
+        return session
+
+    async def close(self):
+        """Closes the connection pools.
+
+        The pools of the event loops running in other threads are closed on their
+        loop. The ones of the loops that are not running can't be closed anymore.
+        """
+        current_loop = asyncio.get_running_loop()
+        sessions = list(self._sessions.items())
+        self._sessions = weakref.WeakKeyDictionary()
+
+        for loop, session in sessions:
+            if session.closed:
+                continue
+
+            if loop is current_loop:
+                await session.close()
+            elif loop.is_running():
+                await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(session.close(), loop)
+                )
+
+    async def _post(self, session: aiohttp.ClientSession, path: str, data: Any) -> Any:
+        """Sends a POST request to the actions server and returns the JSON response."""
+        body = json.dumps(data).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+
+        if (
+            self.compression_threshold is not None
+            and len(body) > self.compression_threshold
+        ):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+
+        async with session.post(
+            urljoin(self.url, path), data=body, headers=headers
+        ) as resp:
+            if resp.status == 404 and path.endswith("run_batch"):
+                raise BatchingNotSupportedError()
+
+            if resp.status != 200:
+                raise ValueError(f"Got status code {resp.status} from {path}")
+
+            return await resp.json()
+
+    async def _run_single(
+        self, session: aiohttp.ClientSession, data: dict
+    ) -> Tuple[Any, str]:
+        resp = await self._post(session, "/v1/actions/run", data)
+        return resp.get("result", {}), resp.get("status", "failed")
+
+    async def _flush(self):
+        """Sends all the pending actions."""
+        pending, self._pending = self._pending, []
+
+        session = self._get_session()
+        for i in range(0, len(pending), self.max_batch_size):
+            batch = pending[i : i + self.max_batch_size]
+            try:
+                results = await self._run_batch(session, [data for data, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, asyncio.CancelledError):
+                    future.cancel()
+                elif isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def _run_batch(
+        self, session: aiohttp.ClientSession, items: List[dict]
+    ) -> List[Union[Tuple[Any, str], BaseException]]:
+        """Runs a batch of actions, falling back to single requests if needed.
+
+        Only a missing batch endpoint results in single requests. Any other error of
+        the batch request is raised, as the actions may have already been executed.
+
+        Returns:
+            The result of every action, or the exception raised while running it.
+        """
+        if self._supports_batching is not False and len(items) > 1:
+            try:
+                resp = await self._post(
+                    session, "/v1/actions/run_batch", {"actions": items}
+                )
+                self._supports_batching = True
+                return [
+                    (item.get("result", {}), item.get("status", "failed"))
+                    for item in resp["results"]
+                ]
+            except BatchingNotSupportedError:
+                log.info("The actions server does not support batching.")
+                self._supports_batching = False
+
+        return await asyncio.gather(
+            *[self._run_single(session, data) for data in items],
+            return_exceptions=True,
+        )
+
+    async def run_action(
+        self, action_name: str, action_parameters: Dict[str, Any]
+    ) -> Tuple[Any, str]:
+        """Runs an action using the actions server.
+
+        Args:
+            action_name: The name of the action.
+            action_parameters: The parameters of the action.
+
+        Returns:
+            A tuple with the result and the status of the action.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        # The first pending action schedules the request; the actions added before
+        # the next iteration of the event loop are sent in the same batch.
+        if not self._pending:
+            task = loop.create_task(self._flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+        self._pending.append(
+            (
+                {"action_name": action_name, "action_parameters": action_parameters},
+                future,
+            )
+        )
+
+        return await future
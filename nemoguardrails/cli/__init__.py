@@ -18,16 +18,11 @@ import os
 from typing import List, Optional
 
 import typer
-import uvicorn
-from fastapi import FastAPI
 
 from nemoguardrails import __version__
-from nemoguardrails.actions_server import actions_server
-from nemoguardrails.cli.chat import run_chat
 from nemoguardrails.eval.cli import evaluate
 from nemoguardrails.eval.cli.simplify_formatter import SimplifyFormatter
 from nemoguardrails.logging.verbose import set_verbose
-from nemoguardrails.server import api
 from nemoguardrails.utils import init_random_seed
 
 app = typer.Typer()
@@ -96,6 +91,9 @@ def chat(
             simplify=verbose_simplify,
         )
 
+    # The commands import their dependencies (e.g., the server stack) only when used.
+    from nemoguardrails.cli.chat import run_chat
+
     run_chat(
         config_path=config[0],
         verbose=verbose,
@@ -135,6 +133,11 @@ def server(
     ),
 ):
     """Start a NeMo Guardrails server."""
+    import uvicorn
+    from fastapi import FastAPI
+
+    from nemoguardrails.server import api
+
     if config:
         # We make sure there is no trailing separator, as that might break things in
         # single config mode.
@@ -173,9 +176,17 @@ def action_server(
     port: int = typer.Option(
         default=8001, help="The port that the server should listen on. "
     ),
+    max_body_size: int = typer.Option(
+        default=32 * 1024 * 1024,
+        help="The maximum size, in bytes, of the request bodies, after decompression.",
+    ),
 ):
     """Start a NeMo Guardrails actions server."""
+    import uvicorn
+
+    from nemoguardrails.actions_server import actions_server
 
+    actions_server.app.max_body_size = max_body_size
     uvicorn.run(actions_server.app, port=port, log_level="info", host="0.0.0.0")
 
 
@@ -0,0 +1,217 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk cache for the result of parsing Colang files."""
+
+import hashlib
+import logging
+import os
+import pickle
+import stat
+import tempfile
+from typing import Optional
+
+from nemoguardrails.colang import parse_colang_file
+
+log = logging.getLogger(__name__)
+
+
+def _get_default_cache_folder() -> str:
+    """Returns the per-user folder where the parsed files are cached by default."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "nemoguardrails", "colang")
+
+
+def _is_private_folder(path: str) -> bool:
+    """Checks that a folder is owned by the current user and not writable by others.
+
+    The cache entries are unpickled, so they must not be writable by other users.
+    """
+    if not hasattr(os, "getuid"):
+        return True
+
+    st = os.stat(path)
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _get_package_version() -> str:
+    # Imported here to avoid a circular import.
+    from nemoguardrails import __version__
+
+    return __version__
+
+
+class ColangParseCache:
+    """A persistent cache for the parsed content of Colang files.
+
+    The entries are keyed by the hash of the content, the name of the file, the
+    Colang version and the version of the package, so that a change in any of them
+    results in a new parse. Each entry is stored as a separate pickle file.
+
+    The entries are only read and written if the cache folder is owned by the current
+    user and is not writable by other users.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """Constructor.
+
+        Args:
+            cache_dir: The folder where the cache entries are stored. If not set,
+                `$XDG_CACHE_HOME/nemoguardrails/colang` is used.
+        """
+        self.cache_dir = cache_dir or _get_default_cache_folder()
+        self.hits = 0
+        self.misses = 0
+
+        # Whether the cache folder can be used, checked on first use.
+        self._usable: Optional[bool] = None
+
+    @staticmethod
+    def get_key(
+        filename: str,
+        content: str,
+        version: str = "1.0",
+        include_source_mapping: bool = True,
+    ) -> str:
+        """Computes the cache key for the content of a Colang file."""
+        key_data = "\n".join(
+            [
+                _get_package_version(),
+                version,
+                str(include_source_mapping),
+                filename,
+                hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            ]
+        )
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".pkl")
+
+    def _is_usable(self) -> bool:
+        """Creates the cache folder, if needed, and checks that it is private."""
+        if self._usable is None:
+            try:
+                os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+                self._usable = _is_private_folder(self.cache_dir)
+            except OSError as e:
+                log.warning(f"Could not create the Colang parse cache folder: {e}")
+                self._usable = False
+            else:
+                if not self._usable:
+                    log.warning(
+                        f"The Colang parse cache folder {self.cache_dir} is not owned "
+                        f"by the current user or is writable by others, so it is not "
+                        f"used."
+                    )
+
+        return self._usable
+
+    def get(self, key: str) -> Optional[dict]:
+        """Returns the cached parse result for the key, if any."""
+        if not self._is_usable():
+            return None
+
+        try:
+            with open(self._get_path(key), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # A corrupt or incompatible entry is treated as a miss.
+            log.warning(f"Could not read the Colang parse cache entry {key}: {e}")
+            return None
+
+    def set(self, key: str, data: dict):
+        """Saves the parse result for the key.
+
+        The entry is written to a temporary file first, so that concurrent processes
+        never read a partially written entry.
+        """
+        if not self._is_usable():
+            return
+
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._get_path(key))
+        except Exception as e:
+            log.warning(f"Could not write the Colang parse cache entry {key}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_grammar_cache_path(self, grammar_path: str) -> Optional[str]:
+        """Returns the path where the parser tables for a Lark grammar are saved.
+
+        Returns None if the cache folder can't be used.
+        """
+        if not self._is_usable():
+            return None
+
+        return os.path.join(self.cache_dir, os.path.basename(grammar_path) + ".cache")
+
+    def parse_colang_file(
+        self,
+        filename: str,
+        content: str,
+        include_source_mapping: bool = True,
+        version: str = "1.0",
+    ) -> dict:
+        """Parses the content of a .co file, using the cached result when available."""
+        key = self.get_key(filename, content, version, include_source_mapping)
+
+        data = self.get(key)
+        if data is not None:
+            self.hits += 1
+            return data
+
+        self.misses += 1
+        data = parse_colang_file(
+            filename,
+            content=content,
+            include_source_mapping=include_source_mapping,
+            version=version,
+        )
+        self.set(key, data)
+
+        return data
+
+    def clear(self):
+        """Removes all the cache entries."""
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl") or name.endswith(".lark.cache"):
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+def get_colang_parse_cache() -> Optional[ColangParseCache]:
+    """Returns the parse cache to use, or None if it is disabled.
+
+    The cache is enabled by setting the `NEMO_GUARDRAILS_COLANG_CACHE` environment
+    variable to "true", and moved using `NEMO_GUARDRAILS_COLANG_CACHE_DIR`.
+    """
+    if os.environ.get("NEMO_GUARDRAILS_COLANG_CACHE", "false").lower() not in [
+        "true",
+        "1",
+    ]:
+        return None
+
+    return ColangParseCache(os.environ.get("NEMO_GUARDRAILS_COLANG_CACHE_DIR"))
@@ -13,14 +13,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
+import json
 import logging
 from abc import abstractmethod
-from typing import Any, Callable, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple
 
+from nemoguardrails.actions.action_cache import ActionResultCache
 from nemoguardrails.actions.action_dispatcher import ActionDispatcher
 from nemoguardrails.llm.taskmanager import LLMTaskManager
 from nemoguardrails.rails.llm.config import RailsConfig
 
+if TYPE_CHECKING:
+    from nemoguardrails.actions_server.client import ActionsServerClient
+
 log = logging.getLogger(__name__)
 
 
@@ -35,8 +41,15 @@ class Runtime:
         self.action_dispatcher = ActionDispatcher(
             config_path=config.config_path,
             import_paths=list(config.imported_paths.values()),
+            offload_sync_actions=config.rails.actions.offload_sync_actions,
+            thread_pool_max_workers=config.rails.actions.thread_pool_max_workers,
+            process_pool_max_workers=config.rails.actions.process_pool_max_workers,
+            action_cache=self._create_action_cache(),
         )
 
+        # The client for the actions server, created when first needed.
+        self._actions_server_client: Optional["ActionsServerClient"] = None
+
         # The list of additional parameters that can be passed to the actions.
         self.registered_action_params: dict = {}
 
@@ -45,6 +58,60 @@ class Runtime:
         # Initialize the prompt renderer as well.
         self.llm_task_manager = LLMTaskManager(config)
 
+    def _create_action_cache(self) -> ActionResultCache:
+        """Creates the cache for the actions declared using `@action(cache=...)`."""
+        cache_config = self.config.rails.actions.cache
+
+        datastore = None
+        if cache_config.store == "redis":
+            from nemoguardrails.server.datastore.redis_store import RedisStore
+
+            datastore = RedisStore(**cache_config.store_config)
+        elif cache_config.store != "memory":
+            raise ValueError(f"Unknown action cache store: {cache_config.store}")
+
+        # The keys saved in an external store also include a fingerprint of the
+        # configuration, so that the configurations sharing a store don't use each
+        # other's results.
+        return ActionResultCache(
+            datastore=datastore,
+            key_prefix=f"{cache_config.key_prefix}{self._get_config_fingerprint()}:",
+            enabled=cache_config.enabled,
+        )
+
+    def _get_config_fingerprint(self) -> str:
+        """Computes a short hash of the parts of the config that can change the
+        results of the actions (i.e., the config path, the models and the prompts).
+        """
+        data = json.dumps(
+            [
+                self.config.config_path,
+                [model.dict() for model in self.config.models],
+                [prompt.dict() for prompt in self.config.prompts or []],
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def actions_server_client(self) -> "ActionsServerClient":
+        """The client used for the actions executed by the actions server."""
+        if self._actions_server_client is None:
+            # Imported here, as `aiohttp` is only needed when there is an actions server.
+            from nemoguardrails.actions_server.client import ActionsServerClient
+
+            self._actions_server_client = ActionsServerClient(
+                self.config.actions_server_url
+            )
+        return self._actions_server_client
+
+    async def close(self):
+        """Releases the resources used by the runtime, e.g., the connections to the
+        actions server."""
+        if self._actions_server_client is not None:
+            await self._actions_server_client.close()
+
     @abstractmethod
     def _init_flow_configs(self) -> None:
         pass
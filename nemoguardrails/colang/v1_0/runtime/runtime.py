@@ -18,13 +18,13 @@ import logging
 import uuid
 from textwrap import indent
 from time import time
-from typing import Any, Dict, List, Optional, Tuple
-from urllib.parse import urljoin
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-import aiohttp
 from langchain.chains.base import Chain
 
-from nemoguardrails.actions.actions import ActionResult
+from nemoguardrails.actions.action_cache import ActionResultCache
+from nemoguardrails.actions.actions import ActionCacheOptions, ActionResult
+from nemoguardrails.actions.llm.speculation import SpeculativeTasks
 from nemoguardrails.colang import parse_colang_file
 from nemoguardrails.colang.runtime import Runtime
 from nemoguardrails.colang.v1_0.runtime.flows import (
@@ -32,7 +32,9 @@ from nemoguardrails.colang.v1_0.runtime.flows import (
     compute_context,
     compute_next_steps,
 )
+from nemoguardrails.context import generation_options_var
 from nemoguardrails.logging.processing_log import processing_log_var
+from nemoguardrails.rails.llm.options import GenerationOptions
 from nemoguardrails.utils import new_event_dict
 
 log = logging.getLogger(__name__)
@@ -150,6 +152,26 @@ class RuntimeV1_0(Runtime):
             {"type": "event", "timestamp": time(), "data": events[-1]}
         )
 
+        # The actions that are started as soon as the user message is known.
+        prefetched_actions = SpeculativeTasks(stats_prefix="prefetched")
+
+        try:
+            new_events = await self._generate_events(
+                events, new_events, processing_log, prefetched_actions
+            )
+        finally:
+            prefetched_actions.cancel_all()
+
+        return new_events
+
+    async def _generate_events(
+        self,
+        events: List[dict],
+        new_events: List[dict],
+        processing_log: List[dict],
+        prefetched_actions: SpeculativeTasks,
+    ) -> List[dict]:
+        """Processes the events until the `listen` event is produced."""
         while True:
             last_event = events[-1]
 
@@ -162,9 +184,15 @@ class RuntimeV1_0(Runtime):
                 str({k: v for k, v in last_event.items() if k != "type"}),
             )
 
+            # When a user message is received, we start the prefetchable actions.
+            if last_event["type"] == "UserMessage":
+                self._start_prefetch(events, prefetched_actions)
+
             # If we need to execute an action, we start doing that.
             if last_event["type"] == "StartInternalSystemAction":
-                next_events = await self._process_start_action(events)
+                next_events = await self._process_start_action(
+                    events, prefetched_actions=prefetched_actions
+                )
 
             # If we need to start a flow, we parse the content and register it.
             elif last_event["type"] == "start_flow":
@@ -259,12 +287,169 @@ class RuntimeV1_0(Runtime):
             ]
         )
 
-    async def _process_start_action(self, events: List[dict]) -> List[dict]:
+    def _get_action_kwargs(
+        self, fn: Any, action_params: dict, context: dict
+    ) -> Tuple[Dict[str, Any], Any, str]:
+        """
+        Compute the parameters for an action, based on the explicit ones and the context.
+
+        Args:
+            fn (Any): The action.
+            action_params (dict): The parameters passed explicitly to the action.
+            context (dict): The current context.
+
+        Returns:
+            Tuple[Dict[str, Any], Any, str]: The parameters, the names of the parameters
+              supported by the action and the type of the action.
+        """
+        # We pass all the parameters that are passed explicitly to the action.
+        kwargs = {**action_params}
+
+        parameters = []
+        action_type = "class"
+
+        if inspect.isfunction(fn) or inspect.ismethod(fn):
+            # We also add the "special" parameters.
+            parameters = inspect.signature(fn).parameters
+            action_type = "function"
+
+        elif isinstance(fn, Chain):
+            # If we're dealing with a chain, we list the annotations
+            # TODO: make some additional type checking here
+            parameters = fn.input_keys
+            action_type = "chain"
+
+        # For every parameter that start with "__context__", we pass the value
+        for parameter_name in parameters:
+            if parameter_name.startswith("__context__"):
+                var_name = parameter_name[11:]
+                kwargs[parameter_name] = context.get(var_name)
+
+        # If there are parameters which are variables, we replace with actual values.
+        for k, v in kwargs.items():
+            if isinstance(v, str) and v.startswith("$"):
+                var_name = v[1:]
+                if var_name in context:
+                    kwargs[k] = context[var_name]
+
+        return kwargs, parameters, action_type
+
+    def _is_remote_action(self, action_meta: dict, action_type: str) -> bool:
+        """Checks if an action should be executed by the actions server."""
+        return bool(
+            self.config.actions_server_url
+            and not action_meta.get("is_system_action")
+            and action_type != "chain"
+        )
+
+    def _add_special_kwargs(
+        self,
+        kwargs: Dict[str, Any],
+        parameters: Any,
+        action_name: str,
+        events: List[dict],
+        context: dict,
+    ):
+        """Add the "special" parameters for the local execution of an action."""
+        if "events" in parameters:
+            kwargs["events"] = events
+
+        if "context" in parameters:
+            kwargs["context"] = context
+
+        if "config" in parameters:
+            kwargs["config"] = self.config
+
+        if "llm_task_manager" in parameters:
+            kwargs["llm_task_manager"] = self.llm_task_manager
+
+        # Add any additional registered parameters
+        for k, v in self.registered_action_params.items():
+            if k in parameters:
+                kwargs[k] = v
+
+        if "llm" in kwargs and f"{action_name}_llm" in self.registered_action_params:
+            kwargs["llm"] = self.registered_action_params[f"{action_name}_llm"]
+
+    @staticmethod
+    def _get_prefetch_key(
+        action_name: str, action_meta: dict, kwargs: Dict[str, Any]
+    ) -> str:
+        """Computes the key used to check if a prefetched result can be used."""
+        prefetch = action_meta.get("prefetch")
+        key_params = prefetch if isinstance(prefetch, list) else None
+        return ActionResultCache.get_key(
+            action_name, kwargs, ActionCacheOptions(key_params=key_params)
+        )
+
+    def _get_flow_action_names(self) -> Set[str]:
+        """Returns the names of the actions executed by the flows."""
+        return {
+            element["action_name"]
+            for flow_config in self.flow_configs.values()
+            for element in flow_config.elements
+            if element.get("_type") == "run_action"
+        }
+
+    def _start_prefetch(self, events: List[dict], prefetched_actions: SpeculativeTasks):
+        """
+        Start the prefetchable actions, right after a user message.
+
+        Args:
+            events (List[dict]): The list of events, ending with the `UserMessage` event.
+            prefetched_actions (SpeculativeTasks): The tasks for the prefetched actions.
+        """
+        # If the dialog rails are disabled (e.g., when only the input rails are
+        # checked), the actions used by the dialog flows are not reached.
+        generation_options: GenerationOptions = generation_options_var.get()
+        if generation_options and generation_options.rails.dialog is False:
+            return
+
+        context = None
+        reachable_actions = None
+        for action_name, fn in self.action_dispatcher.registered_actions.items():
+            action_meta = getattr(fn, "action_meta", None) or {}
+            if not action_meta.get("prefetch"):
+                continue
+
+            # Only the actions used by at least one flow can be reached.
+            if reachable_actions is None:
+                reachable_actions = self._get_flow_action_names()
+            if action_name not in reachable_actions:
+                continue
+
+            # Actions that are registered as classes are not prefetched.
+            if inspect.isclass(fn):
+                continue
+
+            if context is None:
+                context = compute_context(events)
+
+            kwargs, parameters, action_type = self._get_action_kwargs(fn, {}, context)
+            if self._is_remote_action(action_meta, action_type):
+                continue
+
+            self._add_special_kwargs(kwargs, parameters, action_name, events, context)
+
+            log.info("Prefetching action :: %s", action_name)
+            prefetched_actions.start(
+                action_name,
+                self._get_prefetch_key(action_name, action_meta, kwargs),
+                self.action_dispatcher.execute_action(action_name, kwargs),
+            )
+
+    async def _process_start_action(
+        self,
+        events: List[dict],
+        prefetched_actions: Optional[SpeculativeTasks] = None,
+    ) -> List[dict]:
         """
         Start the specified action, wait for it to finish, and post back the result.
 
         Args:
             events (List[dict]): The list of events.
+            prefetched_actions (SpeculativeTasks, optional): The actions prefetched
+              for the current user message.
 
         Returns:
             List[dict]: The list of next steps.
@@ -291,79 +476,40 @@ class RuntimeV1_0(Runtime):
 
         else:
             context = compute_context(events)
-
-            # We pass all the parameters that are passed explicitly to the action.
-            kwargs = {**action_params}
-
             action_meta = getattr(fn, "action_meta", {})
 
-            parameters = []
-            action_type = "class"
-
-            if inspect.isfunction(fn) or inspect.ismethod(fn):
-                # We also add the "special" parameters.
-                parameters = inspect.signature(fn).parameters
-                action_type = "function"
-
-            elif isinstance(fn, Chain):
-                # If we're dealing with a chain, we list the annotations
-                # TODO: make some additional type checking here
-                parameters = fn.input_keys
-                action_type = "chain"
-
-            # For every parameter that start with "__context__", we pass the value
-            for parameter_name in parameters:
-                if parameter_name.startswith("__context__"):
-                    var_name = parameter_name[11:]
-                    kwargs[parameter_name] = context.get(var_name)
-
-            # If there are parameters which are variables, we replace with actual values.
-            for k, v in kwargs.items():
-                if isinstance(v, str) and v.startswith("$"):
-                    var_name = v[1:]
-                    if var_name in context:
-                        kwargs[k] = context[var_name]
+            kwargs, parameters, action_type = self._get_action_kwargs(
+                fn, action_params, context
+            )
 
             # If we have an action server, we use it for non-system/non-chain actions
-            if (
-                self.config.actions_server_url
-                and not action_meta.get("is_system_action")
-                and action_type != "chain"
-            ):
+            if self._is_remote_action(action_meta, action_type):
                 result, status = await self._get_action_resp(
                     action_meta, action_name, kwargs
                 )
             else:
                 # We don't send these to the actions server;
                 # TODO: determine if we should
-                if "events" in parameters:
-                    kwargs["events"] = events
-
-                if "context" in parameters:
-                    kwargs["context"] = context
-
-                if "config" in parameters:
-                    kwargs["config"] = self.config
-
-                if "llm_task_manager" in parameters:
-                    kwargs["llm_task_manager"] = self.llm_task_manager
-
-                # Add any additional registered parameters
-                for k, v in self.registered_action_params.items():
-                    if k in parameters:
-                        kwargs[k] = v
-
-                if (
-                    "llm" in kwargs
-                    and f"{action_name}_llm" in self.registered_action_params
-                ):
-                    kwargs["llm"] = self.registered_action_params[f"{action_name}_llm"]
-
-                log.info("Executing action :: %s", action_name)
-                result, status = await self.action_dispatcher.execute_action(
-                    action_name, kwargs
+                self._add_special_kwargs(
+                    kwargs, parameters, action_name, events, context
                 )
 
+                # If the action was prefetched with the same parameters, we use the result.
+                found = False
+                if prefetched_actions and action_name in prefetched_actions:
+                    found, output = await prefetched_actions.consume(
+                        action_name,
+                        self._get_prefetch_key(action_name, action_meta, kwargs),
+                    )
+                    if found:
+                        result, status = output
+
+                if not found:
+                    log.info("Executing action :: %s", action_name)
+                    result, status = await self.action_dispatcher.execute_action(
+                        action_name, kwargs
+                    )
+
             # If the action execution failed, we return a hardcoded message
             if status == "failed":
                 # TODO: make this message configurable.
@@ -445,25 +591,13 @@ class RuntimeV1_0(Runtime):
                     action_name, kwargs
                 )
             else:
-                url = urljoin(
-                    self.config.actions_server_url, "/v1/actions/run"
-                )  # action server execute action path
-                data = {"action_name": action_name, "action_parameters": kwargs}
-                async with aiohttp.ClientSession() as session:
-                    try:
-                        async with session.post(url, json=data) as resp:
-                            if resp.status != 200:
-                                raise ValueError(
-                                    f"Got status code {resp.status} while getting response from {action_name}"
-                                )
-
-                            resp = await resp.json()
-                            result, status = resp.get("result", result), resp.get(
-                                "status", status
-                            )
-                    except Exception as e:
-                        log.info(f"Exception {e} while making request to {action_name}")
-                        return result, status
+                try:
+                    result, status = await self.actions_server_client.run_action(
+                        action_name, kwargs
+                    )
+                except Exception as e:
+                    log.info(f"Exception {e} while making request to {action_name}")
+                    return result, status
 
         except Exception as e:
             log.info(f"Failed to get response from {action_name} due to exception {e}")
@@ -22,7 +22,11 @@ from lark.indenter import PythonIndenter
 def load_lark_parser(grammar_path: str):
     """Helper to load a Lark parser.
 
-    The result is cached so that it's faster in subsequent times.
+    The result is cached so that it's faster in subsequent times. Also, when the
+    Colang parse cache is enabled, the LALR tables computed from the grammar are saved
+    by Lark in the (private) cache folder, so that new processes (e.g., server workers)
+    can load them instead of computing them again. Lark invalidates the saved tables
+    when the grammar, the options or the version of Lark change.
 
     Args:
         grammar_path: The path to the .lark file with the grammar.
@@ -30,9 +34,17 @@ def load_lark_parser(grammar_path: str):
     Returns:
         A Lark parser instance.
     """
+    # Imported here to avoid a circular import.
+    from nemoguardrails.colang.parse_cache import get_colang_parse_cache
+
     with open(grammar_path, "r") as f:
         grammar = f.read()
 
+    parse_cache = get_colang_parse_cache()
+    cache_path = (
+        parse_cache.get_grammar_cache_path(grammar_path) if parse_cache else None
+    )
+
     return Lark(
         grammar,
         start="start",
@@ -40,4 +52,5 @@ def load_lark_parser(grammar_path: str):
         lexer="contextual",
         postlex=PythonIndenter(),
         propagate_positions=True,
+        cache=cache_path or False,
     )
@@ -17,9 +17,7 @@ import inspect
 import logging
 import re
 from typing import Any, Dict, List, Optional, Tuple, Union
-from urllib.parse import urljoin
 
-import aiohttp
 import langchain
 from langchain.chains.base import Chain
 
@@ -308,27 +306,13 @@ class RuntimeV2_x(Runtime):
                     action_name, kwargs
                 )
             else:
-                url = urljoin(
-                    self.config.actions_server_url, "/v1/actions/run"
-                )  # action server execute action path
-                data = {"action_name": action_name, "action_parameters": kwargs}
-                async with aiohttp.ClientSession() as session:
-                    try:
-                        async with session.post(url, json=data) as resp:
-                            if resp.status != 200:
-                                raise ValueError(
-                                    f"Got status code {resp.status} while getting response from {action_name}"
-                                )
-
-                            resp = await resp.json()
-                            result, status = resp.get("result", result), resp.get(
-                                "status", status
-                            )
-                    except Exception as e:
-                        log.info(
-                            "Exception %s while making request to %s", e, action_name
-                        )
-                        return result, status
+                try:
+                    result, status = await self.actions_server_client.run_action(
+                        action_name, kwargs
+                    )
+                except Exception as e:
+                    log.info("Exception %s while making request to %s", e, action_name)
+                    return result, status
 
         except Exception as e:
             error_message = (
@@ -436,7 +420,9 @@ class RuntimeV2_x(Runtime):
         local_running_actions: List[asyncio.Task[dict]] = []
 
         if state is None or state == {}:
-            state = State(flow_states={}, flow_configs=self.flow_configs)
+            # Each state gets its own copy of the flow configs, so that flows added
+            # dynamically (e.g., by `AddFlowsAction`) don't leak between conversations.
+            state = State(flow_states={}, flow_configs=dict(self.flow_configs))
             initialize_state(state)
         elif isinstance(state, dict):
             # TODO: Implement dict to State conversion
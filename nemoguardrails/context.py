@@ -29,6 +29,12 @@ generation_options_var = contextvars.ContextVar("generation_options", default=No
 # The stats about the LLM calls.
 llm_stats_var = contextvars.ContextVar("llm_stats", default=None)
 
+# The cache for the responses of deterministic LLM calls, if enabled.
+llm_response_cache_var = contextvars.ContextVar("llm_response_cache", default=None)
+
+# The tasks started speculatively while processing the current request.
+speculative_tasks_var = contextvars.ContextVar("speculative_tasks", default=None)
+
 # The raw LLM request that comes from the user.
 # This is used in passthrough mode.
 raw_llm_request = contextvars.ContextVar("raw_llm_request", default=None)
@@ -14,15 +14,24 @@
 # limitations under the License.
 
 import asyncio
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 from annoy import AnnoyIndex
 
 from nemoguardrails.embeddings.cache import cache_embeddings
 from nemoguardrails.embeddings.index import EmbeddingsIndex, IndexItem
 from nemoguardrails.embeddings.providers import EmbeddingModel, init_embedding_model
+from nemoguardrails.embeddings.quantization import (
+    EmbeddingsMatrix,
+    truncate_embeddings,
+)
 from nemoguardrails.rails.llm.config import EmbeddingsCacheConfig
 
+# When the embeddings are truncated, how many more candidates are fetched from the
+# index, to be rescored using all the dimensions.
+RESCORE_OVERFETCH = 4
+
 
 class BasicEmbeddingsIndex(EmbeddingsIndex):
     """Basic implementation of an embeddings index.
@@ -30,16 +39,28 @@ class BasicEmbeddingsIndex(EmbeddingsIndex):
     It uses the `sentence-transformers/all-MiniLM-L6-v2` model to compute embeddings.
     Annoy is employed for efficient nearest-neighbor search.
 
+    The embeddings are stored in a contiguous NumPy array, which can be quantized to
+    float16 or int8 values once the index is built. The Annoy index always keeps
+    float32 values, so the quantization does not change the search results by itself.
+    To reduce the size of the Annoy index, the embeddings can also be truncated to
+    their first dimensions (for models trained with Matryoshka representation
+    learning); the candidates found are then rescored using all the dimensions, read
+    from the stored embeddings (see `set_embeddings_source`) or from the array. In the
+    latter case, the array is kept as float32 values (i.e., it is not quantized), so
+    the rescoring is done at full precision.
+
     Attributes:
         embedding_model (str): The model for computing embeddings.
         embedding_engine (str): The engine for computing embeddings.
         index (AnnoyIndex): The current embedding index.
         embedding_size (int): The size of the embeddings.
         cache_config (EmbeddingsCacheConfig): The cache configuration.
-        embeddings (List[List[float]]): The computed embeddings.
+        embeddings (np.ndarray): The computed embeddings.
         use_batching: Whether to batch requests when computing the embeddings.
         max_batch_size: The maximum size of a batch.
         max_batch_hold: The maximum time a batch is held before being processed
+        quantization: The type used to store the embeddings after the index is built.
+        embedding_dimensions: The number of dimensions used by the Annoy index.
     """
 
     embedding_model: str
@@ -47,10 +68,12 @@ class BasicEmbeddingsIndex(EmbeddingsIndex):
     index: AnnoyIndex
     embedding_size: int
     cache_config: EmbeddingsCacheConfig
-    embeddings: List[List[float]]
+    embeddings: np.ndarray
     use_batching: bool
     max_batch_size: int
     max_batch_hold: float
+    quantization: Optional[str]
+    embedding_dimensions: Optional[int]
 
     def __init__(
         self,
@@ -61,6 +84,8 @@ class BasicEmbeddingsIndex(EmbeddingsIndex):
         use_batching: bool = False,
         max_batch_size: int = 10,
         max_batch_hold: float = 0.01,
+        quantization: Optional[str] = None,
+        embedding_dimensions: Optional[int] = None,
     ):
         """Initialize the BasicEmbeddingsIndex.
 
@@ -72,10 +97,17 @@ class BasicEmbeddingsIndex(EmbeddingsIndex):
             use_batching: Whether to batch requests when computing the embeddings.
             max_batch_size: The maximum size of a batch.
             max_batch_hold: The maximum time a batch is held before being processed
+            quantization: The type used to store the embeddings after the index is
+                built; one of "float16" and "int8". If not set, float32 is used.
+            embedding_dimensions: If set, only the first dimensions of the embeddings
+                are used by the Annoy index, and the results are rescored using all of
+                them.
         """
         self._model: Optional[EmbeddingModel] = None
         self._items = []
-        self._embeddings = []
+        self._embeddings = EmbeddingsMatrix(quantization)
+        self.quantization = quantization
+        self.embedding_dimensions = embedding_dimensions
         self.embedding_model = embedding_model
         self.embedding_engine = embedding_engine
         self._embedding_size = 0
@@ -85,6 +117,12 @@ class BasicEmbeddingsIndex(EmbeddingsIndex):
             self._cache_config = cache_config or EmbeddingsCacheConfig()
         self._index = index
 
+        # Returns the float32 embeddings of the items with the given ids, when they are
+        # stored outside of the index (e.g., memory-mapped from disk).
+        self._get_stored_embeddings: Optional[
+            Callable[[Sequence[int]], np.ndarray]
+        ] = None
+
         # Data structures for batching embedding requests
         self._req_queue = {}
         self._req_results = {}
@@ -114,9 +152,32 @@ class BasicEmbeddingsIndex(EmbeddingsIndex):
         return self._embedding_size
 
     @property
-    def embeddings(self):
-        """Get the computed embeddings."""
-        return self._embeddings
+    def embeddings(self) -> np.ndarray:
+        """Get the computed embeddings, as float32 values."""
+        if self._get_stored_embeddings is not None:
+            return self._get_stored_embeddings(range(len(self._items)))
+
+        return self._embeddings.get()
+
+    def set_embeddings_source(
+        self,
+        get_embeddings: Callable[[Sequence[int]], np.ndarray],
+        embedding_size: int,
+    ):
+        """Sets where the embeddings of the items are read from, when the Annoy index
+        is provided.
+
+        They are used for rescoring the results, if the embeddings are truncated. Only
+        the embeddings of the candidates are read, so they are not loaded in memory.
+
+        Args:
+            get_embeddings: Returns the float32 embeddings of the items with the
+                given ids.
+            embedding_size: The size of the embeddings.
+        """
+        self._get_stored_embeddings = get_embeddings
+        self._embeddings = EmbeddingsMatrix(self.quantization)
+        self._embedding_size = embedding_size
 
     @embeddings_index.setter
     def embeddings_index(self, index):
@@ -158,31 +219,59 @@ class BasicEmbeddingsIndex(EmbeddingsIndex):
             self._embeddings.append((await self._get_embeddings([item.text]))[0])
 
             # Update the embedding if it was not computed up to this point
-            self._embedding_size = len(self._embeddings[0])
+            self._embedding_size = self._embeddings.embedding_size
 
-    async def add_items(self, items: List[IndexItem]):
+    async def add_items(
+        self,
+        items: List[IndexItem],
+        embeddings: Optional[List[List[float]]] = None,
+    ):
         """Add multiple items to the index at once.
 
         Args:
             items (List[IndexItem]): The list of items to add to the index.
+            embeddings (List[List[float]], optional): The precomputed embeddings for the
+                items. If not provided, they are computed.
         """
         self._items.extend(items)
 
         # If the index is already built, we skip this
         if self._index is None:
-            self._embeddings.extend(
-                await self._get_embeddings([item.text for item in items])
-            )
+            if embeddings is None:
+                embeddings = await self._get_embeddings([item.text for item in items])
+            self._embeddings.append(embeddings)
 
             # Update the embedding if it was not computed up to this point
-            self._embedding_size = len(self._embeddings[0])
+            self._embedding_size = self._embeddings.embedding_size
+
+    def _build_index(self) -> AnnoyIndex:
+        """Builds the Annoy index from the computed embeddings.
+
+        The index uses the full precision embeddings, which are quantized afterwards,
+        unless they are needed to rescore the results of a truncated index.
+        """
+        embeddings = truncate_embeddings(
+            self._embeddings.get(), self.embedding_dimensions
+        )
+
+        index = AnnoyIndex(embeddings.shape[1], "angular")
+        for i in range(len(embeddings)):
+            index.add_item(i, embeddings[i])
+        index.build(10)
+
+        # The results of a truncated index are rescored using the float32 embeddings.
+        if embeddings.shape[1] == self._embeddings.embedding_size:
+            self._embeddings.quantize()
+
+        return index
 
     async def build(self):
-        """Builds the Annoy index."""
-        self._index = AnnoyIndex(len(self._embeddings[0]), "angular")
-        for i in range(len(self._embeddings)):
-            self._index.add_item(i, self._embeddings[i])
-        self._index.build(10)
+        """Builds the Annoy index.
+
+        The build runs in a separate thread, so it does not block the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        self._index = await loop.run_in_executor(None, self._build_index)
 
     async def _run_batch(self):
         """Runs the current batch of embeddings."""
@@ -262,14 +351,94 @@ class BasicEmbeddingsIndex(EmbeddingsIndex):
         Returns:
             List[IndexItem]: The closest items found.
         """
-        if self.use_batching:
-            _embedding = await self._batch_get_embeddings(text)
-        else:
-            _embedding = (await self._get_embeddings([text]))[0]
+        _embedding = await self.get_embedding(text)
+
+        ids, _ = self._search_ids(_embedding, max_results)
 
-        results = self._index.get_nns_by_vector(
-            _embedding,
-            max_results,
+        return [self._items[i] for i in ids]
+
+    def _search_ids(
+        self, embedding: Sequence[float], count: int
+    ) -> Tuple[List[int], List[float]]:
+        """Searches the ids of the closest `count` items, with their angular distances.
+
+        If the Annoy index uses truncated embeddings, more candidates are fetched, and
+        they are rescored using all the dimensions of the stored embeddings.
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+
+        # The query is always truncated to the dimensions of the Annoy index.
+        index_query = truncate_embeddings(query, self._index.f)
+
+        rescore = query.shape[0] > self._index.f and (
+            self._get_stored_embeddings is not None or len(self._embeddings) > 0
         )
+        if not rescore:
+            return self._index.get_nns_by_vector(
+                index_query, count, include_distances=True
+            )
+
+        ids = self._index.get_nns_by_vector(index_query, count * RESCORE_OVERFETCH)
+        if not ids:
+            return [], []
+
+        if self._get_stored_embeddings is not None:
+            candidates = self._get_stored_embeddings(ids)
+        else:
+            candidates = self._embeddings.get(ids)
+        norms = np.linalg.norm(candidates, axis=1) * (np.linalg.norm(query) or 1)
+        similarities = candidates @ query / np.where(norms == 0, 1, norms)
+
+        # The same distance as the Annoy "angular" metric, i.e., sqrt(2 * (1 - cos)).
+        distances = np.sqrt(np.maximum(0, 2 - 2 * similarities))
+        order = np.argsort(distances, kind="stable")[:count]
+
+        return [ids[i] for i in order], [float(distances[i]) for i in order]
+
+    async def get_embedding(self, text: str) -> List[float]:
+        """Computes the embedding for a single text, batching the requests if enabled.
+
+        Args:
+            text (str): The text to compute the embedding for.
 
-        return [self._items[i] for i in results]
+        Returns:
+            List[float]: The computed embedding.
+        """
+        if self.use_batching:
+            return await self._batch_get_embeddings(text)
+
+        return (await self._get_embeddings([text]))[0]
+
+    def search_by_embedding(
+        self,
+        embedding: List[float],
+        max_results: int = 20,
+        filter_fn: Optional[Callable[[IndexItem], bool]] = None,
+    ) -> List[Tuple[IndexItem, float]]:
+        """Search the closest `max_results` items to an embedding.
+
+        Annoy can't filter while searching, so when a filter is provided, more items
+        are fetched until enough of them match, or the whole index was searched.
+
+        Args:
+            embedding (List[float]): The embedding to search for.
+            max_results (int, optional): The maximum number of results to return. Defaults to 20.
+            filter_fn (Callable[[IndexItem], bool], optional): A function to select the items.
+
+        Returns:
+            List[Tuple[IndexItem, float]]: The closest items found, with their distances.
+        """
+        num_items = len(self._items)
+        count = max_results
+        while True:
+            ids, distances = self._search_ids(embedding, count)
+            results = [
+                (self._items[i], distance)
+                for i, distance in zip(ids, distances)
+                if filter_fn is None or filter_fn(self._items[i])
+            ]
+
+            if len(results) >= max_results or count >= num_items:
+                return results[:max_results]
+
+            count = min(count * 4, num_items)
@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from typing import Dict, Optional
+
+
+class IndexingProgress:
+    """Tracks the progress of building the embeddings indexes of a configuration.
+
+    The indexes are built in separate threads, so the progress can be read from
+    any thread (e.g., by the server, to report that a configuration is warming up).
+
+    The progress is organized in stages (e.g., "embeddings", "flows_index", "kb"), each
+    with a number of items that are processed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, dict] = {}
+        self._ready = threading.Event()
+        self._error: Optional[str] = None
+
+    def start(self, stage: str, total: int = 0):
+        """Marks the start of a stage with the given number of items."""
+        with self._lock:
+            self._stages[stage] = {"total": total, "done": 0, "finished": False}
+
+    def advance(self, stage: str, count: int = 1):
+        """Records that `count` more items were processed for a stage."""
+        with self._lock:
+            self._stages[stage]["done"] += count
+
+    def finish(self, stage: str):
+        """Marks a stage as finished."""
+        with self._lock:
+            info = self._stages.setdefault(stage, {"total": 0, "done": 0})
+            info["done"] = info["total"]
+            info["finished"] = True
+
+    def set_ready(self):
+        """Marks all the indexes as ready to be used."""
+        self._ready.set()
+
+    def set_failed(self, error: str):
+        """Marks the building of the indexes as failed, with the given error."""
+        with self._lock:
+            self._error = error
+        self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        """Whether all the indexes are ready to be used."""
+        return self._ready.is_set() and self._error is None
+
+    @property
+    def error(self) -> Optional[str]:
+        """The error that made the building of the indexes fail, if any."""
+        return self._error
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all the indexes are ready, or their building failed.
+
+        Returns:
+            Whether the indexes are ready (i.e., False if the timeout expired or the
+            building failed).
+        """
+        return self._ready.wait(timeout) and self._error is None
+
+    def to_dict(self) -> dict:
+        """Returns a snapshot of the progress."""
+        with self._lock:
+            stages = {stage: dict(info) for stage, info in self._stages.items()}
+
+        total = sum(info["total"] for info in stages.values())
+        done = sum(info["done"] for info in stages.values())
+
+        result = {
+            "ready": self.ready,
+            "progress": 1.0 if self.ready or total == 0 else done / total,
+            "stages": stages,
+        }
+        if self._error is not None:
+            result["error"] = self._error
+
+        return result
@@ -16,6 +16,7 @@
 
 from __future__ import annotations
 
+import threading
 from typing import Optional, Type
 
 from . import fastembed, nim, openai, sentence_transformers
@@ -59,6 +60,10 @@ def register_embedding_provider(
 # The cache for embedding models, to make sure they are singleton.
 _embedding_model_cache = {}
 
+# The indexes can be initialized concurrently from multiple threads, so we make sure
+# a model is only loaded once.
+_embedding_model_cache_lock = threading.Lock()
+
 
 # Add all the implemented embedding providers to the registry.
 # As we are not using the `Registered` class, we need to manually register the providers.
@@ -86,8 +91,9 @@ def init_embedding_model(embedding_model: str, embedding_engine: str) -> Embeddi
 
     model_key = f"{embedding_engine}-{embedding_model}"
 
-    if model_key not in _embedding_model_cache:
-        model = EmbeddingProviderRegistry().get(embedding_engine)(embedding_model)
-        _embedding_model_cache[model_key] = model
+    with _embedding_model_cache_lock:
+        if model_key not in _embedding_model_cache:
+            model = EmbeddingProviderRegistry().get(embedding_engine)(embedding_model)
+            _embedding_model_cache[model_key] = model
 
     return _embedding_model_cache[model_key]
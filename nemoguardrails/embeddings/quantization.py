@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compact in-memory storage for the embeddings of an index."""
+
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+QUANTIZATION_TYPES = ["float16", "int8"]
+
+
+def truncate_embeddings(
+    embeddings: np.ndarray, embedding_dimensions: Optional[int]
+) -> np.ndarray:
+    """Keeps the first `embedding_dimensions` of the embeddings, and re-normalizes them.
+
+    This is meant for the models trained with Matryoshka representation learning,
+    which concentrate most of the information in the first dimensions.
+    """
+    if not embedding_dimensions or embedding_dimensions >= embeddings.shape[-1]:
+        return embeddings
+
+    truncated = embeddings[..., :embedding_dimensions]
+    norms = np.linalg.norm(truncated, axis=-1, keepdims=True)
+
+    return truncated / np.where(norms == 0, 1, norms)
+
+
+class EmbeddingsMatrix:
+    """Stores embeddings as a contiguous NumPy array, optionally quantized.
+
+    The embeddings are appended as float32 values. After `quantize` is called, they are
+    kept as float16 values, or as int8 values with a float32 scale per embedding, and
+    are converted back to float32 when read.
+    """
+
+    def __init__(self, quantization: Optional[str] = None):
+        """Constructor.
+
+        Args:
+            quantization: The type used to store the embeddings once quantized; one of
+                "float16" and "int8". If not set, they are kept as float32.
+        """
+        if quantization is not None and quantization not in QUANTIZATION_TYPES:
+            raise ValueError(
+                f"Unknown quantization type: {quantization}. "
+                f"Supported types are: {QUANTIZATION_TYPES}."
+            )
+
+        self.quantization = quantization
+        self.quantized = False
+
+        self._blocks: List[np.ndarray] = []
+        self._data: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return sum(len(block) for block in self._blocks) + (
+            0 if self._data is None else len(self._data)
+        )
+
+    @property
+    def embedding_size(self) -> int:
+        """The size of the stored embeddings."""
+        data = self._get_data()
+        return 0 if data is None else data.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the stored embeddings, in bytes."""
+        data = self._get_data()
+        if data is None:
+            return 0
+
+        return data.nbytes + (0 if self._scales is None else self._scales.nbytes)
+
+    def append(self, embeddings: Union[np.ndarray, Sequence[Sequence[float]]]):
+        """Appends embeddings, before the matrix is quantized."""
+        if self.quantized:
+            raise ValueError("Embeddings can't be added after quantization.")
+
+        values = np.asarray(embeddings, dtype=np.float32)
+        if values.ndim == 1:
+            values = values.reshape(1, -1)
+
+        # The blocks are concatenated once, when the embeddings are read.
+        self._blocks.append(values)
+
+    def _get_data(self) -> Optional[np.ndarray]:
+        """Returns the stored embeddings, as a single array."""
+        if self._blocks:
+            blocks = self._blocks if self._data is None else [self._data, *self._blocks]
+            self._data = np.ascontiguousarray(np.concatenate(blocks))
+            self._blocks = []
+
+        return self._data
+
+    def quantize(self):
+        """Converts the stored embeddings to the configured quantization type."""
+        data = self._get_data()
+        if self.quantized or self.quantization is None or data is None:
+            return
+
+        if self.quantization == "float16":
+            self._data = data.astype(np.float16)
+        else:
+            # Symmetric quantization, with a scale for every embedding.
+            scales = np.abs(data).max(axis=1) / 127
+            scales[scales == 0] = 1
+            self._data = np.round(data / scales[:, None]).astype(np.int8)
+            self._scales = scales.astype(np.float32)
+
+        self.quantized = True
+
+    def get(self, ids: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Returns the embeddings with the given ids (or all of them) as float32 values.
+
+        Args:
+            ids: The positions of the embeddings, in the order they were added.
+        """
+        data = self._get_data()
+        if data is None:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        if ids is not None:
+            ids = np.asarray(ids, dtype=np.int64)
+            data = data[ids]
+
+        values = data.astype(np.float32)
+        if self._scales is not None:
+            scales = self._scales if ids is None else self._scales[ids]
+            values *= scales[:, None]
+
+        return values
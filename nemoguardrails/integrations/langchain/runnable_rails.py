@@ -15,18 +15,26 @@
 
 from __future__ import annotations
 
-from typing import Any, List, Optional
+import asyncio
+from typing import Any, AsyncIterator, List, Optional, Union
 
 from langchain_core.language_models import BaseLanguageModel
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
 from langchain_core.prompt_values import ChatPromptValue, StringPromptValue
 from langchain_core.runnables import Runnable
-from langchain_core.runnables.config import RunnableConfig
+from langchain_core.runnables.config import RunnableConfig, get_config_list
 from langchain_core.runnables.utils import Input, Output
 from langchain_core.tools import Tool
 
 from nemoguardrails import LLMRails, RailsConfig
-from nemoguardrails.rails.llm.options import GenerationOptions
+from nemoguardrails.patch_asyncio import check_sync_call_from_async_loop
+from nemoguardrails.rails.llm.options import GenerationOptions, GenerationResponse
+from nemoguardrails.streaming import StreamingHandler
+from nemoguardrails.utils import get_or_create_event_loop
+
+# The maximum number of inputs processed concurrently by `batch`/`abatch`, when
+# `max_concurrency` is not set in the config.
+DEFAULT_MAX_CONCURRENCY = 16
 
 
 class RunnableRails(Runnable[Input, Output]):
@@ -175,17 +183,8 @@ class RunnableRails(Runnable[Input, Output]):
 
         return messages
 
-    def invoke(
-        self,
-        input: Input,
-        config: Optional[RunnableConfig] = None,
-        **kwargs: Optional[Any],
-    ) -> Output:
-        """Invoke this runnable synchronously."""
-        input_messages = self._transform_input_to_rails_format(input)
-        res = self.rails.generate(
-            messages=input_messages, options=GenerationOptions(output_vars=True)
-        )
+    def _format_output(self, input: Input, res: GenerationResponse) -> Output:
+        """Transforms the response from the rails to the output format for the input."""
         context = res.output_data
         result = res.response
 
@@ -232,3 +231,131 @@ class RunnableRails(Runnable[Input, Output]):
                     return {"output": result}
             else:
                 raise ValueError(f"Unexpected input type: {type(input)}")
+
+    def _format_chunk(self, input: Input, chunk: str) -> Output:
+        """Transforms a streamed chunk to the output format for the input."""
+        if self.passthrough and self.passthrough_runnable:
+            if isinstance(input, str):
+                return chunk
+            return {self.passthrough_bot_output_key: chunk}
+        elif isinstance(input, ChatPromptValue):
+            return AIMessageChunk(content=chunk)
+        elif isinstance(input, StringPromptValue):
+            return chunk
+        elif isinstance(input, dict):
+            return {"output": chunk}
+        else:
+            raise ValueError(f"Unexpected input type: {type(input)}")
+
+    def invoke(
+        self,
+        input: Input,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Optional[Any],
+    ) -> Output:
+        """Invoke this runnable synchronously."""
+        input_messages = self._transform_input_to_rails_format(input)
+        res = self.rails.generate(
+            messages=input_messages, options=GenerationOptions(output_vars=True)
+        )
+
+        return self._format_output(input, res)
+
+    async def ainvoke(
+        self,
+        input: Input,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Optional[Any],
+    ) -> Output:
+        """Invoke this runnable asynchronously."""
+        input_messages = self._transform_input_to_rails_format(input)
+        res = await self.rails.generate_async(
+            messages=input_messages, options=GenerationOptions(output_vars=True)
+        )
+
+        return self._format_output(input, res)
+
+    async def abatch(
+        self,
+        inputs: List[Input],
+        config: Optional[Union[RunnableConfig, List[RunnableConfig]]] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Optional[Any],
+    ) -> List[Output]:
+        """Invoke this runnable on a list of inputs, concurrently.
+
+        The number of inputs processed at the same time is limited by the
+        `max_concurrency` in the config (`DEFAULT_MAX_CONCURRENCY` if not set).
+        """
+        if not inputs:
+            return []
+
+        configs = get_config_list(config, len(inputs))
+        max_concurrency = configs[0].get("max_concurrency") or DEFAULT_MAX_CONCURRENCY
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _ainvoke(_input: Input, _config: RunnableConfig):
+            async with semaphore:
+                try:
+                    return await self.ainvoke(_input, _config, **kwargs)
+                except Exception as ex:
+                    if return_exceptions:
+                        return ex
+                    raise
+
+        return await asyncio.gather(
+            *[_ainvoke(_input, _config) for _input, _config in zip(inputs, configs)]
+        )
+
+    def batch(
+        self,
+        inputs: List[Input],
+        config: Optional[Union[RunnableConfig, List[RunnableConfig]]] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Optional[Any],
+    ) -> List[Output]:
+        """Synchronous version of `abatch`.
+
+        All the inputs are processed on the same event loop, rather than one thread
+        (and event loop) per input.
+        """
+        if check_sync_call_from_async_loop():
+            raise RuntimeError(
+                "You are using the sync `batch` inside async code. "
+                "You should replace with `await abatch(...)` or use `nest_asyncio.apply()`."
+            )
+
+        loop = get_or_create_event_loop()
+
+        return loop.run_until_complete(
+            self.abatch(inputs, config, return_exceptions=return_exceptions, **kwargs)
+        )
+
+    async def astream(
+        self,
+        input: Input,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Optional[Any],
+    ) -> AsyncIterator[Output]:
+        """Stream the output of this runnable, as it is generated."""
+        input_messages = self._transform_input_to_rails_format(input)
+        streaming_handler = StreamingHandler()
+
+        generation_task = asyncio.create_task(
+            self.rails.generate_async(
+                messages=input_messages, streaming_handler=streaming_handler
+            )
+        )
+
+        # If the generation fails, we make sure the stream is closed.
+        generation_task.add_done_callback(
+            lambda _: asyncio.create_task(streaming_handler.push_chunk(None))
+        )
+
+        async for chunk in streaming_handler:
+            yield self._format_chunk(input, chunk)
+
+        # We also surface any errors from the generation.
+        await generation_task
@@ -0,0 +1,178 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A BM25 inverted index, for the lexical search in the knowledge base."""
+
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Identifiers like product codes (e.g., "XR-200") or error names (e.g., "E_TIMEOUT")
+# are kept as a single token, and their parts are also indexed.
+_TOKEN_PATTERN = re.compile(r"\w+(?:[-.:/]\w+)*")
+_TOKEN_SEPARATORS = re.compile(r"[-_.:/]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits a text into lowercase tokens."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+
+        parts = [part for part in _TOKEN_SEPARATORS.split(token) if part]
+        if len(parts) > 1:
+            tokens.extend(parts)
+
+    return tokens
+
+
+class BM25Index:
+    """An inverted index which scores the documents using BM25.
+
+    The documents are identified by their position in the list used to build the index.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Constructor.
+
+        Args:
+            k1: The term frequency saturation parameter.
+            b: The document length normalization parameter.
+        """
+        self.k1 = k1
+        self.b = b
+
+        # For every term, the list of (document id, term frequency) pairs.
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.doc_lengths: List[int] = []
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.doc_lengths)
+
+    def build(self, texts: List[str]):
+        """Builds the index for the provided texts."""
+        self.postings = {}
+        self.doc_lengths = []
+
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            self.doc_lengths.append(len(tokens))
+
+            for term, frequency in Counter(tokens).items():
+                self.postings.setdefault(term, []).append((doc_id, frequency))
+
+    def search(
+        self,
+        text: str,
+        max_results: int,
+        filter_fn: Optional[Callable[[int], bool]] = None,
+    ) -> List[Tuple[int, float]]:
+        """Searches the documents that best match the text.
+
+        Args:
+            text: The text to search for.
+            max_results: The maximum number of results.
+            filter_fn: An optional function to select the documents, by id.
+
+        Returns:
+            The ids of the best matching documents, with their scores, best first. Only the
+            documents that contain at least one of the terms are returned.
+        """
+        if self.num_docs == 0:
+            return []
+
+        avg_doc_length = sum(self.doc_lengths) / self.num_docs
+
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(text)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+
+            idf = math.log(
+                (self.num_docs - len(postings) + 0.5) / (len(postings) + 0.5) + 1
+            )
+            for doc_id, frequency in postings:
+                length_norm = (
+                    1
+                    - self.b
+                    + self.b * self.doc_lengths[doc_id] / (avg_doc_length or 1)
+                )
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                    frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                )
+
+        if filter_fn is not None:
+            scores = {
+                doc_id: score for doc_id, score in scores.items() if filter_fn(doc_id)
+            }
+
+        return heapq.nlargest(max_results, scores.items(), key=lambda item: item[1])
+
+    def save(self, path: str):
+        """Saves the index to a file, atomically."""
+        data = {
+            "version": INDEX_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+        }
+
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BM25Index"]:
+        """Loads an index from a file.
+
+        Returns:
+            The index, or None if the file does not exist or can't be used.
+        """
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+
+            if data.get("version") != INDEX_VERSION:
+                return None
+
+            index = cls(k1=data["k1"], b=data["b"])
+            index.doc_lengths = data["doc_lengths"]
+            index.postings = {
+                term: [tuple(posting) for posting in postings]
+                for term, postings in data["postings"].items()
+            }
+            return index
+        except Exception as e:
+            log.warning(f"Could not load the BM25 index {path}: {e}")
+            return None
@@ -13,20 +13,49 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import hashlib
 import logging
 import os
 from time import time
-from typing import Callable, List, Optional, cast
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 from nemoguardrails.embeddings.index import EmbeddingsIndex, IndexItem
-from nemoguardrails.kb.utils import split_markdown_in_topic_chunks
-from nemoguardrails.rails.llm.config import EmbeddingSearchProvider, KnowledgeBaseConfig
+from nemoguardrails.kb.bm25 import BM25Index
+from nemoguardrails.kb.utils import iter_markdown_topic_chunks
+from nemoguardrails.rails.llm.config import (
+    Document,
+    EmbeddingSearchProvider,
+    KnowledgeBaseConfig,
+)
+
+if TYPE_CHECKING:
+    from nemoguardrails.kb.store import ChunkEmbeddingsStore
 
 log = logging.getLogger(__name__)
 
 CACHE_FOLDER = os.path.join(os.getcwd(), ".cache")
 
+# The maximum number of chunks that are embedded in a single call.
+EMBEDDING_BATCH_SIZE = 64
+
+# The name of the collection for the documents that are not in a named collection.
+DEFAULT_COLLECTION = "default"
+
+# For the providers that can't filter the results, how many more results are fetched
+# when searching with a filter.
+FILTER_OVERFETCH = 4
+
 
 class KnowledgeBase:
     """
@@ -36,20 +65,22 @@ class KnowledgeBase:
     It utilizes an embedding search provider to build and search an index for relevant information.
 
     Parameters:
-    - documents (List[str]): A list of documents to initialize the knowledge base.
+    - documents (List[Union[str, Document]]): A list of documents to initialize the knowledge base.
     - config (KnowledgeBaseConfig): Configuration for the knowledge base.
     - get_embedding_search_provider_instance (Callable[[Optional[EmbeddingSearchProvider]], EmbeddingsIndex]):
       A callable function to get an instance of the embedding search provider.
 
     Methods:
     - init(): Initializes the knowledge base by splitting documents into topic chunks.
-    - build(): Builds the knowledge base index, utilizing the configured embedding search provider.
-    - search_relevant_chunks(text: str, max_results: int = 3): Searches the index for the most relevant chunks.
+    - build(): Builds the knowledge base indexes, utilizing the configured embedding search provider.
+    - search_relevant_chunks(text: str, max_results: int = 3, filter: Optional[dict] = None):
+      Searches the indexes for the most relevant chunks.
 
     Attributes:
-    - documents (List[str]): The list of documents provided during initialization.
+    - documents (List[Union[str, Document]]): The list of documents provided during initialization.
     - chunks (List[dict]): A list of topic chunks extracted from the documents.
-    - index (EmbeddingsIndex): The knowledge base index used for searching.
+    - indexes (Dict[str, EmbeddingsIndex]): The index for every collection of documents.
+    - index (EmbeddingsIndex): The index of the default collection.
     - config (KnowledgeBaseConfig): Configuration for the knowledge base.
 
     Example:
@@ -68,11 +99,15 @@ class KnowledgeBase:
     Note:
     - The knowledge base supports markdown format documents.
     - The index is built using an embedding search provider, and the result is cached for future use.
+    - For the default provider, the embeddings of the chunks are also persisted, so that only the
+      new or changed chunks are embedded when the documents change.
+    - The documents can be grouped in named collections, each with a separate index. The search
+      can be restricted to some collections, or to the chunks with certain metadata, using a filter.
     """
 
     def __init__(
         self,
-        documents: List[str],
+        documents: List[Union[str, Document]],
         config: KnowledgeBaseConfig,
         get_embedding_search_provider_instance: Callable[
             [Optional[EmbeddingSearchProvider]], EmbeddingsIndex
@@ -80,109 +115,544 @@ class KnowledgeBase:
     ):
         self.documents = documents
         self.chunks = []
-        self.index = None
+        self.indexes: Dict[str, EmbeddingsIndex] = {}
+        self.lexical_indexes: Dict[str, Tuple[BM25Index, List[IndexItem]]] = {}
         self.config = config
         self._get_embeddings_search_instance = get_embedding_search_provider_instance
 
+    @property
+    def index(self) -> Optional[EmbeddingsIndex]:
+        """The index of the default collection, or of the only collection.
+
+        Use `indexes` to access the index of every collection.
+        """
+        if len(self.indexes) == 1:
+            return next(iter(self.indexes.values()))
+
+        return self.indexes.get(DEFAULT_COLLECTION)
+
+    def _iter_documents(self) -> Iterator[Tuple[str, str]]:
+        """Yields the collection and the content of the documents, reading them one at a time."""
+        for doc in self.documents:
+            if isinstance(doc, str):
+                yield DEFAULT_COLLECTION, doc
+            else:
+                yield doc.collection or DEFAULT_COLLECTION, doc.get_content()
+
+    def _iter_document_chunks(self) -> Iterator[dict]:
+        """Yields the topic chunks of the documents, tagged with their collection."""
+        for collection, content in self._iter_documents():
+            for chunk in iter_markdown_topic_chunks(content):
+                chunk.setdefault("collection", collection)
+                yield chunk
+
+    def _iter_chunks(self) -> Iterator[dict]:
+        """Yields the topic chunks, streaming them from the documents if needed."""
+        if self.chunks:
+            return iter(self.chunks)
+
+        return self._iter_document_chunks()
+
+    def _get_collections_items(self) -> Dict[str, List[IndexItem]]:
+        """Returns the index items for the chunks, grouped by collection."""
+        collections_items = {}
+        for chunk in self._iter_chunks():
+            collection = chunk.get("collection", DEFAULT_COLLECTION)
+            collections_items.setdefault(collection, []).append(_get_index_item(chunk))
+
+        return collections_items
+
     def init(self):
         """Initialize the knowledge base.
 
         The initial data is loaded from the `$kb_docs` context key. The key is populated when
         the model is loaded. Currently, only markdown format is supported.
+
+        Calling this is optional; if the chunks are not computed upfront, they are streamed
+        from the documents when the index is built.
         """
         if not self.documents:
             return
 
         # Start splitting every doc into topic chunks
-
-        for doc in self.documents:
-            chunks = split_markdown_in_topic_chunks(doc)
-            self.chunks.extend(chunks)
+        self.chunks.extend(self._iter_document_chunks())
 
     async def build(self):
-        """Builds the knowledge base index."""
+        """Builds the knowledge base index.
+
+        A separate index (shard) is built for every collection of documents. If the
+        hybrid search is enabled, a BM25 index is also built for every collection,
+        concurrently with the vector index.
+        """
         t0 = time()
-        index_items = []
-        all_text_items = []
-        for chunk in self.chunks:
-            text = f"# {chunk['title']}\n\n{chunk['body'].strip()}"
-            all_text_items.append(text)
 
-            index_items.append(IndexItem(text=text, meta=chunk))
+        collections_items = self._get_collections_items()
+
+        builds = [self._build_vector_indexes(collections_items)]
+        if self.config.hybrid_search.enabled:
+            builds.append(self._build_lexical_indexes(collections_items))
+        await asyncio.gather(*builds)
+
+        log.info(f"Building the Knowledge Base index took {time() - t0} seconds.")
+
+    async def _build_vector_indexes(
+        self, collections_items: Dict[str, List[IndexItem]]
+    ):
+        """Builds the vector index for every collection."""
+        # For the default Embedding Search provider, which uses annoy, the embeddings
+        # and the index are persisted and updated incrementally.
+        if self.config.embedding_search_provider.name == "default":
+            await self._build_default_indexes(collections_items)
+            return
+
+        async def _build_index(index_items: List[IndexItem]) -> EmbeddingsIndex:
+            index = self._get_embeddings_search_instance(
+                self.config.embedding_search_provider
+            )
+            await index.add_items(index_items)
+            await index.build()
+            return index
+
+        indexes = await asyncio.gather(
+            *[_build_index(items) for items in collections_items.values()]
+        )
+        self.indexes = dict(zip(collections_items.keys(), indexes))
+
+    async def _build_lexical_indexes(
+        self, collections_items: Dict[str, List[IndexItem]]
+    ):
+        """Builds the BM25 index for every collection, in separate threads.
+
+        The indexes are persisted in the cache folder, identified by the content of
+        the chunks in the collection.
+        """
+        loop = asyncio.get_running_loop()
+        lexical_indexes = await asyncio.gather(
+            *[
+                loop.run_in_executor(None, _get_bm25_index, items)
+                for items in collections_items.values()
+            ]
+        )
+
+        self.lexical_indexes = {
+            collection: (lexical_index, items)
+            for collection, lexical_index, items in zip(
+                collections_items.keys(), lexical_indexes, collections_items.values()
+            )
+        }
+
+    async def _build_default_indexes(
+        self, collections_items: Dict[str, List[IndexItem]]
+    ):
+        """Builds the indexes for the default Embedding Search provider.
+
+        The embeddings of the chunks are stored in a `ChunkEmbeddingsStore`, so that
+        only new or changed chunks are embedded. The annoy index of every collection is
+        built on disk, concurrently, and memory-mapped when loaded.
+
+        If the embeddings are truncated (`embedding_dimensions`), the annoy indexes use
+        the truncated embeddings, and the stored ones are used to rescore the results.
+        They are read from the memory-mapped store, only for the candidates.
+        """
+        from annoy import AnnoyIndex
+
+        from nemoguardrails.embeddings.basic import BasicEmbeddingsIndex
+        from nemoguardrails.kb.store import ChunkEmbeddingsStore, get_chunk_hash
 
         # Stop if there are no items
-        if not index_items:
+        if not collections_items:
             return
 
-        # We compute the md5
         # As part of the hash, we also include the embedding engine and the model
         # to prevent the cache being used incorrectly when the embedding model changes.
-        hash_prefix = self.config.embedding_search_provider.parameters.get(
-            "embedding_engine", ""
-        ) + self.config.embedding_search_provider.parameters.get("embedding_model", "")
-
-        md5_hash = hashlib.md5(
-            (hash_prefix + "".join(all_text_items)).encode("utf-8")
-        ).hexdigest()
-        cache_file = os.path.join(CACHE_FOLDER, f"{md5_hash}.ann")
-        embedding_size_file = os.path.join(CACHE_FOLDER, f"{md5_hash}.esize")
-
-        # If we have already computed this before, we use it
-        if (
-            self.config.embedding_search_provider.name == "default"
-            and os.path.exists(cache_file)
-            and os.path.exists(embedding_size_file)
-        ):
-            from annoy import AnnoyIndex
+        parameters = self.config.embedding_search_provider.parameters
+        hash_prefix = parameters.get("embedding_engine", "") + parameters.get(
+            "embedding_model", ""
+        )
+        store_folder = os.path.join(
+            CACHE_FOLDER, "kb", hashlib.md5(hash_prefix.encode("utf-8")).hexdigest()
+        )
+
+        # The truncated embeddings result in a different index.
+        embedding_dimensions = parameters.get("embedding_dimensions")
+        if embedding_dimensions:
+            hash_prefix += f"{embedding_dimensions}"
+
+        # We compute the md5 of all the chunks in a collection, to identify its index.
+        cache_files = {}
+        chunk_hashes = {}
+        for collection, index_items in collections_items.items():
+            md5_hash = hashlib.md5(hash_prefix.encode("utf-8"))
+            chunk_hashes[collection] = []
+            for index_item in index_items:
+                chunk_hashes[collection].append(get_chunk_hash(index_item.text))
+                md5_hash.update(index_item.text.encode("utf-8"))
+
+            cache_files[collection] = os.path.join(
+                CACHE_FOLDER, f"{md5_hash.hexdigest()}.ann"
+            )
 
-            from nemoguardrails.embeddings.basic import BasicEmbeddingsIndex
+        # If we have not already computed the indexes before, we update the stored
+        # embeddings and build them.
+        missing_collections = [
+            collection
+            for collection, cache_file in cache_files.items()
+            if not (
+                os.path.exists(cache_file)
+                and os.path.exists(_get_embedding_size_file(cache_file))
+            )
+        ]
+        all_chunk_hashes = set()
+        for collection_chunk_hashes in chunk_hashes.values():
+            all_chunk_hashes.update(collection_chunk_hashes)
+
+        # The store can be shared with other configurations, so we record the chunks
+        # that are used by this one, to keep them when the store is compacted.
+        store = ChunkEmbeddingsStore(store_folder)
+        store.touch(all_chunk_hashes)
+
+        # The stored embeddings are needed to build the missing indexes and, if the
+        # embeddings are truncated, to rescore the results of all of them (e.g., if the
+        # annoy index was cached, but the rows were removed from the store).
+        embed_collections = [
+            collection
+            for collection in collections_items
+            if collection in missing_collections
+            or (
+                embedding_dimensions
+                and not all(
+                    chunk_hash in store for chunk_hash in chunk_hashes[collection]
+                )
+            )
+        ]
+        if embed_collections:
+            embeddings_index = self._get_embeddings_search_instance(
+                self.config.embedding_search_provider
+            )
+            await _embed_missing_chunks(
+                embeddings_index,
+                store,
+                [
+                    (index_item, chunk_hash)
+                    for collection in embed_collections
+                    for index_item, chunk_hash in zip(
+                        collections_items[collection], chunk_hashes[collection]
+                    )
+                ],
+            )
+
+        if missing_collections:
+            # The builds run in separate threads, so they do not block the event loop.
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        None,
+                        _build_ann_index,
+                        store,
+                        chunk_hashes[collection],
+                        cache_files[collection],
+                        embedding_dimensions,
+                    )
+                    for collection in missing_collections
+                ]
+            )
 
+            # We reclaim the space of the old chunks, once they outnumber the used ones.
+            if store.num_rows > 2 * len(all_chunk_hashes):
+                store.compact(all_chunk_hashes)
+
+        for collection, index_items in collections_items.items():
+            cache_file = cache_files[collection]
             log.info(cache_file)
-            self.index = cast(
+
+            with open(_get_embedding_size_file(cache_file), "r") as f:
+                embedding_size = int(f.read())
+
+            ann_index = AnnoyIndex(embedding_size, "angular")
+            ann_index.load(cache_file)
+
+            index = cast(
                 BasicEmbeddingsIndex,
                 self._get_embeddings_search_instance(
                     self.config.embedding_search_provider
                 ),
             )
+            index.embeddings_index = ann_index
+            await index.add_items(index_items)
 
-            with open(embedding_size_file, "r") as f:
-                embedding_size = int(f.read())
+            if embedding_dimensions:
+                index.set_embeddings_source(
+                    store.get_reader(chunk_hashes[collection]), store.embedding_size
+                )
 
-            ann_index = AnnoyIndex(embedding_size, "angular")
-            ann_index.load(cache_file)
+            self.indexes[collection] = index
+
+    async def search_relevant_chunks(
+        self, text, max_results: int = 3, filter: Optional[dict] = None
+    ):
+        """Search the index for the most relevant chunks.
+
+        If the hybrid search is enabled, the vector and the lexical (BM25) searches run
+        concurrently, and their results are combined using reciprocal rank fusion.
+
+        Args:
+            text: The text to search for.
+            max_results: The maximum number of chunks to return.
+            filter: An optional filter for the chunks, mapping metadata keys to a
+                value or a list of accepted values, e.g. `{"collection": "product_a"}`.
+                The "collection" key selects the indexes that are searched.
 
-            self.index.embeddings_index = ann_index
+        Returns:
+            The most relevant chunks, across all the selected collections.
+        """
+        filter = filter or {}
+
+        collections = [
+            collection
+            for collection in self.indexes
+            if _matches_filter({"collection": collection}, filter, ["collection"])
+        ]
+        if not collections:
+            return []
 
-            await self.index.add_items(index_items)
+        hybrid_search = self.config.hybrid_search
+        if not hybrid_search.enabled:
+            items = await self._vector_search(text, collections, max_results, filter)
         else:
-            self.index = self._get_embeddings_search_instance(
-                self.config.embedding_search_provider
+            num_candidates = max(max_results, hybrid_search.num_candidates)
+            vector_items, lexical_items = await asyncio.gather(
+                self._vector_search(text, collections, num_candidates, filter),
+                self._lexical_search(text, collections, num_candidates, filter),
+            )
+            items = _reciprocal_rank_fusion(
+                [vector_items, lexical_items], k=hybrid_search.rrf_k
             )
-            await self.index.add_items(index_items)
-            await self.index.build()
 
-            # For the default Embedding Search provider, which uses annoy, we also
-            # persist the index after it's computed.
-            if self.config.embedding_search_provider.name == "default":
-                from nemoguardrails.embeddings.basic import BasicEmbeddingsIndex
+        # Return the chunks directly
+        return [item.meta for item in items[:max_results]]
 
-                # We also save the file for future use
-                os.makedirs(CACHE_FOLDER, exist_ok=True)
-                basic_index = cast(BasicEmbeddingsIndex, self.index)
-                basic_index.embeddings_index.save(cache_file)
+    async def _vector_search(
+        self, text: str, collections: List[str], max_results: int, filter: dict
+    ) -> List[IndexItem]:
+        """Searches the vector indexes of the collections, best results first."""
 
-                # And, explicitly save the size as we need it when we reload
-                with open(embedding_size_file, "w") as f:
-                    f.write(str(basic_index.embedding_size))
+        def _filter_fn(item: IndexItem) -> bool:
+            return _matches_filter(item.meta, filter)
 
-        log.info(f"Building the Knowledge Base index took {time() - t0} seconds.")
+        # For the default provider, the query is embedded once, and the indexes are
+        # searched concurrently and merged by distance.
+        if self.config.embedding_search_provider.name == "default":
+            from nemoguardrails.embeddings.basic import BasicEmbeddingsIndex
 
-    async def search_relevant_chunks(self, text, max_results: int = 3):
-        """Search the index for the most relevant chunks."""
-        if self.index is None:
-            return []
+            indexes = [
+                cast(BasicEmbeddingsIndex, self.indexes[collection])
+                for collection in collections
+            ]
+            embedding = await indexes[0].get_embedding(text)
+
+            loop = asyncio.get_running_loop()
+            shard_results = await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        None,
+                        index.search_by_embedding,
+                        embedding,
+                        max_results,
+                        _filter_fn if filter else None,
+                    )
+                    for index in indexes
+                ]
+            )
 
-        results = await self.index.search(text, max_results=max_results)
+            results = sorted(
+                [result for results in shard_results for result in results],
+                key=lambda result: result[1],
+            )
+            return [item for item, _ in results[:max_results]]
+
+        # For other providers, we over-fetch and filter the results, and merge them
+        # by rank.
+        shard_results = await asyncio.gather(
+            *[
+                self.indexes[collection].search(
+                    text,
+                    max_results=max_results * FILTER_OVERFETCH
+                    if filter
+                    else max_results,
+                )
+                for collection in collections
+            ]
+        )
+        shard_results = [
+            [item for item in results if _filter_fn(item)] for results in shard_results
+        ]
+
+        items = []
+        for rank in range(max_results):
+            for results in shard_results:
+                if rank < len(results):
+                    items.append(results[rank])
+
+        return items[:max_results]
+
+    async def _lexical_search(
+        self, text: str, collections: List[str], max_results: int, filter: dict
+    ) -> List[IndexItem]:
+        """Searches the BM25 indexes of the collections, best results first."""
+
+        def _search(lexical_index: BM25Index, items: List[IndexItem]):
+            results = lexical_index.search(
+                text,
+                max_results,
+                (lambda i: _matches_filter(items[i].meta, filter)) if filter else None,
+            )
+            return [(items[i], score) for i, score in results]
+
+        loop = asyncio.get_running_loop()
+        shard_results = await asyncio.gather(
+            *[
+                loop.run_in_executor(None, _search, *self.lexical_indexes[collection])
+                for collection in collections
+                if collection in self.lexical_indexes
+            ]
+        )
+
+        results = sorted(
+            [result for results in shard_results for result in results],
+            key=lambda result: result[1],
+            reverse=True,
+        )
+        return [item for item, _ in results[:max_results]]
+
+
+async def _embed_missing_chunks(
+    embeddings_index: EmbeddingsIndex,
+    store: "ChunkEmbeddingsStore",
+    items: List[Tuple[IndexItem, str]],
+):
+    """Computes and stores the embeddings for the chunks that are not in the store.
+
+    Args:
+        embeddings_index: The index used to compute the embeddings.
+        store: The store for the embeddings.
+        items: The index items, together with the hash of each chunk.
+    """
+    missing = {}
+    for index_item, chunk_hash in items:
+        if chunk_hash not in store:
+            missing[chunk_hash] = index_item.text
+
+    missing_hashes = list(missing.keys())
+    if missing_hashes:
+        # The manifest of the store is loaded and saved only once.
+        with store.update():
+            for i in range(0, len(missing_hashes), EMBEDDING_BATCH_SIZE):
+                batch = missing_hashes[i : i + EMBEDDING_BATCH_SIZE]
+                embeddings = await embeddings_index._get_embeddings(
+                    [missing[chunk_hash] for chunk_hash in batch]
+                )
+                store.add(batch, embeddings)
+
+    log.info(
+        f"Embedded {len(missing_hashes)} new or changed chunks out of {len(items)}."
+    )
+
+
+def _get_embedding_size_file(cache_file: str) -> str:
+    """Returns the path of the file that stores the embedding size for an index."""
+    return cache_file[: -len(".ann")] + ".esize"
+
+
+def _build_ann_index(
+    store: "ChunkEmbeddingsStore",
+    chunk_hashes: List[str],
+    cache_file: str,
+    embedding_dimensions: Optional[int] = None,
+):
+    """Builds the annoy index for the chunks on disk, using the stored embeddings.
+
+    The embedding size file is written last, as it marks the index as complete.
+    """
+    from annoy import AnnoyIndex
 
-        # Return the chunks directly
-        return [result.meta for result in results]
+    from nemoguardrails.embeddings.quantization import truncate_embeddings
+
+    embedding_size = store.embedding_size
+    if embedding_dimensions:
+        embedding_size = min(embedding_size, embedding_dimensions)
+
+    ann_index = AnnoyIndex(embedding_size, "angular")
+    ann_index.on_disk_build(cache_file)
+    for i, chunk_hash in enumerate(chunk_hashes):
+        ann_index.add_item(
+            i, truncate_embeddings(store.get(chunk_hash), embedding_dimensions)
+        )
+    ann_index.build(10)
+    ann_index.unload()
+
+    with open(_get_embedding_size_file(cache_file), "w") as f:
+        f.write(str(embedding_size))
+
+
+def _get_bm25_index(index_items: List[IndexItem]) -> BM25Index:
+    """Returns the BM25 index for the items, loading it from the cache if available."""
+    texts = [index_item.text for index_item in index_items]
+
+    md5_hash = hashlib.md5()
+    for text in texts:
+        md5_hash.update(text.encode("utf-8"))
+    cache_file = os.path.join(CACHE_FOLDER, f"{md5_hash.hexdigest()}.bm25.json")
+
+    lexical_index = BM25Index.load(cache_file)
+    if lexical_index is None or lexical_index.num_docs != len(texts):
+        lexical_index = BM25Index()
+        lexical_index.build(texts)
+        lexical_index.save(cache_file)
+
+    return lexical_index
+
+
+def _reciprocal_rank_fusion(
+    results_lists: List[List[IndexItem]], k: int = 60
+) -> List[IndexItem]:
+    """Combines multiple ranked lists of results using reciprocal rank fusion.
+
+    Every item gets the score `sum(1 / (k + rank))` over the lists it appears in. The
+    items are matched by their collection and text, as the search providers can return
+    new `IndexItem` instances for the same chunk.
+    """
+    scores = {}
+    items = {}
+    for results in results_lists:
+        for rank, item in enumerate(results, start=1):
+            key = (item.meta.get("collection"), item.text)
+            scores[key] = scores.get(key, 0.0) + 1 / (k + rank)
+            items.setdefault(key, item)
+
+    return [items[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+def _matches_filter(meta: dict, filter: dict, keys: Optional[List[str]] = None) -> bool:
+    """Checks if the metadata of a chunk matches a filter.
+
+    Args:
+        meta: The metadata of the chunk.
+        filter: A dict mapping keys to a value or a list of accepted values.
+        keys: If provided, only these keys of the filter are checked.
+    """
+    for key, value in filter.items():
+        if keys is not None and key not in keys:
+            continue
+
+        accepted = value if isinstance(value, (list, tuple, set)) else [value]
+        if meta.get(key) not in accepted:
+            return False
+
+    return True
+
+
+def _get_index_item(chunk: dict) -> IndexItem:
+    """Helper to create the index item for a chunk."""
+    text = f"# {chunk['title']}\n\n{chunk['body'].strip()}"
+    return IndexItem(text=text, meta=chunk)
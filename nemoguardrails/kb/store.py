@@ -0,0 +1,345 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent storage for the embeddings of the knowledge base chunks."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # On Windows, the processes sharing a store are not synchronized.
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+DEFAULT_DATA_FILE = "embeddings.f32"
+
+# The rows that were used in the last week are kept by `compact`, as they can belong
+# to other configurations that share the store.
+DEFAULT_RETENTION = 7 * 24 * 3600
+
+
+def get_chunk_hash(text: str) -> str:
+    """Computes the hash of the text of a chunk, used to track changes."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ChunkEmbeddingsStore:
+    """An append-only store for the embeddings of the knowledge base chunks.
+
+    The embeddings are stored as rows of float32 values in a flat binary file, which is
+    memory-mapped for reading, so the store can be larger than the available memory.
+    A JSON manifest maps the hash of each chunk to its row, so that only new or changed
+    chunks need to be embedded when the knowledge base is built again.
+
+    The store can be shared by multiple processes (and configurations that use the same
+    embedding model), so the updates are done under an exclusive file lock, after the
+    manifest is loaded again. The time each row was last used is also tracked, so that
+    `compact` only reclaims the rows that were not used recently by any of them.
+    """
+
+    def __init__(self, folder: str):
+        """Constructor.
+
+        Args:
+            folder: The folder where the manifest and the embeddings are stored. It should
+                be specific to the embedding model.
+        """
+        self.folder = folder
+        self.manifest_path = os.path.join(folder, "manifest.json")
+        self.lock_path = os.path.join(folder, "lock")
+        self.data_path = os.path.join(folder, DEFAULT_DATA_FILE)
+
+        self.embedding_size = 0
+        self.rows: Dict[str, int] = {}
+        self.num_rows = 0
+
+        # The time each chunk was last used, as a Unix timestamp.
+        self.used_at: Dict[str, float] = {}
+
+        self._data: Optional[np.memmap] = None
+
+        # Whether `add` calls are grouped by `update`, and if they added any rows.
+        self._updating = False
+        self._changed = False
+
+        if os.path.exists(self.manifest_path):
+            with self._lock(shared=True):
+                self._load()
+
+    @contextmanager
+    def _lock(self, shared: bool = False):
+        """Locks the store, so that other processes don't update it concurrently."""
+        os.makedirs(self.folder, exist_ok=True)
+        with open(self.lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self):
+        """Loads the manifest, if it exists and matches the data file.
+
+        The data file is memory-mapped right away (under the lock), so that it remains
+        readable even if it is replaced later by another process.
+        """
+        self._data = None
+        if not os.path.exists(self.manifest_path):
+            return
+
+        try:
+            with open(self.manifest_path, "r") as f:
+                manifest = json.load(f)
+
+            if manifest.get("version") != MANIFEST_VERSION:
+                raise ValueError(f"unsupported version {manifest.get('version')}")
+
+            embedding_size = manifest["embedding_size"]
+            num_rows = manifest["num_rows"]
+            data_path = os.path.join(self.folder, manifest["data_file"])
+
+            # The data is always written before the manifest, so the file can only have
+            # extra rows (from an interrupted update) which are not used.
+            data_size = os.path.getsize(data_path)
+            if data_size < num_rows * embedding_size * 4:
+                raise ValueError("the embeddings file is truncated")
+
+            self.data_path = data_path
+            self.embedding_size = embedding_size
+            self.num_rows = num_rows
+            self.rows = manifest["rows"]
+
+            # The chunks without a timestamp are considered as just used.
+            now = time.time()
+            used_at = manifest.get("used_at", {})
+            self.used_at = {
+                chunk_hash: used_at.get(chunk_hash, now) for chunk_hash in self.rows
+            }
+
+            self._open_data()
+        except Exception as e:
+            log.warning(
+                f"Ignoring the knowledge base manifest {self.manifest_path}: {e}"
+            )
+            self.embedding_size = 0
+            self.num_rows = 0
+            self.rows = {}
+            self.used_at = {}
+            self._data = None
+
+    def _save_manifest(self):
+        """Writes the manifest atomically."""
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "embedding_size": self.embedding_size,
+            "num_rows": self.num_rows,
+            "data_file": os.path.basename(self.data_path),
+            "rows": self.rows,
+            "used_at": self.used_at,
+        }
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _open_data(self):
+        """Memory-maps the embeddings file."""
+        self._data = None
+        if self.num_rows > 0:
+            self._data = np.memmap(
+                self.data_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(self.num_rows, self.embedding_size),
+            )
+
+    def _get_data(self) -> np.memmap:
+        """Returns the memory-mapped view of the embeddings."""
+        if self._data is None:
+            raise KeyError("The store is empty.")
+
+        return self._data
+
+    def __contains__(self, chunk_hash: str) -> bool:
+        return chunk_hash in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @contextmanager
+    def update(self):
+        """Groups multiple `add` calls under a single exclusive lock.
+
+        The manifest is loaded once, the embeddings are appended to the data file as
+        they are added, and the manifest is saved once at the end (also if an error
+        occurs, so the rows added so far are kept).
+        """
+        with self._lock():
+            self._load()
+            self._updating = True
+            self._changed = False
+            try:
+                yield self
+            finally:
+                self._updating = False
+                if self._changed:
+                    self._save_manifest()
+                    self._open_data()
+
+    def add(self, chunk_hashes: List[str], embeddings: List[List[float]]):
+        """Appends the embeddings for the given chunks.
+
+        The embeddings are written to disk before the manifest is updated, so the store
+        remains consistent if the process is interrupted. The chunks that were added in
+        the meantime by another process are skipped.
+        """
+        if not chunk_hashes:
+            return
+
+        if not self._updating:
+            with self.update():
+                self.add(chunk_hashes, embeddings)
+            return
+
+        values = np.asarray(embeddings, dtype=np.float32)
+
+        new_ids = [
+            i
+            for i, chunk_hash in enumerate(chunk_hashes)
+            if chunk_hash not in self.rows
+        ]
+        if not new_ids:
+            return
+
+        if self.num_rows == 0:
+            self.embedding_size = values.shape[1]
+        elif values.shape[1] != self.embedding_size:
+            raise ValueError(
+                f"Expected embeddings of size {self.embedding_size}, "
+                f"got {values.shape[1]}."
+            )
+
+        # We discard any extra rows left from an interrupted update.
+        mode = "r+b" if os.path.exists(self.data_path) else "wb"
+        with open(self.data_path, mode) as f:
+            f.truncate(self.num_rows * self.embedding_size * 4)
+            f.seek(0, os.SEEK_END)
+            f.write(values[new_ids].tobytes())
+
+        now = time.time()
+        for i, chunk_id in enumerate(new_ids):
+            self.rows[chunk_hashes[chunk_id]] = self.num_rows + i
+            self.used_at[chunk_hashes[chunk_id]] = now
+        self.num_rows += len(new_ids)
+        self._changed = True
+
+    def get(self, chunk_hash: str) -> np.ndarray:
+        """Returns the embedding of a chunk, as a view on the memory-mapped file."""
+        return self._get_data()[self.rows[chunk_hash]]
+
+    def get_reader(
+        self, chunk_hashes: List[str]
+    ) -> Callable[[Sequence[int]], np.ndarray]:
+        """Returns a function that reads the embeddings of some of the given chunks.
+
+        The function takes positions in `chunk_hashes`, and only the corresponding rows
+        are read from the memory-mapped file. It keeps reading the current data file,
+        even if the store is updated later.
+        """
+        data = self._get_data()
+        rows = np.asarray(
+            [self.rows[chunk_hash] for chunk_hash in chunk_hashes], dtype=np.int64
+        )
+
+        def read(ids: Sequence[int]) -> np.ndarray:
+            return np.asarray(data[rows[np.asarray(ids, dtype=np.int64)]])
+
+        return read
+
+    def touch(self, chunk_hashes: Iterable[str]):
+        """Records that the given chunks are used, so that they are kept by `compact`."""
+        with self._lock():
+            self._load()
+
+            now = time.time()
+            for chunk_hash in chunk_hashes:
+                if chunk_hash in self.rows:
+                    self.used_at[chunk_hash] = now
+
+            if self.rows:
+                self._save_manifest()
+
+    def compact(
+        self, chunk_hashes: Iterable[str], retention: float = DEFAULT_RETENTION
+    ):
+        """Reclaims the rows that are no longer used.
+
+        Args:
+            chunk_hashes: The chunks that are used, which are always kept.
+            retention: The rows used in the last `retention` seconds are also kept, as
+                they can belong to other configurations that share the store.
+        """
+        with self._lock():
+            self._load()
+
+            used = set(chunk_hashes)
+            min_used_at = time.time() - retention
+            keep = [
+                chunk_hash
+                for chunk_hash in self.rows
+                if chunk_hash in used or self.used_at[chunk_hash] >= min_used_at
+            ]
+            if len(keep) == self.num_rows:
+                return
+
+            # The rows are copied to a new file, and the manifest is switched to it only
+            # after it is complete, so the store remains consistent if interrupted. The
+            # processes that have mapped the old file can still read it after it is
+            # removed.
+            data = self._get_data()
+            fd, new_data_path = tempfile.mkstemp(
+                dir=self.folder, prefix="embeddings-", suffix=".f32"
+            )
+            with os.fdopen(fd, "wb") as f:
+                for chunk_hash in keep:
+                    f.write(data[self.rows[chunk_hash]].tobytes())
+
+            self._data = None
+            del data
+
+            old_data_path = self.data_path
+            self.data_path = new_data_path
+            self.rows = {chunk_hash: i for i, chunk_hash in enumerate(keep)}
+            self.used_at = {chunk_hash: self.used_at[chunk_hash] for chunk_hash in keep}
+            self.num_rows = len(keep)
+            self._save_manifest()
+            self._open_data()
+
+            os.remove(old_data_path)
@@ -13,38 +13,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List
+from typing import Iterator, List, Optional
 
 import yaml
 
 
-def split_markdown_in_topic_chunks(
+def iter_markdown_topic_chunks(
     content: str, max_chunk_size: int = 400
-) -> List[dict]:
+) -> Iterator[dict]:
     """
-    Splits a markdown content into topic chunks.
+    Splits a markdown content into topic chunks, yielding them one at a time.
 
-    This function takes a markdown content as input and divides it into topic chunks based on
-    headings and subsections. Each chunk includes a title and body, with an optional maximum size.
+    This is the generator version of `split_markdown_in_topic_chunks`, which allows
+    processing large documents without keeping all the chunks in memory.
 
     Parameters:
     - content (str): The markdown content to be split.
     - max_chunk_size (int): The maximum size of a chunk. Default is 400.
 
-    Returns:
-    List[dict]: A list of dictionaries, each representing a topic chunk with 'title' and 'body' keys.
-
-    Example:
-    ```python
-    content = "# Introduction\n\nThis is an introduction.\n## Section 1\n\nContent of section 1."
-    chunks = split_markdown_in_topic_chunks(content, max_chunk_size=500)
-    ```
-
-    Note:
-    - The function considers '#' as heading markers.
-    - Meta information can be included at the beginning of the markdown using triple backticks.
+    Yields:
+    dict: A topic chunk with 'title' and 'body' keys.
     """
-    chunks = []
     lines = content.strip().split("\n")
 
     # Meta information for the whole document
@@ -68,33 +57,32 @@ def split_markdown_in_topic_chunks(
     chunk_body_lines = []
     chunk_size = 0
 
-    def _record_chunk():
+    def _record_chunk() -> Optional[dict]:
         nonlocal chunk_body_lines, chunk_size
 
         body = "\n".join(chunk_body_lines).strip()
 
-        # Skip saving if body is empty
-        if body:
-            chunks.append(
-                {
-                    "title": " - ".join(chunk_title_parts),
-                    "body": body,
-                    # We also include the document level meta information
-                    **meta,
-                }
-            )
-
         chunk_body_lines = []
         chunk_size = 0
 
-    i = 0
-    while i < len(lines):
-        line = lines[i]
+        # Skip saving if body is empty
+        if not body:
+            return None
+
+        return {
+            "title": " - ".join(chunk_title_parts),
+            "body": body,
+            # We also include the document level meta information
+            **meta,
+        }
 
+    for line in lines:
         if line.startswith("#"):
             # If we have a chunk up to this point, we need to record it
             if chunk_body_lines:
-                _record_chunk()
+                chunk = _record_chunk()
+                if chunk:
+                    yield chunk
 
             # Update the title parts with the new section/subsection
             level = 0
@@ -111,14 +99,43 @@ def split_markdown_in_topic_chunks(
 
             # If the chunk is over the desired size, we reset it
             if chunk_size > max_chunk_size:
-                _record_chunk()
+                chunk = _record_chunk()
+                if chunk:
+                    yield chunk
         else:
             chunk_body_lines.append(line)
             chunk_size += len(line)
 
-        i += 1
-
     if chunk_body_lines:
-        _record_chunk()
+        chunk = _record_chunk()
+        if chunk:
+            yield chunk
 
-    return chunks
+
+def split_markdown_in_topic_chunks(
+    content: str, max_chunk_size: int = 400
+) -> List[dict]:
+    """
+    Splits a markdown content into topic chunks.
+
+    This function takes a markdown content as input and divides it into topic chunks based on
+    headings and subsections. Each chunk includes a title and body, with an optional maximum size.
+
+    Parameters:
+    - content (str): The markdown content to be split.
+    - max_chunk_size (int): The maximum size of a chunk. Default is 400.
+
+    Returns:
+    List[dict]: A list of dictionaries, each representing a topic chunk with 'title' and 'body' keys.
+
+    Example:
+    ```python
+    content = "# Introduction\n\nThis is an introduction.\n## Section 1\n\nContent of section 1."
+    chunks = split_markdown_in_topic_chunks(content, max_chunk_size=500)
+    ```
+
+    Note:
+    - The function considers '#' as heading markers.
+    - Meta information can be included at the beginning of the markdown using triple backticks.
+    """
+    return list(iter_markdown_topic_chunks(content, max_chunk_size=max_chunk_size))
@@ -17,16 +17,20 @@ import logging
 import os
 from typing import Optional
 
-import aiohttp
-
 from nemoguardrails.actions import action
 from nemoguardrails.utils import new_uuid
 
 log = logging.getLogger(__name__)
 
 
-@action(name="call activefence api", is_system_action=True)
+@action(
+    name="call activefence api",
+    is_system_action=True,
+    cache={"key_params": ["context.user_message"]},
+)
 async def call_activefence_api(context: Optional[dict] = None):
+    import aiohttp
+
     api_key = os.environ.get("ACTIVEFENCE_API_KEY")
 
     if api_key is None:
@@ -18,8 +18,6 @@ import logging
 import os
 from typing import Any, Dict, List, Optional
 
-import aiohttp
-
 from nemoguardrails.actions import action
 from nemoguardrails.actions.actions import ActionResult
 from nemoguardrails.kb.kb import KnowledgeBase
@@ -134,6 +132,8 @@ async def autoalign_infer(
     show_toxic_phrases: bool = False,
 ):
     """Checks whether the given text passes through the applied guardrails."""
+    import aiohttp
+
     api_key = os.environ.get("AUTOALIGN_API_KEY")
     if api_key is None:
         raise ValueError("AUTOALIGN_API_KEY environment variable not set.")
@@ -179,6 +179,8 @@ async def autoalign_factcheck_infer(
     guardrails_config: Optional[Dict[Any, Any]] = None,
 ):
     """Checks the facts for the text using the given documents and provides a fact-checking score"""
+    import aiohttp
+
     factcheck_config = default_factcheck_config.copy()
     api_key = os.environ.get("AUTOALIGN_API_KEY")
     if api_key is None:
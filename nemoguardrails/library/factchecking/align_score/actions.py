@@ -14,18 +14,32 @@
 # limitations under the License.
 
 import logging
-from typing import Optional
+import re
+from typing import List, Optional
 
 from langchain.llms import BaseLLM
 
 from nemoguardrails import RailsConfig
 from nemoguardrails.actions import action
-from nemoguardrails.library.factchecking.align_score.request import alignscore_request
+from nemoguardrails.library.factchecking.align_score.request import (
+    alignscore_batch_request,
+    alignscore_request,
+)
 from nemoguardrails.library.self_check.facts.actions import self_check_facts
 from nemoguardrails.llm.taskmanager import LLMTaskManager
 
 log = logging.getLogger(__name__)
 
+# The end of a sentence, used to split the bot response into claims.
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_claims(text: str) -> List[str]:
+    """Splits a text into claims, i.e., its sentences."""
+    return [
+        sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()
+    ]
+
 
 @action()
 async def alignscore_check_facts(
@@ -33,8 +47,15 @@ async def alignscore_check_facts(
     context: Optional[dict] = None,
     llm: Optional[BaseLLM] = None,
     config: Optional[RailsConfig] = None,
+    claims: Optional[List[str]] = None,
 ):
-    """Checks the facts for the bot response using an information alignment score."""
+    """Checks the facts for the bot response using an information alignment score.
+
+    The bot response is split into claims (its sentences), unless `claims` are
+    provided. Multiple claims are all checked against the relevant chunks with a
+    single request to the batch endpoint, and their average score is returned, like
+    AlignScore does for the sentences of a single claim.
+    """
     fact_checking_config = llm_task_manager.config.rails.config.fact_checking
     fallback_to_self_check = fact_checking_config.fallback_to_self_check
 
@@ -43,7 +64,19 @@ async def alignscore_check_facts(
     evidence = context.get("relevant_chunks", [])
     response = context.get("bot_message")
 
-    alignscore = await alignscore_request(alignscore_api_url, evidence, response)
+    if claims is None:
+        claims = _split_claims(response or "")
+
+    if len(claims) > 1:
+        alignscores = await alignscore_batch_request(
+            alignscore_api_url, evidence, claims
+        )
+        alignscore = sum(alignscores) / len(alignscores) if alignscores else None
+    else:
+        if claims:
+            response = claims[0]
+        alignscore = await alignscore_request(alignscore_api_url, evidence, response)
+
     if alignscore is None:
         log.warning(
             "AlignScore endpoint not set up properly. Falling back to the ask_llm approach for fact-checking."
@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ScoreBatcher:
+    """Dynamic batching queue and LRU score cache for an AlignScore model.
+
+    The (evidence, claim) pairs from concurrent requests are collected for up to
+    `max_batch_hold` seconds (or until `max_batch_size` pairs are queued) and scored
+    with a single call to `score_fn`, in a worker thread. Scores are cached by
+    (evidence hash, claim hash), so identical checks are not recomputed.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[List[Tuple[str, str]]], List[float]],
+        max_batch_size: int = 32,
+        max_batch_hold: float = 0.01,
+        cache_size: int = 10000,
+    ):
+        """Constructor.
+
+        Args:
+            score_fn: The function that computes the scores for a list of
+                (evidence, claim) pairs, e.g., using the AlignScore model.
+            max_batch_size: The maximum number of pairs scored in a single batch.
+            max_batch_hold: The maximum time a batch is held before being processed.
+            cache_size: The maximum number of scores kept in the cache.
+        """
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_batch_hold = max_batch_hold
+        self.cache_size = cache_size
+        self._cache: Dict[Tuple[str, str], float] = OrderedDict()
+        self._queue = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _submit(self, loop: asyncio.AbstractEventLoop):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+
+        def _on_done(batch_future: asyncio.Future):
+            for i, (future, _) in enumerate(batch):
+                # The request may have been cancelled, e.g., the client disconnected.
+                if future.done():
+                    continue
+
+                if batch_future.cancelled():
+                    future.cancel()
+                elif batch_future.exception() is not None:
+                    future.set_exception(batch_future.exception())
+                else:
+                    future.set_result(float(batch_future.result()[i]))
+
+        batch_future = loop.run_in_executor(
+            self._executor, self.score_fn, [pair for _, pair in batch]
+        )
+        batch_future.add_done_callback(_on_done)
+
+    def _cache_put(self, key: Tuple[str, str], score: float):
+        self._cache[key] = score
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def score(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Computes the scores for the (evidence, claim) pairs."""
+        loop = asyncio.get_running_loop()
+        keys = [(_hash(evidence), _hash(claim)) for evidence, claim in pairs]
+
+        # Identical pairs within the same request share a single future.
+        futures = {}
+        for key, pair in zip(keys, pairs):
+            if key in futures:
+                continue
+
+            future = loop.create_future()
+            futures[key] = future
+
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                future.set_result(self._cache[key])
+            else:
+                self._queue.append((future, pair))
+
+        if len(self._queue) >= self.max_batch_size:
+            self._submit(loop)
+        elif self._queue and self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self.max_batch_hold, self._submit, loop
+            )
+
+        await asyncio.gather(*futures.values())
+        for key, future in futures.items():
+            self._cache_put(key, future.result())
+
+        return [futures[key].result() for key in keys]
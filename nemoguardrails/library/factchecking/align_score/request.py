@@ -13,10 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
-from typing import Optional
-
-import aiohttp
+from typing import List, Optional
 
 from nemoguardrails.actions import action
 
@@ -30,6 +29,8 @@ async def alignscore_request(
     response: Optional[str] = None,
 ):
     """Checks the facts for the bot response by making a request to the AlignScore API."""
+    import aiohttp
+
     if not evidence:
         return 1.0
 
@@ -49,3 +50,54 @@ async def alignscore_request(
             except Exception:
                 result = None
             return result
+
+
+async def alignscore_batch_request(
+    api_url: str = "http://localhost:5000/alignscore_large",
+    evidence: Optional[str] = None,
+    claims: Optional[List[str]] = None,
+):
+    """Checks multiple claims against the same evidence with a single request.
+
+    The request is made to the batch endpoint associated with `api_url`, e.g.,
+    `http://localhost:5000/alignscore_large/batch`. If the server does not have
+    a batch endpoint, one request is made for each claim.
+
+    Returns
+        The list of scores, one for each claim, or None if the request failed.
+    """
+    import aiohttp
+
+    if not claims:
+        return []
+
+    if not evidence:
+        return [1.0] * len(claims)
+
+    payload = {"evidence": evidence, "claims": claims}
+
+    async with aiohttp.ClientSession() as session:
+        async with session.post(api_url.rstrip("/") + "/batch", json=payload) as resp:
+            if resp.status == 404:
+                log.info(
+                    "AlignScore batch endpoint not available, checking the claims one by one."
+                )
+                results = await asyncio.gather(
+                    *[alignscore_request(api_url, evidence, claim) for claim in claims]
+                )
+                return None if None in results else list(results)
+
+            if resp.status != 200:
+                log.error(
+                    f"AlignScore batch API request failed with status {resp.status}"
+                )
+                return None
+
+            result = await resp.json()
+
+            log.info(f"AlignScores were {result}.")
+            try:
+                result = result["alignscores"]
+            except Exception:
+                result = None
+            return result
@@ -14,8 +14,8 @@
 # limitations under the License.
 
 import os
-from functools import lru_cache
-from typing import List
+from functools import lru_cache, partial
+from typing import List, Optional, Tuple
 
 import nltk
 import typer
@@ -24,6 +24,12 @@ from alignscore import AlignScore
 from fastapi import FastAPI
 from pydantic import BaseModel
 
+try:
+    from nemoguardrails.library.factchecking.align_score.batcher import ScoreBatcher
+except ImportError:
+    # When the server is started as a script, e.g., in the Docker image.
+    from batcher import ScoreBatcher
+
 # Make sure we have the punkt tokenizer downloaded.
 nltk.download("punkt")
 
@@ -56,11 +62,37 @@ def get_model(model: str):
     )
 
 
+def _score(model: str, pairs: List[Tuple[str, str]]) -> List[float]:
+    """Computes the scores for a list of (evidence, claim) pairs."""
+    return get_model(model).score(
+        contexts=[evidence for evidence, _ in pairs],
+        claims=[claim for _, claim in pairs],
+    )
+
+
+@lru_cache
+def get_batcher(model: str) -> ScoreBatcher:
+    """Returns the batcher for a model."""
+    return ScoreBatcher(partial(_score, model))
+
+
 class AlignScoreRequest(BaseModel):
     evidence: str
     claim: str
 
 
+class AlignScoreBatchRequest(BaseModel):
+    """A batch of checks.
+
+    Either `evidence` and `claims` (many claims checked against the same evidence),
+    or `pairs` (many independent pairs) must be provided.
+    """
+
+    evidence: Optional[str] = None
+    claims: List[str] = []
+    pairs: List[AlignScoreRequest] = []
+
+
 @app.get("/")
 def hello_world():
     welcome_str = (
@@ -73,20 +105,37 @@ def hello_world():
     return welcome_str
 
 
-def get_alignscore(model, evidence: str, claim: str) -> dict:
-    return {"alignscore": model.score(contexts=[evidence], claims=[claim])[0]}
+async def get_alignscore(model: str, evidence: str, claim: str) -> dict:
+    [score] = await get_batcher(model).score([(evidence, claim)])
+    return {"alignscore": score}
+
+
+async def get_alignscores(model: str, request: AlignScoreBatchRequest) -> dict:
+    pairs = [(pair.evidence, pair.claim) for pair in request.pairs]
+    if request.evidence is not None:
+        pairs.extend((request.evidence, claim) for claim in request.claims)
+
+    return {"alignscores": await get_batcher(model).score(pairs)}
 
 
 @app.post("/alignscore_base")
-def alignscore_base(request: AlignScoreRequest):
-    model = get_model("base")
-    return get_alignscore(model, request.evidence, request.claim)
+async def alignscore_base(request: AlignScoreRequest):
+    return await get_alignscore("base", request.evidence, request.claim)
 
 
 @app.post("/alignscore_large")
-def alignscore_large(request: AlignScoreRequest):
-    model = get_model("large")
-    return get_alignscore(model, request.evidence, request.claim)
+async def alignscore_large(request: AlignScoreRequest):
+    return await get_alignscore("large", request.evidence, request.claim)
+
+
+@app.post("/alignscore_base/batch")
+async def alignscore_base_batch(request: AlignScoreBatchRequest):
+    return await get_alignscores("base", request)
+
+
+@app.post("/alignscore_large/batch")
+async def alignscore_large_batch(request: AlignScoreBatchRequest):
+    return await get_alignscores("large", request)
 
 
 cli_app = typer.Typer()
@@ -104,12 +153,27 @@ def start(
     initialize_only: bool = typer.Option(
         default=False, help="Whether to run only the initialization for the models."
     ),
+    max_batch_size: int = typer.Option(
+        default=32, help="The maximum number of pairs scored in a single batch."
+    ),
+    max_batch_hold: float = typer.Option(
+        default=0.01,
+        help="The maximum time (in seconds) a batch is held before being processed.",
+    ),
+    cache_size: int = typer.Option(
+        default=10000, help="The maximum number of scores kept in the cache."
+    ),
 ):
     # Preload the models
     for model in models:
         typer.echo(f"Pre-loading model {model}.")
         get_model(model)
 
+        batcher = get_batcher(model)
+        batcher.max_batch_size = max_batch_size
+        batcher.max_batch_hold = max_batch_hold
+        batcher.cache_size = cache_size
+
     if initialize_only:
         print("Initialization successful.")
     else:
@@ -17,8 +17,6 @@ import logging
 import os
 from typing import Optional
 
-import aiohttp
-
 from nemoguardrails.actions import action
 
 log = logging.getLogger(__name__)
@@ -26,6 +24,8 @@ log = logging.getLogger(__name__)
 
 @action(name="call gotitai truthchecker api", is_system_action=True)
 async def call_gotitai_truthchecker_api(context: Optional[dict] = None):
+    import aiohttp
+
     api_key = os.environ.get("GOTITAI_API_KEY")
 
     if api_key is None:
@@ -13,8 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
-from typing import Optional
+from typing import List, Optional, Union
 
 from langchain.chains import LLMChain
 from langchain.llms.base import BaseLLM
@@ -36,14 +37,97 @@ from nemoguardrails.logging.explain import LLMCallInfo
 
 log = logging.getLogger(__name__)
 
-try:
-    from langchain_openai import OpenAI
-except ImportError:
-    log.warning(
-        "The langchain_openai module is not installed. Please install it using pip: pip install langchain_openai"
-    )
 
-HALLUCINATION_NUM_EXTRA_RESPONSES = 2
+def _is_openai_llm(llm: BaseLLM) -> bool:
+    """Checks if the LLM is the OpenAI (completion) LLM from `langchain_openai`."""
+    # We check the module first, so that `langchain_openai` is imported only if used.
+    if not type(llm).__module__.startswith("langchain_openai"):
+        return False
+
+    try:
+        from langchain_openai import OpenAI
+    except ImportError:
+        # Without langchain_openai, the extra responses are sampled using concurrent calls.
+        return False
+
+    return type(llm) == OpenAI
+
+
+def _postprocess_response(result: str) -> str:
+    """Applies the same post-processing of responses as in `generate_bot_message`."""
+    result = get_multiline_response(result)
+    result = strip_quotes(result)
+    return result
+
+
+async def _get_extra_responses_native(
+    llm: BaseLLM, last_bot_prompt_string: str, num_responses: int
+) -> List[str]:
+    """Samples the extra responses with a single call, using the native `n` parameter."""
+    # Use the "generate" call from langchain to get all completions in the same response.
+    last_bot_prompt = PromptTemplate(template="{text}", input_variables=["text"])
+    chain = LLMChain(prompt=last_bot_prompt, llm=llm)
+
+    # Generate multiple responses with temperature 1.
+    with llm_params(llm, temperature=1.0, n=num_responses, best_of=num_responses):
+        extra_llm_response = await chain.agenerate(
+            [{"text": last_bot_prompt_string}],
+            run_manager=logging_callback_manager_for_chain,
+        )
+
+    extra_llm_completions = []
+    if len(extra_llm_response.generations) > 0:
+        extra_llm_completions = extra_llm_response.generations[0]
+
+    extra_responses = []
+    i = 0
+    while i < num_responses and i < len(extra_llm_completions):
+        extra_responses.append(_postprocess_response(extra_llm_completions[i].text))
+        i += 1
+
+    return extra_responses
+
+
+async def _get_extra_responses_concurrent(
+    llm: BaseLLM,
+    last_bot_prompt: Union[str, List[dict]],
+    num_responses: int,
+    min_responses: int,
+    max_concurrency: int,
+) -> List[str]:
+    """Samples the extra responses using concurrent LLM calls.
+
+    This works with any LLM provider. As soon as `min_responses` responses are
+    available, the remaining calls are cancelled.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _sample():
+        async with semaphore:
+            llm_call_info_var.set(LLMCallInfo(task=Task.CHECK_HALLUCINATION.value))
+            return await llm_call(llm, last_bot_prompt)
+
+    extra_responses = []
+
+    # Generate multiple responses with temperature 1.
+    with llm_params(llm, temperature=1.0):
+        tasks = [asyncio.ensure_future(_sample()) for _ in range(num_responses)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                try:
+                    result = await next_result
+                except Exception as e:
+                    log.warning(f"Failed to sample extra response: {e}")
+                    continue
+
+                extra_responses.append(_postprocess_response(result))
+                if len(extra_responses) >= min_responses:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return extra_responses
 
 
 @action()
@@ -56,6 +140,9 @@ async def check_hallucination(
 ):
     """Checks if the last bot response is a hallucination by checking multiple completions for self-consistency.
 
+    For OpenAI (completion) LLM engines, the extra completions are generated with a single
+    call. For all other LLM engines, they are sampled using concurrent LLM calls.
+
     :return: True if hallucination is detected, False otherwise.
     """
 
@@ -63,53 +150,38 @@ async def check_hallucination(
     last_bot_prompt_string = context.get("_last_bot_prompt")
 
     if bot_response and last_bot_prompt_string:
-        num_responses = HALLUCINATION_NUM_EXTRA_RESPONSES
+        hallucination_config = llm_task_manager.config.rails.config.hallucination
+        num_responses = hallucination_config.num_extra_responses
+        min_responses = min(
+            hallucination_config.min_extra_responses or num_responses, num_responses
+        )
+
         # Use beam search for the LLM call, to get several completions with only one call.
-        # At the current moment, only OpenAI LLM engines are supported for computing the additional completions.
-        if type(llm) != OpenAI:
-            log.warning(
-                f"Hallucination rail can only be used with OpenAI LLM engines."
-                f"Current LLM engine is {type(llm).__name__}."
+        # This is supported only for the OpenAI LLM engines.
+        if _is_openai_llm(llm):
+            extra_responses = await _get_extra_responses_native(
+                llm, last_bot_prompt_string, num_responses
             )
-            return False
-
-        # Use the "generate" call from langchain to get all completions in the same response.
-        last_bot_prompt = PromptTemplate(template="{text}", input_variables=["text"])
-        chain = LLMChain(prompt=last_bot_prompt, llm=llm)
-
-        # Generate multiple responses with temperature 1.
-        with llm_params(llm, temperature=1.0, n=num_responses, best_of=num_responses):
-            extra_llm_response = await chain.agenerate(
-                [{"text": last_bot_prompt_string}],
-                run_manager=logging_callback_manager_for_chain,
+        else:
+            extra_responses = await _get_extra_responses_concurrent(
+                llm,
+                last_bot_prompt_string,
+                num_responses,
+                min_responses,
+                hallucination_config.max_concurrency,
             )
 
-        extra_llm_completions = []
-        if len(extra_llm_response.generations) > 0:
-            extra_llm_completions = extra_llm_response.generations[0]
-
-        extra_responses = []
-        i = 0
-        while i < num_responses and i < len(extra_llm_completions):
-            result = extra_llm_completions[i].text
-            # We need the same post-processing of responses as in "generate_bot_message"
-            result = get_multiline_response(result)
-            result = strip_quotes(result)
-            extra_responses.append(result)
-            i += 1
-
         if len(extra_responses) == 0:
             # Log message and return that no hallucination was found
             log.warning(
                 f"No extra LLM responses were generated for '{bot_response}' hallucination check."
             )
             return False
-        elif len(extra_responses) < num_responses:
+        elif len(extra_responses) < min_responses:
             log.warning(
                 f"Requested {num_responses} extra LLM responses for hallucination check, "
                 f"received {len(extra_responses)}."
             )
-
         if use_llm_checking:
             # Only support LLM-based agreement check in current version
             prompt = llm_task_manager.render_task_prompt(
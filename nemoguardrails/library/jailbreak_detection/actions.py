@@ -40,19 +40,16 @@ async def jailbreak_detection_heuristics(
 
     if not jailbreak_api_url:
         from nemoguardrails.library.jailbreak_detection.heuristics.checks import (
-            check_jailbreak_length_per_perplexity,
-            check_jailbreak_prefix_suffix_perplexity,
+            check_jailbreak_heuristics,
         )
 
         log.warning(
             "No jailbreak heuristics endpoint set. Running in-process, NOT RECOMMENDED FOR PRODUCTION."
         )
-        lp_check = check_jailbreak_length_per_perplexity(prompt, lp_threshold)
-        ps_ppl_check = check_jailbreak_prefix_suffix_perplexity(
-            prompt, ps_ppl_threshold
+        heuristic_checks = check_jailbreak_heuristics(
+            prompt, lp_threshold, ps_ppl_threshold
         )
-        jailbreak = any([lp_check["jailbreak"], ps_ppl_check["jailbreak"]])
-        return jailbreak
+        return heuristic_checks["jailbreak"]
 
     jailbreak = await jailbreak_detection_heuristics_request(
         prompt, jailbreak_api_url, lp_threshold, ps_ppl_threshold
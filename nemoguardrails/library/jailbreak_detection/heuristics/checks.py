@@ -14,51 +14,249 @@
 # limitations under the License.
 
 import os
+from typing import List, Optional, Tuple, Union
 
 import torch
-from transformers import GPT2LMHeadModel, GPT2TokenizerFast
+from transformers import AutoTokenizer
 
 device = os.environ.get("JAILBREAK_CHECK_DEVICE", "cpu")
-model_id = "gpt2-large"
-model = GPT2LMHeadModel.from_pretrained(model_id).to(device)
-tokenizer = GPT2TokenizerFast.from_pretrained(model_id)
 
+# The model used for computing the perplexity. Smaller models (e.g., `gpt2`) can be
+# used to trade some accuracy for throughput.
+model_id = os.environ.get("JAILBREAK_CHECK_MODEL", "gpt2-large")
 
-def get_perplexity(input_string: str) -> bool:
-    """
-    Function to compute sliding window perplexity of `input_string`
+# The backend used to run the model: `torch` or `onnx`. The `onnx` backend requires
+# `optimum[onnxruntime]` and runs only on CPU.
+backend = os.environ.get("JAILBREAK_CHECK_BACKEND", "torch")
 
-    Args
-        input_string: The prompt to be sent to the model
-    """
-    encodings = tokenizer(input_string, return_tensors="pt")
+# Set to `int8` to use dynamic int8 quantization with the `onnx` backend.
+quantization = os.environ.get("JAILBREAK_CHECK_QUANTIZATION", "")
+
+# The stride used for the sliding window perplexity on long inputs.
+stride = 512
+
+# The maximum number of windows scored in a single forward pass. Every window can have
+# up to `max_length` tokens, so this bounds the memory used for the logits.
+max_batch_windows = int(os.environ.get("JAILBREAK_CHECK_MAX_BATCH_WINDOWS", "8"))
+
+
+def _load_model():
+    """Loads the model for the configured backend."""
+    if backend == "torch":
+        from transformers import AutoModelForCausalLM
+
+        return AutoModelForCausalLM.from_pretrained(model_id).to(device).eval()
+
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForCausalLM
+        except ImportError:
+            raise ImportError(
+                "Could not import optimum, please install it with "
+                "`pip install optimum[onnxruntime]`."
+            )
+
+        onnx_model = ORTModelForCausalLM.from_pretrained(
+            model_id, export=True, use_cache=False, use_io_binding=False
+        )
+
+        if quantization == "int8":
+            from optimum.onnxruntime import ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
 
-    max_length = model.config.n_positions
-    stride = 512
-    seq_len = encodings.input_ids.size(1)
+            save_dir = os.path.join(
+                os.environ.get("JAILBREAK_CHECK_CACHE", ".cache"),
+                f"{model_id.replace('/', '_')}-int8",
+            )
+            if not os.path.exists(save_dir):
+                quantizer = ORTQuantizer.from_pretrained(onnx_model)
+                quantizer.quantize(
+                    save_dir=save_dir,
+                    quantization_config=AutoQuantizationConfig.avx2(
+                        is_static=False, per_channel=False
+                    ),
+                )
+            onnx_model = ORTModelForCausalLM.from_pretrained(
+                save_dir, use_cache=False, use_io_binding=False
+            )
 
-    nlls = list()
+        return onnx_model
+
+    raise ValueError(f"Unsupported jailbreak check backend: {backend}.")
+
+
+model = _load_model()
+tokenizer = AutoTokenizer.from_pretrained(model_id)
+
+# GPT-2 style tokenizers don't have a padding token, and the padded positions are
+# masked out anyway.
+if tokenizer.pad_token is None:
+    tokenizer.pad_token = tokenizer.eos_token
+
+max_length = getattr(model.config, "n_positions", None) or getattr(
+    model.config, "max_position_embeddings"
+)
+
+
+def _get_windows(input_ids: List[int]) -> List[Tuple[List[int], int]]:
+    """Splits the token ids into sliding windows.
+
+    Returns:
+        A list of (window_ids, target_length) tuples, where the last `target_length`
+        tokens of the window are the ones that are scored.
+    """
+    windows = []
+    seq_len = len(input_ids)
     prev_end_loc = 0
     for begin_loc in range(0, seq_len, stride):
         end_loc = min(begin_loc + max_length, seq_len)
         trg_len = end_loc - prev_end_loc  # may be different from stride on last loop
-        input_ids = encodings.input_ids[:, begin_loc:end_loc].to(device)
-        target_ids = input_ids.clone()
-        target_ids[:, :-trg_len] = -100
-
-        with torch.no_grad():
-            outputs = model(input_ids, labels=target_ids)
-            neg_log_likelihood = outputs.loss
-
-        nlls.append(neg_log_likelihood)
+        windows.append((input_ids[begin_loc:end_loc], trg_len))
 
         prev_end_loc = end_loc
         if end_loc == seq_len:
             break
 
-    perplexity = torch.exp(torch.stack(nlls).mean())
+    return windows
+
+
+def _get_windows_nlls(windows: List[Tuple[List[int], int]]) -> torch.Tensor:
+    """Computes the mean negative log-likelihood for a batch of windows.
+
+    All the windows are padded to the same length and run through a single
+    forward pass.
+    """
+    batch_length = max(len(window_ids) for window_ids, _ in windows)
+    input_ids = torch.full(
+        (len(windows), batch_length), tokenizer.pad_token_id, dtype=torch.long
+    )
+    attention_mask = torch.zeros((len(windows), batch_length), dtype=torch.long)
+    target_mask = torch.zeros((len(windows), batch_length), dtype=torch.bool)
+
+    for i, (window_ids, trg_len) in enumerate(windows):
+        input_ids[i, : len(window_ids)] = torch.tensor(window_ids)
+        attention_mask[i, : len(window_ids)] = 1
+
+        # The first token of a window is never predicted.
+        target_mask[i, max(1, len(window_ids) - trg_len) : len(window_ids)] = True
+
+    with torch.no_grad():
+        logits = model(
+            input_ids=input_ids.to(device), attention_mask=attention_mask.to(device)
+        ).logits.float()
+
+    # Shift so that the tokens < n predict n.
+    shift_logits = logits[:, :-1, :]
+    shift_labels = input_ids[:, 1:].to(logits.device)
+    shift_mask = target_mask[:, 1:].to(logits.device)
+
+    nlls = torch.nn.functional.cross_entropy(
+        shift_logits.transpose(1, 2), shift_labels, reduction="none"
+    )
+
+    return (nlls * shift_mask).sum(dim=1) / shift_mask.sum(dim=1).clamp(min=1)
+
+
+def _score_windows(
+    windows: List[Tuple[List[int], int]]
+) -> List[Union[torch.Tensor, Exception]]:
+    """Computes the mean negative log-likelihood for each window.
+
+    The windows are scored in batches of up to `max_batch_windows`. If a batch fails,
+    its windows are scored one by one, so that an error affects only its own window.
+    """
+    results = []
+    for start in range(0, len(windows), max_batch_windows):
+        batch = windows[start : start + max_batch_windows]
+        try:
+            results.extend(_get_windows_nlls(batch).cpu())
+        except Exception:
+            for window in batch:
+                try:
+                    results.append(_get_windows_nlls([window]).cpu()[0])
+                except Exception as e:
+                    results.append(e)
+
+    return results
+
+
+def get_perplexities(
+    input_strings: List[str], return_exceptions: bool = False
+) -> List[Union[float, Exception]]:
+    """
+    Function to compute the sliding window perplexity for multiple strings at once.
+
+    The strings are tokenized together and their windows are scored in padded,
+    batched forward passes.
+
+    Args
+        input_strings: The prompts to be sent to the model
+        return_exceptions: If True, the strings that can't be scored (e.g., empty
+            strings) get the exception instead of a perplexity, and the other strings
+            are not affected. Otherwise, the first exception is raised.
+    """
+    if not input_strings:
+        return []
+
+    encodings = tokenizer(input_strings)
+
+    results: List[Union[float, Exception, None]] = [None] * len(input_strings)
+    windows = []
+    window_owners = []
+    for i, input_ids in enumerate(encodings.input_ids):
+        string_windows = _get_windows(input_ids)
+        if not string_windows:
+            results[i] = ValueError("Can't compute the perplexity of an empty string.")
+
+        for window in string_windows:
+            windows.append(window)
+            window_owners.append(i)
 
-    return perplexity.cpu().detach().numpy().item()
+    nlls = _score_windows(windows)
+
+    for i in range(len(input_strings)):
+        if results[i] is not None:
+            continue
+
+        string_nlls = [nlls[j] for j, owner in enumerate(window_owners) if owner == i]
+        errors = [nll for nll in string_nlls if isinstance(nll, Exception)]
+        if errors:
+            results[i] = errors[0]
+        else:
+            results[i] = torch.exp(torch.stack(string_nlls).mean()).item()
+
+    if not return_exceptions:
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    return results
+
+
+def get_perplexity(input_string: str) -> float:
+    """
+    Function to compute sliding window perplexity of `input_string`
+
+    Args
+        input_string: The prompt to be sent to the model
+    """
+    return get_perplexities([input_string])[0]
+
+
+def _get_prefix_suffix(input_string: str) -> Optional[Tuple[str, str]]:
+    """Returns the prefix and the suffix used for the prefix/suffix perplexity check.
+
+    Returns None if the input string is too short for the check.
+    """
+    split_string = input_string.strip().split()
+    # Not useful to evaluate GCG-style attacks on strings less than 20 "words"
+    if len(split_string) < 20:
+        return None
+
+    suffix = " ".join(split_string[-20:-1])
+    prefix = " ".join(split_string[0:19])
+
+    return prefix, suffix
 
 
 def check_jailbreak_length_per_perplexity(input_string: str, threshold: float) -> dict:
@@ -85,16 +283,11 @@ def check_jailbreak_prefix_suffix_perplexity(
         input_string: The prompt to be sent to the model
         ps_ppl_threshold: Threshold for determining whether `input_string` is a jailbreak (Default: 1845.65)
     """
-    split_string = input_string.strip().split()
-    # Not useful to evaluate GCG-style attacks on strings less than 20 "words"
-    if len(split_string) < 20:
+    prefix_suffix = _get_prefix_suffix(input_string)
+    if prefix_suffix is None:
         return {"jailbreak": False}
 
-    suffix = " ".join(split_string[-20:-1])
-    prefix = " ".join(split_string[0:19])
-
-    suffix_ppl = get_perplexity(suffix)
-    prefix_ppl = get_perplexity(prefix)
+    prefix_ppl, suffix_ppl = get_perplexities(list(prefix_suffix))
 
     if suffix_ppl >= threshold or prefix_ppl >= threshold:
         jb_ps = True
@@ -103,3 +296,54 @@ def check_jailbreak_prefix_suffix_perplexity(
 
     result = {"jailbreak": jb_ps}
     return result
+
+
+def get_heuristics_texts(input_string: str) -> List[str]:
+    """Returns all the texts that need to be scored for the heuristics of a prompt."""
+    prefix_suffix = _get_prefix_suffix(input_string)
+    if prefix_suffix is None:
+        return [input_string]
+
+    return [input_string, *prefix_suffix]
+
+
+def compute_heuristics(
+    input_string: str,
+    perplexities: List[float],
+    lp_threshold: float,
+    ps_ppl_threshold: float,
+) -> dict:
+    """Computes the result of all heuristics from already computed perplexities.
+
+    Args
+        input_string: The prompt to be sent to the model
+        perplexities: The perplexities for the texts from `get_heuristics_texts`.
+        lp_threshold: Threshold for the length/perplexity heuristic.
+        ps_ppl_threshold: Threshold for the prefix/suffix perplexity heuristic.
+    """
+    lp_jailbreak = len(input_string) / perplexities[0] >= lp_threshold
+    ps_jailbreak = any(ppl >= ps_ppl_threshold for ppl in perplexities[1:])
+
+    return {
+        "jailbreak": lp_jailbreak or ps_jailbreak,
+        "length_per_perplexity": lp_jailbreak,
+        "prefix_suffix_perplexity": ps_jailbreak,
+    }
+
+
+def check_jailbreak_heuristics(
+    input_string: str, lp_threshold: float, ps_ppl_threshold: float
+) -> dict:
+    """
+    Run all the heuristics, scoring the prompt, its prefix and its suffix in a single
+    batched forward pass.
+
+    Args
+        input_string: The prompt to be sent to the model
+        lp_threshold: Threshold for the length/perplexity heuristic (Default: 89.79)
+        ps_ppl_threshold: Threshold for the prefix/suffix perplexity heuristic (Default: 1845.65)
+    """
+    perplexities = get_perplexities(get_heuristics_texts(input_string))
+    return compute_heuristics(
+        input_string, perplexities, lp_threshold, ps_ppl_threshold
+    )
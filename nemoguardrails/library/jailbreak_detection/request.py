@@ -16,8 +16,6 @@
 import logging
 from typing import Optional
 
-import aiohttp
-
 log = logging.getLogger(__name__)
 
 
@@ -27,6 +25,8 @@ async def jailbreak_detection_heuristics_request(
     lp_threshold: Optional[float] = None,
     ps_ppl_threshold: Optional[float] = None,
 ):
+    import aiohttp
+
     payload = {
         "prompt": prompt,
         "lp_threshold": lp_threshold,
@@ -13,8 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
 import typer
 import uvicorn
@@ -28,6 +30,79 @@ cli_app = typer.Typer()
 device = os.environ.get("JAILBREAK_CHECK_DEVICE", "cpu")
 
 
+class PerplexityBatcher:
+    """Dynamic batching queue for perplexity computations.
+
+    Texts from concurrent requests are collected for up to `max_batch_hold` seconds
+    (or until `max_batch_size` texts are queued) and scored in padded forward passes
+    of up to `checks.max_batch_windows` windows. The model runs in a single worker
+    thread, so the event loop keeps accepting requests while a batch is being
+    processed.
+
+    Every text is scored on its own, so a text that can't be scored fails only the
+    request it belongs to.
+    """
+
+    def __init__(self, max_batch_size: int = 16, max_batch_hold: float = 0.01):
+        self.max_batch_size = max_batch_size
+        self.max_batch_hold = max_batch_hold
+        self._queue = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _submit(self, loop: asyncio.AbstractEventLoop):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+
+        texts = [text for _, text in batch]
+
+        def _on_done(batch_future: asyncio.Future):
+            for i, (future, _) in enumerate(batch):
+                # The request may have been cancelled, e.g., the client disconnected.
+                if future.done():
+                    continue
+
+                if batch_future.cancelled():
+                    future.cancel()
+                elif batch_future.exception() is not None:
+                    future.set_exception(batch_future.exception())
+                elif isinstance(batch_future.result()[i], Exception):
+                    future.set_exception(batch_future.result()[i])
+                else:
+                    future.set_result(batch_future.result()[i])
+
+        batch_future = loop.run_in_executor(
+            self._executor, checks.get_perplexities, texts, True
+        )
+        batch_future.add_done_callback(_on_done)
+
+    async def get_perplexities(self, texts: List[str]) -> List[float]:
+        """Computes the perplexity of the texts as part of the next batch."""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.append((future, text))
+            futures.append(future)
+
+        if len(self._queue) >= self.max_batch_size:
+            self._submit(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self.max_batch_hold, self._submit, loop
+            )
+
+        return list(await asyncio.gather(*futures))
+
+
+batcher = PerplexityBatcher()
+
+
 class JailbreakCheckRequest(BaseModel):
     """
     prompt (str): User utterance to the model
@@ -51,35 +126,32 @@ def hello_world():
 
 
 @app.post("/jailbreak_lp_heuristic")
-def lp_heuristic_check(request: JailbreakCheckRequest):
-    return checks.check_jailbreak_length_per_perplexity(
-        request.prompt, request.lp_threshold
-    )
+async def lp_heuristic_check(request: JailbreakCheckRequest):
+    [perplexity] = await batcher.get_perplexities([request.prompt])
+    score = len(request.prompt) / perplexity
+    return {"jailbreak": score >= request.lp_threshold}
 
 
 @app.post("/jailbreak_ps_heuristic")
-def ps_ppl_heuristic_check(request: JailbreakCheckRequest):
-    return checks.check_jailbreak_prefix_suffix_perplexity(
-        request.prompt, request.ps_ppl_threshold
-    )
+async def ps_ppl_heuristic_check(request: JailbreakCheckRequest):
+    texts = checks.get_heuristics_texts(request.prompt)
+    if len(texts) == 1:
+        return {"jailbreak": False}
+
+    perplexities = await batcher.get_perplexities(texts[1:])
+    return {"jailbreak": any(ppl >= request.ps_ppl_threshold for ppl in perplexities)}
 
 
 @app.post("/heuristics")
-def run_all_heuristics(request: JailbreakCheckRequest):
+async def run_all_heuristics(request: JailbreakCheckRequest):
     # Will add other heuristics as they become available
-    lp_check = checks.check_jailbreak_length_per_perplexity(
-        request.prompt, request.lp_threshold
-    )
-    ps_ppl_check = checks.check_jailbreak_prefix_suffix_perplexity(
-        request.prompt, request.ps_ppl_threshold
+    # The prompt, its prefix and its suffix are all scored as part of the same batch.
+    texts = checks.get_heuristics_texts(request.prompt)
+    perplexities = await batcher.get_perplexities(texts)
+
+    return checks.compute_heuristics(
+        request.prompt, perplexities, request.lp_threshold, request.ps_ppl_threshold
     )
-    jailbreak = any([lp_check["jailbreak"], ps_ppl_check["jailbreak"]])
-    heuristic_checks = {
-        "jailbreak": jailbreak,
-        "length_per_perplexity": lp_check["jailbreak"],
-        "prefix_suffix_perplexity": ps_ppl_check["jailbreak"],
-    }
-    return heuristic_checks
 
 
 @cli_app.command()
@@ -88,7 +160,21 @@ def start(
         default=1337, help="The port that the server should listen on."
     ),
     host: str = typer.Option(default="0.0.0.0", help="IP address of the host"),
+    max_batch_size: int = typer.Option(
+        default=16, help="The maximum number of texts scored in a single batch."
+    ),
+    max_batch_hold: float = typer.Option(
+        default=0.01,
+        help="The maximum time (in seconds) a batch is held before being processed.",
+    ),
+    max_batch_windows: int = typer.Option(
+        default=checks.max_batch_windows,
+        help="The maximum number of windows scored in a single forward pass.",
+    ),
 ):
+    batcher.max_batch_size = max_batch_size
+    batcher.max_batch_hold = max_batch_hold
+    checks.max_batch_windows = max_batch_windows
     uvicorn.run(app, host=host, port=port)
 
 
@@ -53,7 +53,7 @@ def parse_llama_guard_response(response: str) -> Tuple[bool, Optional[List[str]]
     return False, []
 
 
-@action()
+@action(cache={"key_params": ["context.user_message"]})
 async def llama_guard_check_input(
     llm_task_manager: LLMTaskManager,
     context: Optional[dict] = None,
@@ -82,7 +82,7 @@ async def llama_guard_check_input(
     return {"allowed": allowed, "policy_violations": policy_violations}
 
 
-@action()
+@action(cache={"key_params": ["context.user_message", "context.bot_message"]})
 async def llama_guard_check_output(
     llm_task_manager: LLMTaskManager,
     context: Optional[dict] = None,
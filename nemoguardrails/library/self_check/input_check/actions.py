@@ -31,7 +31,7 @@ from nemoguardrails.utils import new_event_dict
 log = logging.getLogger(__name__)
 
 
-@action(is_system_action=True)
+@action(is_system_action=True, cache={"key_params": ["context.user_message"]})
 async def self_check_input(
     llm_task_manager: LLMTaskManager,
     context: Optional[dict] = None,
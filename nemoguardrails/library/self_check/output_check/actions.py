@@ -30,7 +30,10 @@ from nemoguardrails.logging.explain import LLMCallInfo
 log = logging.getLogger(__name__)
 
 
-@action(is_system_action=True)
+@action(
+    is_system_action=True,
+    cache={"key_params": ["context.user_message", "context.bot_message"]},
+)
 async def self_check_output(
     llm_task_manager: LLMTaskManager,
     context: Optional[dict] = None,
@@ -13,17 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import json
 import logging
+import weakref
+from collections import OrderedDict
 from functools import lru_cache
-
-try:
-    from presidio_analyzer import PatternRecognizer
-    from presidio_analyzer.nlp_engine import NlpEngineProvider
-    from presidio_anonymizer import AnonymizerEngine
-    from presidio_anonymizer.entities import OperatorConfig
-except ImportError:
-    # The exception about installing presidio will be on the first call to the analyzer
-    pass
+from typing import List, Optional, Tuple
 
 from nemoguardrails import RailsConfig
 from nemoguardrails.actions import action
@@ -37,8 +33,11 @@ log = logging.getLogger(__name__)
 
 @lru_cache
 def _get_analyzer():
+    # Presidio is imported only when the rail is used, as it's an optional dependency
+    # that is slow to import.
     try:
         from presidio_analyzer import AnalyzerEngine
+        from presidio_analyzer.nlp_engine import NlpEngineProvider
 
     except ImportError:
         raise ImportError(
@@ -72,15 +71,179 @@ def _get_analyzer():
     return AnalyzerEngine(nlp_engine=nlp_engine)
 
 
+# This is the executor that will be used for running the Presidio analysis.
+# Currently, we leave this as None, to use the default executor from asyncio.
+sdd_executor = None
+
+# The maximum number of texts analyzed in a single batch, and the maximum time a
+# batch is held before being processed.
+MAX_BATCH_SIZE = 32
+MAX_BATCH_HOLD = 0.005
+
+# The maximum number of analysis results that are kept, so that detection and masking
+# on the same text share a single analysis pass.
+MAX_ANALYSIS_CACHE_SIZE = 128
+
+# The cache for the ad hoc recognizers, keyed by the recognizers configuration.
+_ad_hoc_recognizers_cache = {}
+
+
+@lru_cache
+def _get_anonymizer():
+    from presidio_anonymizer import AnonymizerEngine
+
+    return AnonymizerEngine()
+
+
+def _get_recognizers_key(sdd_config: SensitiveDataDetection) -> str:
+    """Helper to compute a stable key for the recognizers in a config."""
+    return json.dumps(sdd_config.recognizers, sort_keys=True, default=str)
+
+
 def _get_ad_hoc_recognizers(sdd_config: SensitiveDataDetection):
-    """Helper to compute the ad hoc recognizers for a config."""
-    ad_hoc_recognizers = []
-    for recognizer in sdd_config.recognizers:
-        ad_hoc_recognizers.append(PatternRecognizer.from_dict(recognizer))
-    return ad_hoc_recognizers
+    """Helper to compute the ad hoc recognizers for a config.
 
+    The recognizers are built only once for every distinct recognizers configuration.
+    """
+    key = _get_recognizers_key(sdd_config)
+    if key not in _ad_hoc_recognizers_cache:
+        ad_hoc_recognizers = []
+        for recognizer in sdd_config.recognizers:
+            from presidio_analyzer import PatternRecognizer
 
-@action(is_system_action=True)
+            ad_hoc_recognizers.append(PatternRecognizer.from_dict(recognizer))
+        _ad_hoc_recognizers_cache[key] = ad_hoc_recognizers
+
+    return _ad_hoc_recognizers_cache[key]
+
+
+def _analyze_batch(requests: List[Tuple[str, List[str], list]]) -> list:
+    """Runs the analysis for a batch of texts.
+
+    The NLP pipeline runs once over all the texts (i.e., `nlp.pipe`) and the
+    recognizers are then applied to each text individually.
+
+    Args:
+        requests: A list of (text, entities, ad_hoc_recognizers) tuples.
+
+    Returns:
+        The list of analysis results, one for each request.
+    """
+    analyzer = _get_analyzer()
+    texts = [text for text, _, _ in requests]
+    nlp_artifacts = [
+        artifacts
+        for _, artifacts in analyzer.nlp_engine.process_batch(texts, language="en")
+    ]
+
+    return [
+        analyzer.analyze(
+            text=text,
+            language="en",
+            entities=entities,
+            ad_hoc_recognizers=ad_hoc_recognizers,
+            nlp_artifacts=nlp_artifacts[i],
+        )
+        for i, (text, entities, ad_hoc_recognizers) in enumerate(requests)
+    ]
+
+
+class _AnalysisBatcher:
+    """Groups concurrent analysis requests into batches run in a worker thread.
+
+    A batcher is bound to a single event loop (see `_get_batcher`), as it schedules
+    the processing of the batches on it.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_batch_hold: float = MAX_BATCH_HOLD,
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_batch_hold = max_batch_hold
+        self._queue = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def _submit(self, loop: asyncio.AbstractEventLoop):
+        """Submits the current batch for processing in the executor."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+
+        requests = [request for request, _ in batch]
+        futures = [future for _, future in batch]
+
+        def _on_done(batch_future: asyncio.Future):
+            for i, future in enumerate(futures):
+                if future.done():
+                    continue
+                if batch_future.cancelled():
+                    future.cancel()
+                elif batch_future.exception() is not None:
+                    future.set_exception(batch_future.exception())
+                else:
+                    future.set_result(batch_future.result()[i])
+
+        batch_future = loop.run_in_executor(sdd_executor, _analyze_batch, requests)
+        batch_future.add_done_callback(_on_done)
+
+    async def analyze(self, text: str, entities: List[str], ad_hoc_recognizers: list):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append(((text, entities, ad_hoc_recognizers), future))
+
+        if len(self._queue) >= self.max_batch_size:
+            self._submit(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self.max_batch_hold, self._submit, loop
+            )
+
+        return await future
+
+
+# The batchers, for every event loop. The sync `generate` creates a new loop for
+# every call, so the batchers are released together with their loops.
+_batchers = weakref.WeakKeyDictionary()
+
+
+def _get_batcher() -> _AnalysisBatcher:
+    """Returns the batcher for the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _batchers:
+        _batchers[loop] = _AnalysisBatcher()
+
+    return _batchers[loop]
+
+
+# The most recent analysis results, keyed by (text, entities, recognizers).
+_analysis_cache = OrderedDict()
+
+
+async def _analyze(text: str, entities: List[str], sdd_config: SensitiveDataDetection):
+    """Analyzes the text for the given entities, reusing recent results if possible."""
+    key = (text, tuple(entities), _get_recognizers_key(sdd_config))
+    if key in _analysis_cache:
+        _analysis_cache.move_to_end(key)
+        return _analysis_cache[key]
+
+    results = await _get_batcher().analyze(
+        text, entities, _get_ad_hoc_recognizers(sdd_config)
+    )
+
+    _analysis_cache[key] = results
+    if len(_analysis_cache) > MAX_ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+
+    return results
+
+
+@action(is_system_action=True, cache={"key_params": ["source", "text"]})
 async def detect_sensitive_data(source: str, text: str, config: RailsConfig):
     """Checks whether the provided text contains any sensitive data.
 
@@ -101,13 +264,7 @@ async def detect_sensitive_data(source: str, text: str, config: RailsConfig):
     if len(options.entities) == 0:
         return False
 
-    analyzer = _get_analyzer()
-    results = analyzer.analyze(
-        text=text,
-        language="en",
-        entities=options.entities,
-        ad_hoc_recognizers=_get_ad_hoc_recognizers(sdd_config),
-    )
+    results = await _analyze(text, options.entities, sdd_config)
 
     # If we have any
     if results:
@@ -137,18 +294,14 @@ async def mask_sensitive_data(source: str, text: str, config: RailsConfig):
     if len(options.entities) == 0:
         return text
 
-    analyzer = _get_analyzer()
+    from presidio_anonymizer.entities import OperatorConfig
+
     operators = {}
     for entity in options.entities:
         operators[entity] = OperatorConfig("replace")
 
-    results = analyzer.analyze(
-        text=text,
-        language="en",
-        entities=options.entities,
-        ad_hoc_recognizers=_get_ad_hoc_recognizers(sdd_config),
-    )
-    anonymizer = AnonymizerEngine()
+    results = await _analyze(text, options.entities, sdd_config)
+    anonymizer = _get_anonymizer()
     masked_results = anonymizer.anonymize(
         text=text, analyzer_results=results, operators=operators
     )
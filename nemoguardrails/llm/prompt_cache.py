@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Exact-match cache for the responses of deterministic LLM calls."""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import List, Optional, Union
+
+from langchain.base_language import BaseLanguageModel
+
+# The default maximum number of responses kept in memory.
+DEFAULT_MAX_SIZE = 1024
+
+
+def get_llm_temperature(llm: BaseLanguageModel) -> Optional[float]:
+    """Returns the temperature currently set for an LLM, if any."""
+    temperature = getattr(llm, "temperature", None)
+    if temperature is None:
+        model_kwargs = getattr(llm, "model_kwargs", None) or {}
+        temperature = model_kwargs.get("temperature")
+    return temperature
+
+
+def _get_llm_identity(llm: BaseLanguageModel) -> dict:
+    """Returns the parameters identifying an LLM (type, model name, etc.)."""
+    try:
+        params = dict(llm._identifying_params)
+    except Exception:
+        params = {}
+    return {"class": llm.__class__.__name__, "params": params}
+
+
+class LLMResponseCache:
+    """A bounded cache for the responses of deterministic LLM calls.
+
+    Only the calls made with a temperature lower or equal to `max_temperature` are
+    cached. The key is computed from the rendered prompt, the stop tokens and the
+    parameters identifying the model.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttl: Optional[float] = None,
+        max_temperature: float = 0.0,
+    ):
+        """Constructor.
+
+        Args:
+            max_size: The maximum number of responses kept in memory.
+            ttl: [Optional] The number of seconds after which a response expires.
+            max_temperature: The maximum temperature for which calls are cached.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+
+        # Dict[key, (expires_at, response)]
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_cacheable(self, llm: BaseLanguageModel) -> bool:
+        """Checks if the calls to the LLM, with its current parameters, are cacheable."""
+        temperature = get_llm_temperature(llm)
+        return temperature is not None and temperature <= self.max_temperature
+
+    @staticmethod
+    def get_key(
+        llm: BaseLanguageModel,
+        prompt: Union[str, List[dict]],
+        stop: Optional[List[str]] = None,
+    ) -> str:
+        """Computes the cache key for an LLM call."""
+        data = json.dumps(
+            [_get_llm_identity(llm), prompt, stop], sort_keys=True, default=str
+        )
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response for the specified key, if any."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at is None or expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return response
+
+            del self._entries[key]
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, response: str):
+        """Saves the response for the specified key."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (expires_at, response)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Removes all the cached responses."""
+        self._entries = OrderedDict()
@@ -16,13 +16,14 @@
 """Module that exposes all the supported LLM providers.
 
 Currently, this module automatically discovers all the LLM providers available in LangChain
-and registers them.
+and registers them. The provider classes are imported only when they are first used.
 
 Additional providers can be registered using the `register_llm_provider` function.
 """
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Type
+import threading
+from typing import Any, Callable, Dict, List, Optional, Type
 
 from langchain.base_language import BaseLanguageModel
 from langchain.callbacks.manager import (
@@ -50,6 +51,13 @@ _providers: Dict[str, Type[BaseLanguageModel]] = {
     "nim": None,
 }
 
+# The providers discovered from LangChain, which are not imported yet, mapped to
+# the function that imports the provider class.
+_lazy_providers: Dict[str, Callable[[], Type[BaseLanguageModel]]] = {}
+
+# Guards the import of the lazy providers, which can be requested from multiple threads.
+_providers_lock = threading.RLock()
+
 
 class HuggingFacePipelineCompatible(HuggingFacePipeline):
     """
@@ -157,44 +165,82 @@ async def _acall(self, *args, **kwargs):
     return self._call(*args, **kwargs)
 
 
+def _add_async_support(provider_cls: Type[BaseLanguageModel]):
+    """Makes sure that the LLM provider has async support."""
+    # If the "_acall" method is not defined, we add it.
+    if (
+        provider_cls
+        and issubclass(provider_cls, LLM)
+        and "_acall" not in provider_cls.__dict__
+    ):
+        log.debug("Adding async support to %s", provider_cls.__name__)
+        provider_cls._acall = _acall
+
+
+def _import_openai_provider(
+    import_langchain_provider: Callable[[], Type[BaseLanguageModel]]
+) -> Callable[[], Type[BaseLanguageModel]]:
+    """Makes sure we have OpenAI from the right package."""
+
+    def _import_provider():
+        try:
+            from langchain_openai import OpenAI
+
+            return OpenAI
+        except ImportError:
+            # If the `langchain_openai` package is not installed, the warning
+            # will come from langchain.
+            return import_langchain_provider()
+
+    return _import_provider
+
+
 def discover_langchain_providers():
-    """Automatically discover all LLM providers from LangChain."""
+    """Automatically discover all LLM providers from LangChain.
+
+    Only the names are discovered; the classes are imported when first used.
+    """
     # To deal with deprecated stuff and avoid warnings, we compose the type_to_cls_dict here
     if hasattr(llms, "get_type_to_cls_dict"):
-        type_to_cls_dict = {
-            k: v()
+        type_to_import_fn = {
+            k: v
             for k, v in llms.get_type_to_cls_dict().items()
             # Exclude deprecated ones
             if k not in ["mlflow-chat", "databricks-chat"]
         }
     else:
-        type_to_cls_dict = llms.type_to_cls_dict
+        type_to_import_fn = {
+            k: (lambda cls=v: cls) for k, v in llms.type_to_cls_dict.items()
+        }
 
-    _providers.update(type_to_cls_dict)
+    if "openai" in type_to_import_fn:
+        type_to_import_fn["openai"] = _import_openai_provider(
+            type_to_import_fn["openai"]
+        )
 
-    # We make sure we have OpenAI from the right package.
-    if "openai" in _providers:
-        try:
-            from langchain_openai import OpenAI
+    for name, import_fn in type_to_import_fn.items():
+        _providers.pop(name, None)
+        _lazy_providers[name] = import_fn
 
-            del _providers["openai"]
 
-            _providers["openai"] = OpenAI
-        except ImportError:
-            # If the `langchain_openai` package is not installed, the warning
-            # will come from langchain.
-            pass
+def _get_provider_cls(name: str) -> Type[BaseLanguageModel]:
+    """Returns the class for a provider, importing it if needed."""
+    if name in _lazy_providers:
+        with _providers_lock:
+            if name in _lazy_providers:
+                # If the import fails, the provider stays lazy and can be retried.
+                provider_cls = _lazy_providers[name]()
+
+                # We also do some monkey patching to make sure that all LLM providers
+                # have async support.
+                _add_async_support(provider_cls)
 
-    # We also do some monkey patching to make sure that all LLM providers have async support
-    for provider_cls in _providers.values():
-        # If the "_acall" method is not defined, we add it.
-        if (
-            provider_cls
-            and issubclass(provider_cls, LLM)
-            and "_acall" not in provider_cls.__dict__
-        ):
-            log.debug("Adding async support to %s", provider_cls.__name__)
-            provider_cls._acall = _acall
+                # The class is registered before the lazy entry is removed, so that
+                # the provider can always be found in one of them.
+                _providers[name] = provider_cls
+                del _lazy_providers[name]
+
+    return _providers[name]
 
 
 # Discover all the additional providers from LangChain
@@ -203,11 +249,16 @@ discover_langchain_providers()
 
 def register_llm_provider(name: str, provider_cls: Type[BaseLanguageModel]):
     """Register an additional LLM provider."""
-    _providers[name] = provider_cls
+    with _providers_lock:
+        _providers[name] = provider_cls
+        _lazy_providers.pop(name, None)
 
 
 def get_llm_provider(model_config: Model) -> Type[BaseLanguageModel]:
-    if model_config.engine not in _providers:
+    if (
+        model_config.engine not in _providers
+        and model_config.engine not in _lazy_providers
+    ):
         raise RuntimeError(f"Could not find LLM provider '{model_config.engine}'")
 
     # For OpenAI, we use a different provider depending on whether it's a chat model or not
@@ -263,9 +314,9 @@ def get_llm_provider(model_config: Model) -> Type[BaseLanguageModel]:
             )
 
     else:
-        return _providers[model_config.engine]
+        return _get_provider_cls(model_config.engine)
 
 
 def get_llm_provider_names() -> List[str]:
     """Returns the list of supported LLM providers."""
-    return list(sorted(list(_providers.keys())))
+    return list(sorted(set(_providers.keys()) | set(_lazy_providers.keys())))
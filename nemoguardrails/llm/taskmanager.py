@@ -14,8 +14,9 @@
 # limitations under the License.
 
 import logging
+import re
 from ast import literal_eval
-from typing import Any, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from jinja2 import Environment, meta
 
@@ -43,6 +44,16 @@ from nemoguardrails.llm.prompts import get_prompt
 from nemoguardrails.llm.types import Task
 from nemoguardrails.rails.llm.config import MessageTemplate, RailsConfig
 
+# The variables that have the same value for all the prompts rendered for a
+# configuration. The parts of a prompt that only use these are cacheable prefixes.
+STATIC_PROMPT_VARIABLES = {
+    "general_instructions",
+    "sample_conversation",
+    "sample_conversation_two_turns",
+}
+
+_TEMPLATE_TAG_REGEX = re.compile(r"{{.*?}}|{%.*?%}", re.DOTALL)
+
 
 class LLMTaskManager:
     """Interface for interacting with an LLM in a task-oriented way."""
@@ -81,6 +92,12 @@ class LLMTaskManager:
         # in the prompt.
         self.prompt_context = {}
 
+        # The static prefixes of the task prompts, computed when first needed.
+        self._prompt_prefixes: Dict[str, Union[str, List[dict]]] = {}
+
+        # The hook used to mark the cacheable prefix of the rendered prompts.
+        self.prompt_prefix_hook: Optional[Callable] = None
+
     def _get_general_instructions(self):
         """Helper to extract the general instructions."""
         text = ""
@@ -187,6 +204,75 @@ class LLMTaskManager:
 
         return messages
 
+    def _get_static_template_prefix(self, template_str: str) -> str:
+        """Returns the part of a template before the first tag using a dynamic variable.
+
+        Control structures (e.g., `{% if ... %}`) are always considered dynamic.
+        """
+        for match in _TEMPLATE_TAG_REGEX.finditer(template_str):
+            tag = match.group(0)
+            if tag.startswith("{%"):
+                return template_str[: match.start()]
+
+            variables = meta.find_undeclared_variables(self.env.parse(tag))
+            if not variables.issubset(STATIC_PROMPT_VARIABLES):
+                return template_str[: match.start()]
+
+        return template_str
+
+    def get_task_prompt_prefix(self, task: Union[str, Task]) -> Union[str, List[dict]]:
+        """Returns the static prefix of the prompt for a task.
+
+        The static prefix is the same for all the prompts rendered for the task (e.g.,
+        the general instructions and the sample conversation), so it can be cached by
+        the LLM providers and servers that support prefix caching.
+
+        :param task: The name of the task.
+        :return: A string, for string prompts, or the list of leading static messages,
+          for message prompts.
+        """
+        task_name = task.value if isinstance(task, Task) else task
+        if task_name in self._prompt_prefixes:
+            return self._prompt_prefixes[task_name]
+
+        prompt = get_prompt(self.config, task)
+        if prompt.content:
+            prefix = self._render_string(
+                self._get_static_template_prefix(prompt.content)
+            )
+        else:
+            prefix = []
+            for message_template in prompt.messages:
+                if (
+                    not isinstance(message_template, MessageTemplate)
+                    or self._get_static_template_prefix(message_template.content)
+                    != message_template.content
+                ):
+                    break
+                prefix.extend(self._render_messages([message_template]))
+
+        self._prompt_prefixes[task_name] = prefix
+        return prefix
+
+    def _apply_prompt_prefix_hook(
+        self, task: Union[str, Task], task_prompt: Union[str, List[dict]]
+    ) -> Union[str, List[dict]]:
+        """Calls the prompt prefix hook, if any, with the static prefix of the prompt."""
+        if self.prompt_prefix_hook is None:
+            return task_prompt
+
+        prefix = self.get_task_prompt_prefix(task)
+
+        # We make sure the prefix actually matches the rendered prompt.
+        if isinstance(task_prompt, str):
+            if not isinstance(prefix, str) or not task_prompt.startswith(prefix):
+                prefix = ""
+        elif not isinstance(prefix, list) or task_prompt[: len(prefix)] != prefix:
+            prefix = []
+
+        task_name = task.value if isinstance(task, Task) else task
+        return self.prompt_prefix_hook(task_name, task_prompt, prefix)
+
     def _get_messages_text_length(self, messages: List[dict]) -> int:
         """Return the length of the text in the messages."""
         text = ""
@@ -231,6 +317,8 @@ class LLMTaskManager:
                     prompt.content, context=context, events=events
                 )
 
+            task_prompt = self._apply_prompt_prefix_hook(task, task_prompt)
+
             # Check if the output should be a user message, for chat models
             if force_string_to_message:
                 return [
@@ -257,7 +345,8 @@ class LLMTaskManager:
                     prompt.messages, context=context, events=events
                 )
                 task_prompt_length = self._get_messages_text_length(task_messages)
-            return task_messages
+
+            return self._apply_prompt_prefix_hook(task, task_messages)
 
     def parse_task_output(self, task: Task, output: str):
         """Parses the output for the provided tasks.
@@ -292,6 +381,16 @@ class LLMTaskManager:
         """Register a custom output parser for the rails configuration."""
         self.output_parsers[name] = output_parser
 
+    def register_prompt_prefix_hook(self, hook: Callable):
+        """Register a hook to mark the cacheable prefix of the rendered prompts.
+
+        The hook is called as `hook(task_name, prompt, prefix)`, where `prefix` is the
+        static prefix of the prompt (see `get_task_prompt_prefix`), and must return the
+        prompt to use. This can be used, for example, to add the cache markers required
+        by the LLM providers that support prompt caching.
+        """
+        self.prompt_prefix_hook = hook
+
     def register_prompt_context(self, name: str, value_or_fn: Any):
         """Register a value to be included in the prompt context.
 
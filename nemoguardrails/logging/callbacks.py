@@ -182,7 +182,7 @@ class LoggingCallbackHandler(AsyncCallbackHandler, StdOutCallbackHandler):
 
         # Finally, we append the LLM call log to the processing log
         processing_log = processing_log_var.get()
-        if processing_log:
+        if processing_log is not None:
             processing_log.append(
                 {"type": "llm_call_info", "timestamp": time(), "data": llm_call_info}
             )
@@ -36,7 +36,7 @@ def compute_generation_log(processing_log: List[dict]) -> GenerationLog:
     generation_log = GenerationLog()
 
     # The list of actions to ignore during the processing.
-    ignored_actions = ["create_event"]
+    ignored_actions = ["create_event", "start_speculative_dialog"]
     ignored_flows = [
         "process user input",
         "run input rails",
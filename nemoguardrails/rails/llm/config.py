@@ -23,6 +23,7 @@ from pydantic import BaseModel, ValidationError, root_validator
 from pydantic.fields import Field
 
 from nemoguardrails.colang import parse_colang_file, parse_flow_elements
+from nemoguardrails.colang.parse_cache import get_colang_parse_cache
 from nemoguardrails.colang.v2_x.lang.colang_ast import Flow
 from nemoguardrails.colang.v2_x.lang.utils import format_colang_parsing_error_message
 from nemoguardrails.colang.v2_x.runtime.errors import ColangParsingError
@@ -79,10 +80,41 @@ class Instruction(BaseModel):
 
 
 class Document(BaseModel):
-    """Configuration for documents that should be used for question answering."""
+    """Configuration for documents that should be used for question answering.
+
+    The documents loaded from the `kb` folder only record the `path`, and their content
+    is read when the knowledge base is built, so their `content` is None. Use
+    `get_content` to read the content of any document.
+    """
 
     format: str
-    content: str
+    content: Optional[str] = None
+    path: Optional[str] = Field(
+        default=None,
+        description="The path of the file from which the content is read, "
+        "if the content is not provided.",
+    )
+    collection: Optional[str] = Field(
+        default=None,
+        description="The name of the knowledge base collection the document belongs to. "
+        "The documents in a subfolder of the `kb` folder belong to a collection with "
+        "the name of the subfolder.",
+    )
+
+    @root_validator(pre=True, allow_reuse=True)
+    def check_fields(cls, values):
+        if values.get("content") is None and not values.get("path"):
+            raise ValueError("One of `content` or `path` must be provided.")
+
+        return values
+
+    def get_content(self) -> str:
+        """Returns the content of the document, reading it from the path if needed."""
+        if self.content is not None:
+            return self.content
+
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
 
 
 class SensitiveDataDetectionOptions(BaseModel):
@@ -212,6 +244,25 @@ class EmbeddingSearchProvider(BaseModel):
     cache: EmbeddingsCacheConfig = Field(default_factory=EmbeddingsCacheConfig)
 
 
+class HybridSearchConfig(BaseModel):
+    """Configuration for combining the lexical (BM25) and the vector search."""
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether a BM25 index should be built and searched together with "
+        "the vector index, which helps with exact identifiers, e.g., product codes.",
+    )
+    rrf_k: int = Field(
+        default=60,
+        description="The constant used by the reciprocal rank fusion of the results; "
+        "higher values give more weight to the lower ranked results.",
+    )
+    num_candidates: int = Field(
+        default=20,
+        description="The number of results from each search that are fused.",
+    )
+
+
 class KnowledgeBaseConfig(BaseModel):
     folder: str = Field(
         default="kb",
@@ -221,6 +272,10 @@ class KnowledgeBaseConfig(BaseModel):
         default_factory=EmbeddingSearchProvider,
         description="The search provider used to search the knowledge base.",
     )
+    hybrid_search: HybridSearchConfig = Field(
+        default_factory=HybridSearchConfig,
+        description="Configuration for the hybrid lexical and vector search.",
+    )
 
 
 class CoreConfig(BaseModel):
@@ -239,6 +294,30 @@ class InputRails(BaseModel):
         default_factory=list,
         description="The names of all the flows that implement input rails.",
     )
+    speculative_dialog: bool = Field(
+        default=False,
+        description="Whether the user intent generation and the knowledge base retrieval "
+        "should start while the input rails are running. The results are used only if the "
+        "input rails don't block or alter the user message.",
+    )
+
+
+class OutputRailsStreamingConfig(BaseModel):
+    """Configuration for running the output rails in streaming mode."""
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether the output rails should be applied on chunks of the bot message "
+        "while it is being streamed.",
+    )
+    chunk_size: int = Field(
+        default=200,
+        description="The maximum number of tokens in a chunk checked by the output rails.",
+    )
+    sentence_boundaries: bool = Field(
+        default=False,
+        description="Whether a chunk should also end at a sentence boundary.",
+    )
 
 
 class OutputRails(BaseModel):
@@ -248,6 +327,10 @@ class OutputRails(BaseModel):
         default_factory=list,
         description="The names of all the flows that implement output rails.",
     )
+    streaming: OutputRailsStreamingConfig = Field(
+        default_factory=OutputRailsStreamingConfig,
+        description="Configuration for running the output rails in streaming mode.",
+    )
 
 
 class RetrievalRails(BaseModel):
@@ -259,6 +342,28 @@ class RetrievalRails(BaseModel):
     )
 
 
+class ActionsCacheConfig(BaseModel):
+    """Configuration for the cache of the actions declared using `@action(cache=...)`."""
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether the results of the cacheable actions should be cached.",
+    )
+    store: str = Field(
+        default="memory",
+        description="The store used for the cached results: `memory` or `redis`.",
+    )
+    store_config: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="The configuration of the store, e.g. the `url` for `redis`.",
+    )
+    key_prefix: str = Field(
+        default="action_cache:",
+        description="The prefix for the keys saved in an external store. A fingerprint "
+        "of the configuration is always added to it.",
+    )
+
+
 class ActionRails(BaseModel):
     """Configuration of action rails.
 
@@ -273,6 +378,26 @@ class ActionRails(BaseModel):
         default=None,
         description="The names of all actions which should finish instantly.",
     )
+    offload_sync_actions: bool = Field(
+        default=False,
+        description="Whether all synchronous actions should be executed in a thread "
+        "pool, so that they don't block the event loop. Otherwise, only the actions "
+        "marked with `@action(blocking=True)` are.",
+    )
+    thread_pool_max_workers: Optional[int] = Field(
+        default=None,
+        description="The maximum number of threads used for synchronous actions. "
+        "If not set, the default for `ThreadPoolExecutor` is used.",
+    )
+    process_pool_max_workers: Optional[int] = Field(
+        default=None,
+        description="The maximum number of processes used for CPU-bound actions. "
+        "If not set, the number of CPUs is used.",
+    )
+    cache: ActionsCacheConfig = Field(
+        default_factory=ActionsCacheConfig,
+        description="Configuration for caching the results of idempotent actions.",
+    )
 
 
 class SingleCallConfig(BaseModel):
@@ -317,6 +442,25 @@ class FactCheckingRailConfig(BaseModel):
     )
 
 
+class HallucinationRailConfig(BaseModel):
+    """Configuration data for the hallucination rail."""
+
+    num_extra_responses: int = Field(
+        default=2,
+        description="The number of extra responses sampled for the self-consistency check.",
+    )
+    min_extra_responses: Optional[int] = Field(
+        default=None,
+        description="The number of extra responses after which the agreement check starts. "
+        "Any samples still in progress are cancelled. If not set, all extra responses are used.",
+    )
+    max_concurrency: int = Field(
+        default=2,
+        description="The maximum number of concurrent LLM calls used for sampling the extra "
+        "responses, for LLMs that can't return multiple completions in a single call.",
+    )
+
+
 class JailbreakDetectionConfig(BaseModel):
     """Configuration data for jailbreak detection."""
 
@@ -355,6 +499,24 @@ class AutoAlignRailConfig(BaseModel):
     )
 
 
+class PromptCachingConfig(BaseModel):
+    """Configuration for caching the responses of deterministic LLM calls."""
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether the responses of the LLM calls made with the lowest "
+        "temperature (e.g., for intent generation and self checks) should be cached.",
+    )
+    max_size: int = Field(
+        default=1024,
+        description="The maximum number of responses kept in memory.",
+    )
+    ttl: Optional[float] = Field(
+        default=None,
+        description="The number of seconds after which a cached response expires.",
+    )
+
+
 class RailsConfigData(BaseModel):
     """Configuration data for specific rails that are supported out-of-the-box."""
 
@@ -373,6 +535,11 @@ class RailsConfigData(BaseModel):
         description="Configuration for detecting sensitive data.",
     )
 
+    hallucination: HallucinationRailConfig = Field(
+        default_factory=HallucinationRailConfig,
+        description="Configuration data for the hallucination rail.",
+    )
+
     jailbreak_detection: Optional[JailbreakDetectionConfig] = Field(
         default_factory=JailbreakDetectionConfig,
         description="Configuration for jailbreak detection.",
@@ -476,6 +643,7 @@ def _join_config(dest_config: dict, additional_config: dict):
         "sample_conversation",
         "lowest_temperature",
         "enable_multi_step_generation",
+        "prompt_caching",
         "colang_version",
         "custom_data",
         "prompting_mode",
@@ -549,10 +717,15 @@ def _load_path(
                 if rel_path.startswith("kb"):
                     _raw_config = {"docs": []}
                     if rel_path.endswith(".md"):
-                        with open(full_path, encoding="utf-8") as f:
-                            _raw_config["docs"].append(
-                                {"format": "md", "content": f.read()}
-                            )
+                        # The content is read only when the knowledge base is built.
+                        doc = {"format": "md", "path": full_path}
+
+                        # The documents in a subfolder belong to a named collection.
+                        rel_path_parts = rel_path.split(os.path.sep)
+                        if len(rel_path_parts) > 2:
+                            doc["collection"] = rel_path_parts[1]
+
+                        _raw_config["docs"].append(doc)
 
                 elif file.endswith(".yml") or file.endswith(".yaml"):
                     with open(full_path, "r", encoding="utf-8") as f:
@@ -630,6 +803,9 @@ def _parse_colang_files_recursively(
     """
     colang_version = raw_config.get("colang_version", "1.0")
 
+    # The parsed files are cached on disk, so that only new or changed files are parsed.
+    parse_cache = get_colang_parse_cache()
+
     # We start parsing the colang files one by one, and if we have
     # new import paths, we continue to update
     while len(parsed_colang_files) != len(colang_files):
@@ -638,9 +814,14 @@ def _parse_colang_files_recursively(
         with open(current_path, "r", encoding="utf-8") as f:
             try:
                 content = f.read()
-                _parsed_config = parse_colang_file(
-                    current_file, content=content, version=colang_version
-                )
+                if parse_cache is not None:
+                    _parsed_config = parse_cache.parse_colang_file(
+                        current_file, content=content, version=colang_version
+                    )
+                else:
+                    _parsed_config = parse_colang_file(
+                        current_file, content=content, version=colang_version
+                    )
             except Exception as e:
                 raise ColangParsingError(
                     f"Error while parsing Colang file: {current_path}\n"
@@ -748,6 +929,11 @@ class RailsConfig(BaseModel):
         description="Whether to enable multi-step generation for the LLM.",
     )
 
+    prompt_caching: PromptCachingConfig = Field(
+        default_factory=PromptCachingConfig,
+        description="Configuration for caching the responses of deterministic LLM calls.",
+    )
+
     colang_version: str = Field(default="1.0", description="The Colang version to use.")
 
     custom_data: Dict = Field(
@@ -962,9 +1148,10 @@ class RailsConfig(BaseModel):
     def streaming_supported(self):
         """Whether the current config supports streaming or not.
 
-        Currently, we don't support streaming if there are output rails.
+        Currently, we don't support streaming if there are output rails, unless the
+        output rails are configured to run in streaming mode.
         """
-        if len(self.rails.output.flows) > 0:
+        if len(self.rails.output.flows) > 0 and not self.rails.output.streaming.enabled:
             return False
 
         return True
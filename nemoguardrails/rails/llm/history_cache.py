@@ -0,0 +1,155 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache for the events history associated with a sequence of messages."""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from nemoguardrails.server.datastore.datastore import DataStore
+
+log = logging.getLogger(__name__)
+
+# The default maximum number of conversations kept in memory.
+DEFAULT_MAX_SIZE = 1024
+
+# The default number of seconds the entries are kept in a data store.
+DEFAULT_DATASTORE_TTL = 24 * 3600
+
+
+class EventsHistoryCache:
+    """A bounded cache for the events history of Colang 1.0 conversations.
+
+    The entries are kept in memory, in LRU order, up to `max_size` entries and, if
+    provided, for at most `ttl` seconds.
+
+    If a `DataStore` is provided, the entries are saved there instead, so that they can
+    be shared between multiple server workers. In this case, `max_size` does not apply,
+    and the entries expire after `ttl` seconds (one day, by default). Only the events
+    that can be serialized to JSON are saved, so that they are restored as they were.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttl: Optional[float] = None,
+        datastore: Optional[DataStore] = None,
+        key_prefix: str = "events_history:",
+    ):
+        """Constructor.
+
+        Args:
+            max_size: The maximum number of entries kept in memory.
+            ttl: [Optional] The number of seconds after which an entry expires. For a
+                data store, it defaults to `DEFAULT_DATASTORE_TTL`.
+            datastore: [Optional] An external data store where the entries are saved.
+            key_prefix: The prefix for the keys saved in the data store.
+        """
+        if datastore is not None and ttl is None:
+            ttl = DEFAULT_DATASTORE_TTL
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.datastore = datastore
+        self.key_prefix = key_prefix
+
+        # Dict[key, (expires_at, events)]
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[List[dict]]:
+        """Returns a copy of the events history for the specified key.
+
+        Args:
+            key: The key to lookup.
+
+        Returns:
+            None if the key does not exist or has expired.
+        """
+        if self.datastore is not None:
+            value = await self.datastore.get(self.key_prefix + key)
+            return json.loads(value) if value is not None else None
+
+        if key not in self._entries:
+            return None
+
+        expires_at, events = self._entries[key]
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return events.copy()
+
+    async def get_last(self, keys: List[str]) -> Tuple[int, Optional[List[dict]]]:
+        """Returns the events history for the last of the keys that has an entry.
+
+        With a data store, all the keys are looked up with a single request.
+
+        Args:
+            keys: The keys to lookup, e.g., for all the prefixes of a conversation.
+
+        Returns:
+            The index of the key and a copy of its events history, or (-1, None) if
+            none of the keys has an entry.
+        """
+        if self.datastore is not None:
+            values = await self.datastore.get_many(
+                [self.key_prefix + key for key in keys]
+            )
+            for i in reversed(range(len(values))):
+                if values[i] is not None:
+                    return i, json.loads(values[i])
+
+            return -1, None
+
+        for i in reversed(range(len(keys))):
+            events = await self.get(keys[i])
+            if events is not None:
+                return i, events
+
+        return -1, None
+
+    async def set(self, key: str, events: List[dict]):
+        """Saves the events history for the specified key.
+
+        Args:
+            key: The key to use.
+            events: The events history.
+        """
+        if self.datastore is not None:
+            # If the events contain values that can't be serialized (e.g., custom
+            # objects in context updates), they are not saved, as they would not be
+            # restored as they were.
+            try:
+                value = json.dumps(events)
+            except (TypeError, ValueError) as e:
+                log.warning(f"The events history can't be saved in the data store: {e}")
+                return
+
+            await self.datastore.set(self.key_prefix + key, value, ttl=self.ttl)
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (expires_at, events)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -22,11 +22,23 @@ import re
 import threading
 import time
 import warnings
-from typing import Any, AsyncIterator, List, Optional, Tuple, Type, Union, cast
+import weakref
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
 from langchain.llms.base import BaseLLM
 
 from nemoguardrails.actions.llm.generation import LLMGenerationActions
+from nemoguardrails.actions.llm.speculation import SpeculativeTasks
 from nemoguardrails.actions.llm.utils import get_colang_history
 from nemoguardrails.actions.v2_x.generation import LLMGenerationActionsV2dotx
 from nemoguardrails.colang import parse_colang_file
@@ -41,14 +53,18 @@ from nemoguardrails.colang.v2_x.runtime.serialization import (
 from nemoguardrails.context import (
     explain_info_var,
     generation_options_var,
+    llm_response_cache_var,
     llm_stats_var,
     raw_llm_request,
+    speculative_tasks_var,
     streaming_handler_var,
 )
 from nemoguardrails.embeddings.index import EmbeddingsIndex
+from nemoguardrails.embeddings.progress import IndexingProgress
 from nemoguardrails.embeddings.providers import register_embedding_provider
 from nemoguardrails.embeddings.providers.base import EmbeddingModel
 from nemoguardrails.kb.kb import KnowledgeBase
+from nemoguardrails.llm.prompt_cache import LLMResponseCache
 from nemoguardrails.llm.providers import get_llm_provider, get_llm_provider_names
 from nemoguardrails.logging.explain import ExplainInfo
 from nemoguardrails.logging.processing_log import compute_generation_log
@@ -56,18 +72,22 @@ from nemoguardrails.logging.stats import LLMStats
 from nemoguardrails.logging.verbose import set_verbose
 from nemoguardrails.patch_asyncio import check_sync_call_from_async_loop
 from nemoguardrails.rails.llm.config import EmbeddingSearchProvider, RailsConfig
+from nemoguardrails.rails.llm.history_cache import EventsHistoryCache
 from nemoguardrails.rails.llm.options import (
     GenerationLog,
     GenerationOptions,
     GenerationResponse,
+    RailCheckResult,
+    RailsCheckResponse,
 )
-from nemoguardrails.rails.llm.utils import get_history_cache_key
+from nemoguardrails.rails.llm.utils import get_history_cache_keys
 from nemoguardrails.streaming import StreamingHandler
 from nemoguardrails.utils import get_or_create_event_loop, new_event_dict, new_uuid
 
 log = logging.getLogger(__name__)
 
-process_events_semaphore = asyncio.Semaphore(1)
+# The default number of conversations processed concurrently by `generate_batch_async`.
+DEFAULT_BATCH_CONCURRENCY = 16
 
 
 class LLMRails:
@@ -78,7 +98,11 @@ class LLMRails:
     runtime: Runtime
 
     def __init__(
-        self, config: RailsConfig, llm: Optional[BaseLLM] = None, verbose: bool = False
+        self,
+        config: RailsConfig,
+        llm: Optional[BaseLLM] = None,
+        verbose: bool = False,
+        indexing_progress: Optional[IndexingProgress] = None,
     ):
         """Initializes the LLMRails instance.
 
@@ -86,10 +110,13 @@ class LLMRails:
             config: A rails configuration.
             llm: An optional LLM engine to use.
             verbose: Whether the logging should be verbose or not.
+            indexing_progress: An optional object to track the progress of building
+                the embeddings indexes, e.g., from another thread.
         """
         self.config = config
         self.llm = llm
         self.verbose = verbose
+        self.indexing_progress = indexing_progress or IndexingProgress()
 
         if self.verbose:
             set_verbose(True, llm_calls=True)
@@ -105,7 +132,26 @@ class LLMRails:
         # We keep a cache of the events history associated with a sequence of user messages.
         # TODO: when we update the interface to allow to return a "state object", this
         #   should be removed
-        self.events_history_cache = {}
+        self.events_history_cache = EventsHistoryCache()
+
+        # The cache for the responses of the deterministic LLM calls, if enabled.
+        self.llm_response_cache = None
+        if config.prompt_caching.enabled:
+            self.llm_response_cache = LLMResponseCache(
+                max_size=config.prompt_caching.max_size,
+                ttl=config.prompt_caching.ttl,
+                max_temperature=config.lowest_temperature or 0.0,
+            )
+
+        # The locks used to process the events for a state one call at a time.
+        # Independent states (i.e., conversations) are processed concurrently.
+        # Dict[id(state), asyncio.Lock]
+        self._state_locks = weakref.WeakValueDictionary()
+
+        # The number of batch generations in progress, and the embeddings indexes for
+        # which batching was enabled because of them.
+        self._batch_generations_count = 0
+        self._batched_indexes = []
 
         # Weather the main LLM supports streaming
         self.main_llm_supports_streaming = False
@@ -213,33 +259,58 @@ class LLMRails:
         # Next, we initialize the LLM engines (main engine and action engines if specified).
         self._init_llms()
 
-        # Next, we initialize the LLM Generate actions and register them.
-        llm_generation_actions_class = (
-            LLMGenerationActions
-            if config.colang_version == "1.0"
-            else LLMGenerationActionsV2dotx
-        )
-        self.llm_generation_actions = llm_generation_actions_class(
-            config=config,
-            llm=self.llm,
-            llm_task_manager=self.runtime.llm_task_manager,
-            get_embedding_search_provider_instance=self._get_embeddings_search_provider_instance,
-            verbose=verbose,
-        )
-
-        # If there's already an action registered, we don't override.
-        self.runtime.register_actions(self.llm_generation_actions, override=False)
-
-        # Next, we initialize the Knowledge Base
+        # The Knowledge Base is initialized in a separate thread, concurrently with the
+        # indexes of the LLM Generation actions.
         # There are still some edge cases not covered by nest_asyncio.
         # Using a separate thread always for now.
-        loop = get_or_create_event_loop()
-        if True or check_sync_call_from_async_loop():
-            t = threading.Thread(target=asyncio.run, args=(self._init_kb(),))
-            t.start()
-            t.join()
-        else:
-            loop.run_until_complete(self._init_kb())
+        kb_errors = []
+
+        def _run_init_kb():
+            try:
+                asyncio.run(self._init_kb())
+            except Exception as e:
+                kb_errors.append(e)
+
+        kb_thread = threading.Thread(target=_run_init_kb)
+        kb_thread.start()
+
+        try:
+            # Next, we initialize the LLM Generate actions and register them.
+            llm_generation_actions_class = (
+                LLMGenerationActions
+                if config.colang_version == "1.0"
+                else LLMGenerationActionsV2dotx
+            )
+            self.llm_generation_actions = llm_generation_actions_class(
+                config=config,
+                llm=self.llm,
+                llm_task_manager=self.runtime.llm_task_manager,
+                get_embedding_search_provider_instance=self._get_embeddings_search_provider_instance,
+                verbose=verbose,
+                indexing_progress=self.indexing_progress,
+            )
+
+            # If there's already an action registered, we don't override.
+            self.runtime.register_actions(self.llm_generation_actions, override=False)
+
+            # The output rails can be applied on the chunks of a streamed bot message.
+            if config.colang_version == "1.0":
+                self.llm_generation_actions.output_rails_streaming_fn = (
+                    self._run_output_rails_in_streaming
+                )
+        except Exception as e:
+            self.indexing_progress.set_failed(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            # We wait for the Knowledge Base to be initialized, also on errors.
+            kb_thread.join()
+
+        if kb_errors:
+            e = kb_errors[0]
+            self.indexing_progress.set_failed(f"{type(e).__name__}: {e}")
+            raise e
+
+        self.indexing_progress.set_ready()
 
         # We also register the kb as a parameter that can be passed to actions.
         self.runtime.register_action_param("kb", self.kb)
@@ -293,14 +364,15 @@ class LLMRails:
         if not self.config.docs:
             return
 
-        documents = [doc.content for doc in self.config.docs]
+        # The documents are read and split into chunks one at a time, while building.
+        self.indexing_progress.start("kb")
         self.kb = KnowledgeBase(
-            documents=documents,
+            documents=self.config.docs,
             config=self.config.knowledge_base,
             get_embedding_search_provider_instance=self._get_embeddings_search_provider_instance,
         )
-        self.kb.init()
         await self.kb.build()
+        self.indexing_progress.finish("kb")
 
     def _init_llms(self):
         """
@@ -386,6 +458,14 @@ class LLMRails:
         if esp_config.name == "default":
             from nemoguardrails.embeddings.basic import BasicEmbeddingsIndex
 
+            extra_params = [
+                "use_batching",
+                "max_batch_size",
+                "max_batch_hold",
+                "quantization",
+                "embedding_dimensions",
+            ]
+
             return BasicEmbeddingsIndex(
                 embedding_model=esp_config.parameters.get(
                     "embedding_model", self.default_embedding_model
@@ -398,8 +478,7 @@ class LLMRails:
                 **{
                     k: v
                     for k, v in esp_config.parameters.items()
-                    if k in ["use_batching", "max_batch_size", "matx_batch_hold"]
-                    and v is not None
+                    if k in extra_params and v is not None
                 },
             )
         else:
@@ -409,7 +488,7 @@ class LLMRails:
                 kwargs = esp_config.parameters
                 return self.embedding_search_providers[esp_config.name](**kwargs)
 
-    def _get_events_for_messages(self, messages: List[dict], state: Any):
+    async def _get_events_for_messages(self, messages: List[dict], state: Any):
         """Return the list of events corresponding to the provided messages.
 
         Tries to find a prefix of messages for which we have already a list of events
@@ -432,14 +511,17 @@ class LLMRails:
         if self.config.colang_version == "1.0":
             # We try to find the longest prefix of messages for which we have a cache
             # of events.
-            p = len(messages) - 1
-            while p > 0:
-                cache_key = get_history_cache_key(messages[0:p])
-                if cache_key in self.events_history_cache:
-                    events = self.events_history_cache[cache_key].copy()
-                    break
-
-                p -= 1
+            # All the prefixes are looked up at once (i.e., a single request when the
+            # cache uses a data store).
+            cache_keys = get_history_cache_keys(messages)
+            i, cached_events = await self.events_history_cache.get_last(
+                cache_keys[1 : len(messages)]
+            )
+            if cached_events is not None:
+                events = cached_events
+                p = i + 1
+            else:
+                p = 0
 
             # For the rest of the messages, we transform them directly into events.
             # TODO: Move this to separate function once more types of messages are supported.
@@ -517,6 +599,27 @@ class LLMRails:
 
         return events
 
+    async def _generate_events_v1_0(
+        self, events: List[dict], processing_log: List[dict]
+    ) -> List[dict]:
+        """Generates the next events using the Colang 1.0 runtime.
+
+        If speculative dialog generation is enabled, the speculative tasks that were not
+        used (e.g., because an input rail blocked the message) are cancelled at the end.
+        """
+        speculative_tasks = None
+        if self.config.rails.input.speculative_dialog:
+            speculative_tasks = SpeculativeTasks()
+        speculative_tasks_var.set(speculative_tasks)
+
+        try:
+            return await self.runtime.generate_events(
+                events, processing_log=processing_log
+            )
+        finally:
+            if speculative_tasks is not None:
+                speculative_tasks.cancel_all()
+
     async def generate_async(
         self,
         prompt: Optional[str] = None,
@@ -631,10 +734,11 @@ class LLMRails:
         # Initialize the LLM stats
         llm_stats = LLMStats()
         llm_stats_var.set(llm_stats)
+        llm_response_cache_var.set(self.llm_response_cache)
         processing_log = []
 
         # The array of events corresponding to the provided sequence of messages.
-        events = self._get_events_for_messages(messages, state)
+        events = await self._get_events_for_messages(messages, state)
 
         if self.config.colang_version == "1.0":
             # If we had a state object, we also need to prepend the events from the state.
@@ -644,7 +748,7 @@ class LLMRails:
                 state_events = state["events"]
 
             # Compute the new events.
-            new_events = await self.runtime.generate_events(
+            new_events = await self._generate_events_v1_0(
                 state_events + events, processing_log=processing_log
             )
             output_state = None
@@ -724,8 +828,8 @@ class LLMRails:
             # If a state object is not used, then we use the implicit caching
             if state is None:
                 # Save the new events in the history and update the cache
-                cache_key = get_history_cache_key(messages + [new_message])
-                self.events_history_cache[cache_key] = events
+                cache_key = get_history_cache_keys(messages + [new_message])[-1]
+                await self.events_history_cache.set(cache_key, events)
             else:
                 output_state = {"events": events}
 
@@ -865,6 +969,240 @@ class LLMRails:
 
         return streaming_handler
 
+    def _enable_embeddings_batching(self):
+        """Enables batching on the embeddings indexes that support it.
+
+        This way, the embedding searches from concurrent conversations are coalesced
+        into shared batches.
+        """
+        self._batch_generations_count += 1
+        if self._batch_generations_count > 1:
+            return
+
+        indexes = [
+            value
+            for value in vars(self.llm_generation_actions).values()
+            if isinstance(value, EmbeddingsIndex)
+        ]
+        if self.kb:
+            indexes.extend(self.kb.indexes.values())
+
+        self._batched_indexes = [
+            index
+            for index in indexes
+            if hasattr(index, "use_batching") and not index.use_batching
+        ]
+        for index in self._batched_indexes:
+            index.use_batching = True
+
+    def _disable_embeddings_batching(self):
+        """Reverts `_enable_embeddings_batching`, when no batch generation is left."""
+        self._batch_generations_count -= 1
+        if self._batch_generations_count > 0:
+            return
+
+        for index in self._batched_indexes:
+            index.use_batching = False
+        self._batched_indexes = []
+
+    async def generate_batch_async(
+        self,
+        messages_batch: Iterable[List[dict]],
+        options: Optional[Union[dict, GenerationOptions]] = None,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """Generate the next message for a batch of conversations.
+
+        At most `concurrency` conversations are processed at the same time, and the
+        embedding searches across the batch are coalesced into shared batches. The
+        batch is consumed lazily, so it can be a generator over a large dataset.
+
+        Example:
+
+        ```python
+            async for idx, response in rails.generate_batch_async(messages_batch):
+                if isinstance(response, Exception):
+                    ...
+        ```
+
+        Args:
+            messages_batch: The list of conversations, each one a list of messages in
+              the format used by `generate_async`.
+            options: Options specific for the generation, used for all conversations.
+            concurrency: The maximum number of conversations processed concurrently.
+
+        Returns:
+            An async iterator over `(index, response)` tuples, in completion order,
+            where `index` is the position of the conversation in the batch. If the
+            generation failed for a conversation, the response is the exception.
+        """
+        if concurrency < 1:
+            raise ValueError("The batch concurrency must be at least 1.")
+
+        async def _generate(idx: int, messages: List[dict]) -> Tuple[int, Any]:
+            try:
+                return idx, await self.generate_async(
+                    messages=messages, options=options
+                )
+            except Exception as ex:
+                log.warning(f"Generation failed for conversation {idx} in batch: {ex}")
+                return idx, ex
+
+        conversations = enumerate(messages_batch)
+        pending = set()
+
+        self._enable_embeddings_batching()
+        try:
+            while True:
+                # We start new conversations, up to the concurrency limit.
+                for idx, messages in conversations:
+                    pending.add(asyncio.create_task(_generate(idx, messages)))
+                    if len(pending) >= concurrency:
+                        break
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+            self._disable_embeddings_batching()
+
+    async def _check_rails(
+        self,
+        rails_type: str,
+        options: GenerationOptions,
+        events: List[dict],
+        text: str,
+    ) -> RailsCheckResponse:
+        """Runs only the input or output rails, starting from the provided events.
+
+        Args:
+            rails_type: The type of the rails, "input" or "output".
+            options: The generation options, which enable only the checked rails.
+            events: The events that trigger the rails.
+            text: The text that is checked.
+
+        Returns:
+            The verdict of the rails.
+        """
+        if self.config.colang_version != "1.0":
+            raise ValueError("Checking rails is not supported for Colang 2.0 configs.")
+
+        # The options are set only while the rails run, so they don't leak into the
+        # subsequent calls from the same context. The messages generated by the rails
+        # themselves are not streamed.
+        generation_options_token = generation_options_var.set(options)
+        streaming_handler_token = streaming_handler_var.set(None)
+        try:
+            new_events = await self.runtime.generate_events(events)
+        finally:
+            streaming_handler_var.reset(streaming_handler_token)
+            generation_options_var.reset(generation_options_token)
+
+        # The rails are marked by events, e.g., StartInputRail and InputRailFinished.
+        prefix = rails_type.capitalize()
+        started = [
+            event["flow_id"]
+            for event in new_events
+            if event["type"] == f"Start{prefix}Rail"
+        ]
+        finished = [
+            event["flow_id"]
+            for event in new_events
+            if event["type"] == f"{prefix}RailFinished"
+        ]
+
+        rails = []
+        for flow_id in getattr(self.config.rails, rails_type).flows:
+            if flow_id in finished:
+                status = "passed"
+            elif flow_id in started:
+                status = "blocked"
+            else:
+                status = "skipped"
+            rails.append(RailCheckResult(name=flow_id, status=status))
+
+        scripts = [
+            event["script"]
+            for event in new_events
+            if event["type"] == "StartUtteranceBotAction"
+        ]
+
+        if all(rail.status != "blocked" for rail in rails):
+            return RailsCheckResponse(
+                passed=True, text=scripts[-1] if scripts else text, rails=rails
+            )
+
+        return RailsCheckResponse(
+            passed=False, response="\n".join(scripts) or None, rails=rails
+        )
+
+    async def check_input_async(
+        self, text: str, context: Optional[dict] = None
+    ) -> RailsCheckResponse:
+        """Checks a user message using only the input rails.
+
+        The dialog rails and the output rails are not used, so no response is generated
+        for the user message.
+
+        Args:
+            text: The user message.
+            context: Additional context data.
+
+        Returns:
+            The verdict of the input rails.
+        """
+        options = GenerationOptions(
+            rails={"input": True, "dialog": False, "retrieval": False, "output": False}
+        )
+        events = [
+            new_event_dict(
+                "ContextUpdate",
+                data={**(context or {}), "generation_options": options.dict()},
+            ),
+            {"type": "UtteranceUserActionFinished", "final_transcript": text},
+        ]
+
+        return await self._check_rails("input", options, events, text)
+
+    async def check_output_async(
+        self, text: str, context: Optional[dict] = None
+    ) -> RailsCheckResponse:
+        """Checks a bot message using only the output rails.
+
+        Args:
+            text: The bot message.
+            context: Additional context data, e.g., the `user_message` to which the
+              bot message is a response.
+
+        Returns:
+            The verdict of the output rails.
+        """
+        options = GenerationOptions(
+            rails={"input": False, "dialog": False, "retrieval": False, "output": True}
+        )
+        events = [
+            new_event_dict(
+                "ContextUpdate",
+                data={
+                    **(context or {}),
+                    "generation_options": options.dict(),
+                    "bot_message": text,
+                    "skip_output_rails": False,
+                },
+            ),
+            new_event_dict("BotMessage", text=text),
+        ]
+
+        return await self._check_rails("output", options, events, text)
+
     def generate(
         self,
         prompt: Optional[str] = None,
@@ -893,6 +1231,26 @@ class LLMRails:
             )
         )
 
+    async def _run_output_rails_in_streaming(
+        self, text: str, context: dict
+    ) -> Tuple[bool, str]:
+        """Runs the output rails on a chunk of a bot message that is being streamed.
+
+        Args:
+            text: The text of the chunk.
+            context: The context in which the bot message is generated.
+
+        Returns:
+            (passed, text) If the chunk passed the output rails, the text of the
+              chunk (which can be altered by the output rails). Otherwise, the
+              response from the output rails.
+        """
+        res = await self.check_output_async(text, context)
+        if res.passed:
+            return True, res.text
+
+        return False, res.response or ""
+
     async def generate_events_async(
         self,
         events: List[dict],
@@ -921,12 +1279,18 @@ class LLMRails:
         # Initialize the LLM stats
         llm_stats = LLMStats()
         llm_stats_var.set(llm_stats)
+        llm_response_cache_var.set(self.llm_response_cache)
 
         # Compute the new events.
         processing_log = []
-        new_events = await self.runtime.generate_events(
-            events, processing_log=processing_log
-        )
+        if self.config.colang_version == "1.0":
+            new_events = await self._generate_events_v1_0(
+                events, processing_log=processing_log
+            )
+        else:
+            new_events = await self.runtime.generate_events(
+                events, processing_log=processing_log
+            )
 
         # If logging is enabled, we log the conversation
         # TODO: add support for logging flag
@@ -954,6 +1318,18 @@ class LLMRails:
         loop = get_or_create_event_loop()
         return loop.run_until_complete(self.generate_events_async(events=events))
 
+    def _get_state_lock(self, state: Union[dict, State]) -> asyncio.Lock:
+        """Returns the lock used to process the events for the provided state.
+
+        The lock is kept only while it is in use.
+        """
+        lock = self._state_locks.get(id(state))
+        if lock is None:
+            lock = asyncio.Lock()
+            self._state_locks[id(state)] = lock
+
+        return lock
+
     async def process_events_async(
         self,
         events: List[dict],
@@ -976,11 +1352,17 @@ class LLMRails:
         t0 = time.time()
         llm_stats = LLMStats()
         llm_stats_var.set(llm_stats)
+        llm_response_cache_var.set(self.llm_response_cache)
 
         # Compute the new events.
-        # We need to protect 'process_events' to be called only once at a time
-        # TODO (cschueller): Why is this?
-        async with process_events_semaphore:
+        # The same state can't be processed concurrently, as the processing mutates it.
+        # A new state is created when not provided, so there's nothing to protect.
+        if state:
+            async with self._get_state_lock(state):
+                output_events, output_state = await self.runtime.process_events(
+                    events, state, blocking
+                )
+        else:
             output_events, output_state = await self.runtime.process_events(
                 events, state, blocking
             )
@@ -1012,6 +1394,11 @@ class LLMRails:
             self.process_events_async(events, state, blocking)
         )
 
+    async def close(self):
+        """Releases the resources used by the rails, e.g., the connections to the
+        actions server."""
+        await self.runtime.close()
+
     def register_action(self, action: callable, name: Optional[str] = None):
         """Register a custom action for the rails configuration."""
         self.runtime.register_action(action, name)
@@ -1036,6 +1423,14 @@ class LLMRails:
         """
         self.runtime.llm_task_manager.register_prompt_context(name, value_or_fn)
 
+    def register_prompt_prefix_hook(self, hook: callable):
+        """Register a hook to mark the cacheable prefix of the rendered prompts.
+
+        :hook: A function called as `hook(task_name, prompt, prefix)`, which returns
+          the prompt to use.
+        """
+        self.runtime.llm_task_manager.register_prompt_prefix_hook(hook)
+
     def register_embedding_search_provider(
         self, name: str, cls: Type[EmbeddingsIndex]
     ) -> None:
@@ -410,5 +410,34 @@ class GenerationResponse(BaseModel):
     )
 
 
+class RailCheckResult(BaseModel):
+    """The result of checking a text with a rail."""
+
+    name: str = Field(description="The name of the rail, i.e., the name of the flow.")
+    status: str = Field(
+        description="The status of the rail: `passed`, `blocked` or `skipped` "
+        "(when a previous rail has blocked the text)."
+    )
+
+
+class RailsCheckResponse(BaseModel):
+    """The result of checking a text with the input or output rails."""
+
+    passed: bool = Field(description="Whether the text passed all the rails.")
+    text: Optional[str] = Field(
+        default=None,
+        description="The text after applying the rails, which can be altered by the rails "
+        "(e.g., masking sensitive data). Only set if the text passed.",
+    )
+    response: Optional[str] = Field(
+        default=None,
+        description="The response from the rails when the text is blocked "
+        "(e.g., a refusal message), if any.",
+    )
+    rails: List[RailCheckResult] = Field(
+        default_factory=list, description="The result for each of the rails."
+    )
+
+
 if __name__ == "__main__":
     print(GenerationOptions(**{"rails": {"input": False}}))
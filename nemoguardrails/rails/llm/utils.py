@@ -12,8 +12,23 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import hashlib
 import json
-from typing import List
+from typing import List, Optional
+
+
+def _get_history_cache_key_item(msg: dict) -> Optional[str]:
+    """Returns the text used for a message in the history cache key, if any."""
+    if msg["role"] == "user":
+        return msg["content"]
+    elif msg["role"] == "assistant":
+        return msg["content"]
+    elif msg["role"] == "context":
+        return json.dumps(msg["content"])
+    elif msg["role"] == "event":
+        return json.dumps(msg["event"])
+
+    return None
 
 
 def get_history_cache_key(messages: List[dict]) -> str:
@@ -31,15 +46,40 @@ def get_history_cache_key(messages: List[dict]) -> str:
     key_items = []
 
     for msg in messages:
-        if msg["role"] == "user":
-            key_items.append(msg["content"])
-        elif msg["role"] == "assistant":
-            key_items.append(msg["content"])
-        elif msg["role"] == "context":
-            key_items.append(json.dumps(msg["content"]))
-        elif msg["role"] == "event":
-            key_items.append(json.dumps(msg["event"]))
+        key_item = _get_history_cache_key_item(msg)
+        if key_item is not None:
+            key_items.append(key_item)
 
     history_cache_key = ":".join(key_items)
 
     return history_cache_key
+
+
+def get_history_cache_keys(messages: List[dict]) -> List[str]:
+    """Compute the cache keys for all the prefixes of a sequence of messages.
+
+    The keys are computed using a rolling hash, so the total cost is linear in the
+    size of the messages.
+
+    Args:
+        messages: The list of messages.
+
+    Returns:
+        A list with `len(messages) + 1` keys, where the i-th key corresponds to
+        `messages[0:i]`.
+    """
+    keys = [""]
+    key = ""
+    hasher = hashlib.sha256()
+
+    for msg in messages:
+        key_item = _get_history_cache_key_item(msg)
+        if key_item is not None:
+            data = key_item.encode("utf-8")
+            # We include the length, so that the boundaries between messages are unambiguous.
+            hasher.update(f"{len(data)}:".encode("utf-8") + data)
+            key = hasher.hexdigest()
+
+        keys.append(key)
+
+    return keys
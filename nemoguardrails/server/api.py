@@ -22,17 +22,20 @@ import time
 import warnings
 from typing import Any, List, Optional
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, ValidationInfo, field_validator, model_validator
 from starlette.responses import StreamingResponse
 from starlette.staticfiles import StaticFiles
 
 from nemoguardrails import LLMRails, RailsConfig, utils
+from nemoguardrails.embeddings.progress import IndexingProgress
+from nemoguardrails.rails.llm.history_cache import EventsHistoryCache
 from nemoguardrails.rails.llm.options import (
     GenerationLog,
     GenerationOptions,
     GenerationResponse,
+    RailsCheckResponse,
 )
 from nemoguardrails.server.datastore.datastore import DataStore
 from nemoguardrails.streaming import StreamingHandler
@@ -99,7 +102,9 @@ app.single_config_mode = False
 app.single_config_id = None
 
 
-class RequestBody(BaseModel):
+class BaseRequestBody(BaseModel):
+    """The fields for selecting the guardrails configuration, common to all requests."""
+
     config_id: Optional[str] = Field(
         default=os.getenv("DEFAULT_CONFIG_ID", None),
         description="The id of the configuration to be used. If not set, the default configuration will be used.",
@@ -111,6 +116,37 @@ class RequestBody(BaseModel):
         # alias="guardrails",
         validate_default=True,
     )
+
+    @model_validator(mode="before")
+    @classmethod
+    def ensure_config_id(cls, data: Any) -> Any:
+        if isinstance(data, dict):
+            if data.get("config_id") is not None and data.get("config_ids") is not None:
+                raise ValueError(
+                    "Only one of config_id or config_ids should be specified"
+                )
+            if data.get("config_id") is None and data.get("config_ids") is not None:
+                data["config_id"] = None
+            if data.get("config_id") is None and data.get("config_ids") is None:
+                warnings.warn(
+                    "No config_id or config_ids provided, using default config_id"
+                )
+        return data
+
+    @field_validator("config_ids", mode="after")
+    @classmethod
+    def ensure_config_ids(cls, v, info: ValidationInfo):
+        if (
+            v is None
+            and info.data.get("config_id")
+            and info.data.get("config_ids") is None
+        ):
+            # Populate config_ids with config_id if only config_id is provided
+            return [info.data["config_id"]]
+        return v
+
+
+class RequestBody(BaseRequestBody):
     thread_id: Optional[str] = Field(
         default=None,
         min_length=16,
@@ -139,33 +175,27 @@ class RequestBody(BaseModel):
         description="A state object that should be used to continue the interaction.",
     )
 
-    @model_validator(mode="before")
-    @classmethod
-    def ensure_config_id(cls, data: Any) -> Any:
-        if isinstance(data, dict):
-            if data.get("config_id") is not None and data.get("config_ids") is not None:
-                raise ValueError(
-                    "Only one of config_id or config_ids should be specified"
-                )
-            if data.get("config_id") is None and data.get("config_ids") is not None:
-                data["config_id"] = None
-            if data.get("config_id") is None and data.get("config_ids") is None:
-                warnings.warn(
-                    "No config_id or config_ids provided, using default config_id"
-                )
-        return data
 
-    @field_validator("config_ids", mode="after")
-    @classmethod
-    def ensure_config_ids(cls, v, info: ValidationInfo):
-        if (
-            v is None
-            and info.data.get("config_id")
-            and info.data.get("config_ids") is None
-        ):
-            # Populate config_ids with config_id if only config_id is provided
-            return [info.data["config_id"]]
-        return v
+class ChecksRequestBody(BaseRequestBody):
+    input: Optional[str] = Field(
+        default=None, description="The user message to be checked by the input rails."
+    )
+    output: Optional[str] = Field(
+        default=None, description="The bot message to be checked by the output rails."
+    )
+    context: Optional[dict] = Field(
+        default=None,
+        description="Additional context data to be used by the rails.",
+    )
+
+
+class ChecksResponseBody(BaseModel):
+    input: Optional[RailsCheckResponse] = Field(
+        default=None, description="The verdict of the input rails, if checked."
+    )
+    output: Optional[RailsCheckResponse] = Field(
+        default=None, description="The verdict of the output rails, if checked."
+    )
 
 
 class ResponseBody(BaseModel):
@@ -189,6 +219,22 @@ class ResponseBody(BaseModel):
     )
 
 
+@app.get(
+    "/v1/rails/configs/status",
+    summary="Get the initialization status of the loaded rails configurations.",
+)
+async def get_rails_configs_status():
+    """Returns the status of the configurations that are loaded or being loaded.
+
+    For each configuration, it reports whether the embeddings indexes are ready and the
+    progress of building them, so that clients can wait while a configuration is warming up.
+    """
+    return [
+        {"id": config_id, **indexing_progress.to_dict()}
+        for config_id, indexing_progress in llm_rails_indexing_progress.items()
+    ]
+
+
 @app.get(
     "/v1/rails/configs",
     summary="Get List of available rails configurations.",
@@ -222,6 +268,11 @@ async def get_rails_configs():
 llm_rails_instances = {}
 llm_rails_events_history_cache = {}
 
+# The progress of building the embeddings indexes, for each LLMRails instance, and the
+# pending initializations.
+llm_rails_indexing_progress = {}
+llm_rails_init_tasks = {}
+
 
 def _generate_cache_key(config_ids: List[str]) -> str:
     """Generates a cache key for the given config ids."""
@@ -263,17 +314,75 @@ def _get_rails(config_ids: List[str]) -> LLMRails:
         else:
             full_llm_rails_config += rails_config
 
-    llm_rails = LLMRails(config=full_llm_rails_config, verbose=True)
+    indexing_progress = IndexingProgress()
+    llm_rails_indexing_progress[configs_cache_key] = indexing_progress
+    try:
+        llm_rails = LLMRails(
+            config=full_llm_rails_config,
+            verbose=True,
+            indexing_progress=indexing_progress,
+        )
+    except Exception as e:
+        # The failure is reported in the status of the configuration.
+        if indexing_progress.error is None:
+            indexing_progress.set_failed(f"{type(e).__name__}: {e}")
+        raise
+
     llm_rails_instances[configs_cache_key] = llm_rails
 
-    # If we have a cache for the events, we restore it
-    llm_rails.events_history_cache = llm_rails_events_history_cache.get(
-        configs_cache_key, {}
-    )
+    # If we have a cache for the events, we restore it.
+    # If a datastore is registered, the events history is saved there, so that any
+    # server worker can continue a conversation.
+    if configs_cache_key in llm_rails_events_history_cache:
+        llm_rails.events_history_cache = llm_rails_events_history_cache[
+            configs_cache_key
+        ]
+    elif datastore is not None:
+        llm_rails.events_history_cache = EventsHistoryCache(
+            datastore=datastore, key_prefix=f"events_history:{configs_cache_key}:"
+        )
 
     return llm_rails
 
 
+async def _get_rails_async(config_ids: List[str]) -> LLMRails:
+    """Returns the rails instance for the given config id, without blocking.
+
+    The instance is initialized in a separate thread, so that the server keeps
+    responding (e.g., with the status of the configurations) while the embeddings
+    indexes are built. Concurrent requests for the same configuration share the
+    initialization.
+    """
+    configs_cache_key = _generate_cache_key(config_ids)
+
+    if configs_cache_key in llm_rails_instances:
+        return llm_rails_instances[configs_cache_key]
+
+    if configs_cache_key not in llm_rails_init_tasks:
+        loop = asyncio.get_running_loop()
+        init_task = loop.run_in_executor(None, _get_rails, config_ids)
+        init_task.add_done_callback(
+            lambda _: llm_rails_init_tasks.pop(configs_cache_key, None)
+        )
+        llm_rails_init_tasks[configs_cache_key] = init_task
+
+    return await asyncio.shield(llm_rails_init_tasks[configs_cache_key])
+
+
+def _get_config_ids(body: BaseRequestBody) -> List[str]:
+    """Returns the config ids for the request, or the default one."""
+    config_ids = body.config_ids
+    if not config_ids and app.default_config_id:
+        config_ids = [app.default_config_id]
+    elif not config_ids and not app.default_config_id:
+        raise GuardrailsConfigurationError(
+            "No 'config_id' provided and no default configuration is set for the server. "
+            "You must set a 'config_id' in your request or set use --default-config-id when . "
+        )
+
+    return config_ids
+
+
 @app.post(
     "/v1/chat/completions",
     response_model=ResponseBody,
@@ -293,16 +402,9 @@ async def chat_completion(body: RequestBody, request: Request):
     # Save the request headers in a context variable.
     api_request_headers.set(request.headers)
 
-    config_ids = body.config_ids
-    if not config_ids and app.default_config_id:
-        config_ids = [app.default_config_id]
-    elif not config_ids and not app.default_config_id:
-        raise GuardrailsConfigurationError(
-            "No 'config_id' provided and no default configuration is set for the server. "
-            "You must set a 'config_id' in your request or set use --default-config-id when . "
-        )
+    config_ids = _get_config_ids(body)
     try:
-        llm_rails = _get_rails(config_ids)
+        llm_rails = await _get_rails_async(config_ids)
     except ValueError as ex:
         log.exception(ex)
         return {
@@ -401,6 +503,54 @@ async def chat_completion(body: RequestBody, request: Request):
         }
 
 
+@app.post(
+    "/v1/guardrail/checks",
+    response_model=ChecksResponseBody,
+    response_model_exclude_none=True,
+)
+async def guardrail_checks(body: ChecksRequestBody, request: Request):
+    """Checks a user message and/or a bot message, using only the input/output rails.
+
+    No response is generated, i.e., the dialog rails are not used. When both the input
+    and the output are provided, the input is used as the `user_message` for the
+    output rails.
+    """
+    log.info("Got checks request for config %s", body.config_id)
+    for logger in registered_loggers:
+        asyncio.get_event_loop().create_task(
+            logger({"endpoint": "/v1/guardrail/checks", "body": body.json()})
+        )
+
+    # Save the request headers in a context variable.
+    api_request_headers.set(request.headers)
+
+    if body.input is None and body.output is None:
+        raise HTTPException(
+            status_code=422,
+            detail="At least one of `input` or `output` must be provided.",
+        )
+
+    config_ids = _get_config_ids(body)
+    try:
+        llm_rails = await _get_rails_async(config_ids)
+    except ValueError as ex:
+        log.exception(ex)
+        raise HTTPException(
+            status_code=422,
+            detail=f"Could not load the {config_ids} guardrails configuration.",
+        )
+
+    result = {}
+    context = body.context or {}
+    if body.input is not None:
+        result["input"] = await llm_rails.check_input_async(body.input, context)
+        context = {**context, "user_message": body.input}
+    if body.output is not None:
+        result["output"] = await llm_rails.check_output_async(body.output, context)
+
+    return result
+
+
 # By default, there are no challenges
 challenges = []
 
@@ -501,6 +651,14 @@ def shutdown_observer():
         pass
 
 
+@app.on_event("shutdown")
+async def close_rails():
+    """Releases the resources used by the rails instances."""
+    for llm_rails in list(llm_rails_instances.values()):
+        if llm_rails is not None:
+            await llm_rails.close()
+
+
 def start_auto_reload_monitoring():
     """Start a thread that monitors the config folder for changes."""
     try:
@@ -534,6 +692,7 @@ def start_auto_reload_monitoring():
                         if config_id in llm_rails_instances:
                             instance = llm_rails_instances[config_id]
                             del llm_rails_instances[config_id]
+                            llm_rails_indexing_progress.pop(config_id, None)
                             if instance:
                                 val = instance.events_history_cache
                                 # We save the events history cache, to restore it on the new instance
@@ -13,18 +13,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Optional
+from typing import List, Optional
 
 
 class DataStore:
     """A basic data store interface."""
 
-    async def set(self, key: str, value: str):
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
         """Save data into the datastore.
 
         Args:
             key: The key to use.
             value: The value associated with the key.
+            ttl: [Optional] The number of seconds after which the key expires.
 
         Returns:
             None
@@ -40,3 +41,16 @@ class DataStore:
             None if the key does not exist.
         """
         raise NotImplementedError()
+
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        """Return the values for the specified keys.
+
+        The data stores that support it should fetch all the values at once.
+
+        Args:
+            keys: The keys to lookup.
+
+        Returns:
+            The list of values, with None for the keys that do not exist.
+        """
+        return [await self.get(key) for key in keys]
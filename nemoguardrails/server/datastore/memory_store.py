@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
 from typing import Optional
 
 from nemoguardrails.server.datastore.datastore import DataStore
@@ -24,18 +25,24 @@ class MemoryStore(DataStore):
     def __init__(self):
         """Constructor."""
         self.data = {}
+        self.expires_at = {}
 
-    async def set(self, key: str, value: str):
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
         """Save data into the datastore.
 
         Args:
             key: The key to use.
             value: The value associated with the key.
+            ttl: [Optional] The number of seconds after which the key expires.
 
         Returns:
             None
         """
         self.data[key] = value
+        if ttl is not None:
+            self.expires_at[key] = time.monotonic() + ttl
+        else:
+            self.expires_at.pop(key, None)
 
     async def get(self, key: str) -> Optional[str]:
         """Return the value for the specified key.
@@ -45,4 +52,8 @@ class MemoryStore(DataStore):
         Returns:
             None if the key does not exist.
         """
+        if key in self.expires_at and self.expires_at[key] < time.monotonic():
+            del self.data[key]
+            del self.expires_at[key]
+
         return self.data.get(key)
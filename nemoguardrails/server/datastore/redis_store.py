@@ -14,7 +14,7 @@
 # limitations under the License.
 
 import asyncio
-from typing import Optional
+from typing import List, Optional
 
 import aioredis
 
@@ -42,17 +42,20 @@ class RedisStore(DataStore):
             url=url, username=username, password=password, decode_responses=True
         )
 
-    async def set(self, key: str, value: str):
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
         """Save data into the datastore.
 
         Args:
             key: The key to use.
             value: The value associated with the key.
+            ttl: [Optional] The number of seconds after which the key expires.
 
         Returns:
             None
         """
-        await self.client.set(key, value)
+        await self.client.set(
+            key, value, px=int(ttl * 1000) if ttl is not None else None
+        )
 
     async def get(self, key: str) -> Optional[str]:
         """Return the value for the specified key.
@@ -63,3 +66,17 @@ class RedisStore(DataStore):
             None if the key does not exist.
         """
         return await self.client.get(key)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        """Return the values for the specified keys, with a single request.
+
+        Args:
+            keys: The keys to lookup.
+
+        Returns:
+            The list of values, with None for the keys that do not exist.
+        """
+        if not keys:
+            return []
+
+        return await self.client.mget(keys)
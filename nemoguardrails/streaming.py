@@ -60,6 +60,11 @@ class StreamingHandler(AsyncCallbackHandler, AsyncIterator):
         # The current buffer, until we start the processing.
         self.buffer = ""
 
+        # The number of complete non-empty lines in the buffer, and the position
+        # where the current (incomplete) line starts.
+        self._buffer_lines_count = 0
+        self._buffer_line_start = 0
+
         # The full completion
         self.completion = ""
 
@@ -76,6 +81,11 @@ class StreamingHandler(AsyncCallbackHandler, AsyncIterator):
         # The stop chunks
         self.stop = []
 
+        # The partial matches of the suffix and the stop chunks, computed for the
+        # (suffix, stop) pair in the key.
+        self._partial_matches_key = None
+        self._partial_matches = ()
+
     def set_pattern(self, prefix: Optional[str] = None, suffix: Optional[str] = None):
         """Sets the patter that is expected.
 
@@ -111,19 +121,66 @@ class StreamingHandler(AsyncCallbackHandler, AsyncIterator):
             if len(top_k_lines) == k:
                 break
 
-        self.buffer = "\n".join(lines[i + 1 :])
+        self._set_buffer("\n".join(lines[i + 1 :]))
         return "\n".join(top_k_lines)
 
     async def enable_buffering(self):
         self.enable_buffer = True
-        self.buffer = ""
+        self._set_buffer("")
 
     async def disable_buffering(self):
         """When we disable the buffer, we process the buffer as a chunk."""
         self.enable_buffer = False
 
         await self.push_chunk(self.buffer)
-        self.buffer = ""
+        self._set_buffer("")
+
+    @staticmethod
+    def _is_nonempty_line(line: str) -> bool:
+        line = line.strip()
+        return len(line) > 0 and line[0] != "#"
+
+    def _set_buffer(self, buffer: str):
+        """Sets the content of the buffer and recounts the non-empty lines."""
+        self.buffer = buffer
+        self._buffer_line_start = buffer.rfind("\n") + 1
+        self._buffer_lines_count = sum(
+            1
+            for line in buffer[0 : self._buffer_line_start].split("\n")
+            if self._is_nonempty_line(line)
+        )
+
+    def _add_to_buffer(self, chunk: str):
+        """Adds a chunk to the buffer, counting only the lines that were completed."""
+        start = len(self.buffer)
+        self.buffer += chunk
+
+        last_new_line = self.buffer.rfind("\n", start)
+        if last_new_line != -1:
+            self._buffer_lines_count += sum(
+                1
+                for line in self.buffer[self._buffer_line_start : last_new_line].split(
+                    "\n"
+                )
+                if self._is_nonempty_line(line)
+            )
+            self._buffer_line_start = last_new_line + 1
+
+    def _get_partial_matches(self) -> tuple:
+        """Returns all the prefixes of the suffix and the stop chunks."""
+        key = (self.suffix, tuple(self.stop))
+        if key != self._partial_matches_key:
+            _chunks = ([self.suffix] if self.suffix else []) + list(self.stop)
+            self._partial_matches = tuple(
+                {
+                    _chunk[0:_len]
+                    for _chunk in _chunks
+                    for _len in range(1, len(_chunk) + 1)
+                }
+            )
+            self._partial_matches_key = key
+
+        return self._partial_matches
 
     async def __anext__(self):
         element = None
@@ -144,12 +201,14 @@ class StreamingHandler(AsyncCallbackHandler, AsyncIterator):
         If we need to pipe it to another streaming handler, we do that.
         """
         if self.enable_buffer:
-            self.buffer += chunk
+            self._add_to_buffer(chunk)
+
+            lines_count = self._buffer_lines_count
+            if self._is_nonempty_line(self.buffer[self._buffer_line_start :]):
+                lines_count += 1
 
-            lines = [line.strip() for line in self.buffer.split("\n")]
-            lines = [line for line in lines if len(line) > 0 and line[0] != "#"]
             # We wait until we got to k+1 lines, to make sure the k-th line is finished
-            if len(lines) > self.k > 0:
+            if lines_count > self.k > 0:
                 self.top_k_nonempty_lines_event.set()
         else:
             # Temporarily save the content of the completion before this new chunk.
@@ -157,11 +216,16 @@ class StreamingHandler(AsyncCallbackHandler, AsyncIterator):
             if chunk is not None:
                 self.completion += chunk
 
-                # Check if the completion contains one of the stop chunks
+                # Check if the completion contains one of the stop chunks.
+                # A new match must end in the current chunk, so we only search
+                # the tail of the completion.
                 for stop_chunk in self.stop:
-                    if stop_chunk in self.completion:
+                    idx = self.completion.find(
+                        stop_chunk, max(0, len(prev_completion) - len(stop_chunk) + 1)
+                    )
+                    if idx != -1:
                         # Make sure the stop chunk is not included
-                        self.completion = self.completion.split(stop_chunk)[0]
+                        self.completion = self.completion[0:idx]
 
                         # If the current chunk does add something new to the final completion
                         # We push that as well.
@@ -227,21 +291,9 @@ class StreamingHandler(AsyncCallbackHandler, AsyncIterator):
             if chunk is not None:
                 self.current_chunk += chunk
 
-            _chunks = []
-            if self.suffix:
-                _chunks.append(self.suffix)
-            if self.stop:
-                _chunks.extend(self.stop)
-
-            skip_processing = False
-            for _chunk in _chunks:
-                if skip_processing:
-                    break
-
-                for _len in range(len(_chunk)):
-                    if self.current_chunk.endswith(_chunk[0 : _len + 1]):
-                        skip_processing = True
-                        break
+            # We skip processing when the current chunk ends with a partial match
+            # of the suffix or one of the stop chunks.
+            skip_processing = self.current_chunk.endswith(self._get_partial_matches())
 
             # TODO: improve this logic to work for multi-token suffixes.
             # if self.current_chunk.endswith(self.suffix):
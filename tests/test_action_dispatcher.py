@@ -0,0 +1,384 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from nemoguardrails import LLMRails, RailsConfig
+from nemoguardrails.actions import action
+from nemoguardrails.actions.action_cache import ActionResultCache
+from nemoguardrails.actions.action_dispatcher import ActionDispatcher
+from nemoguardrails.actions.actions import ActionResult
+from nemoguardrails.server.datastore.memory_store import MemoryStore
+from nemoguardrails.utils import new_event_dict
+from tests.utils import FakeLLM
+
+test_var = contextvars.ContextVar("test_var", default=None)
+
+
+def _get_dispatcher(**kwargs):
+    return ActionDispatcher(load_all_actions=False, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_sync_action_does_not_block_event_loop():
+    @action(blocking=True)
+    def slow_action():
+        time.sleep(0.2)
+        return threading.current_thread().name
+
+    dispatcher = _get_dispatcher()
+    dispatcher.register_action(slow_action)
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    result, status = await dispatcher.execute_action("slow_action", {})
+    ticker_task.cancel()
+
+    assert status == "success"
+    assert result.startswith("nemoguardrails-actions")
+    assert ticks > 5
+
+
+@pytest.mark.asyncio
+async def test_sync_action_without_offloading():
+    @action()
+    def sync_action():
+        return threading.current_thread().name
+
+    dispatcher = _get_dispatcher()
+    dispatcher.register_action(sync_action)
+
+    result, status = await dispatcher.execute_action("sync_action", {})
+
+    assert status == "success"
+    assert result == threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_offload_all_sync_actions():
+    @action()
+    def sync_action():
+        return threading.current_thread().name
+
+    dispatcher = _get_dispatcher(offload_sync_actions=True)
+    dispatcher.register_action(sync_action)
+
+    result, status = await dispatcher.execute_action("sync_action", {})
+
+    assert status == "success"
+    assert result.startswith("nemoguardrails-actions")
+
+
+@pytest.mark.asyncio
+async def test_sync_action_sees_context_variables():
+    @action(blocking=True)
+    def read_var():
+        return test_var.get()
+
+    dispatcher = _get_dispatcher()
+    dispatcher.register_action(read_var)
+
+    test_var.set("value")
+    result, status = await dispatcher.execute_action("read_var", {})
+
+    assert status == "success"
+    assert result == "value"
+
+
+@pytest.mark.asyncio
+async def test_action_timeout():
+    @action(timeout=0.05)
+    async def slow_action():
+        await asyncio.sleep(1)
+        return "done"
+
+    dispatcher = _get_dispatcher()
+    dispatcher.register_action(slow_action)
+
+    result, status = await dispatcher.execute_action("slow_action", {})
+
+    assert result is None
+    assert status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_action_max_concurrency():
+    running = 0
+    max_running = 0
+
+    @action(max_concurrency=2)
+    async def limited_action():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return "done"
+
+    dispatcher = _get_dispatcher()
+    dispatcher.register_action(limited_action)
+
+    results = await asyncio.gather(
+        *[dispatcher.execute_action("limited_action", {}) for _ in range(6)]
+    )
+
+    assert all(status == "success" for _, status in results)
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_action_max_concurrency_with_cancellation():
+    @action(max_concurrency=1)
+    async def limited_action():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    dispatcher = _get_dispatcher()
+    dispatcher.register_action(limited_action)
+
+    first = asyncio.create_task(dispatcher.execute_action("limited_action", {}))
+    await asyncio.sleep(0.01)
+
+    # Cancel a call while it is waiting for the semaphore.
+    waiting = asyncio.create_task(dispatcher.execute_action("limited_action", {}))
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    await first
+
+    # Only the permit of the first call must have been released.
+    semaphore = dispatcher._get_semaphore("limited_action", 1)
+    assert semaphore._value == 1
+
+
+def test_action_max_concurrency_with_multiple_loops():
+    @action(max_concurrency=1)
+    async def limited_action():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    dispatcher = _get_dispatcher()
+    dispatcher.register_action(limited_action)
+
+    async def _run():
+        return await asyncio.gather(
+            *[dispatcher.execute_action("limited_action", {}) for _ in range(3)]
+        )
+
+    # Every event loop uses its own semaphore.
+    for _ in range(2):
+        results = asyncio.run(_run())
+        assert results == [("done", "success")] * 3
+
+
+@pytest.mark.asyncio
+async def test_action_raising_timeout_error_without_timeout(caplog):
+    @action()
+    async def failing_action():
+        raise asyncio.TimeoutError()
+
+    dispatcher = _get_dispatcher()
+    dispatcher.register_action(failing_action)
+
+    result, status = await dispatcher.execute_action("failing_action", {})
+
+    assert status == "failed"
+    assert "timed out" not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_action_raising_timeout_error_with_timeout(caplog):
+    @action(timeout=5)
+    async def failing_action():
+        raise asyncio.TimeoutError()
+
+    dispatcher = _get_dispatcher()
+    dispatcher.register_action(failing_action)
+
+    result, status = await dispatcher.execute_action("failing_action", {})
+
+    assert status == "failed"
+    assert "timed out" not in caplog.text
+    assert "TimeoutError" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_action_cache():
+    calls = []
+
+    @action(cache={"key_params": ["context.user_message"]})
+    async def check_message(context: dict):
+        calls.append(context["user_message"])
+        return len(calls)
+
+    dispatcher = _get_dispatcher(action_cache=ActionResultCache())
+    dispatcher.register_action(check_message)
+
+    for user_message, bot_message in [("hi", "a"), ("hi", "b"), ("bye", "a")]:
+        await dispatcher.execute_action(
+            "check_message",
+            {"context": {"user_message": user_message, "bot_message": bot_message}},
+        )
+
+    assert calls == ["hi", "bye"]
+    assert dispatcher.action_cache.get_stats() == {
+        "check_message": {"hits": 1, "misses": 2}
+    }
+
+
+@pytest.mark.asyncio
+async def test_action_cache_skips_failures():
+    calls = 0
+
+    @action(cache=True)
+    async def failing_action(text: str):
+        nonlocal calls
+        calls += 1
+        raise ValueError("Failed.")
+
+    dispatcher = _get_dispatcher(action_cache=ActionResultCache())
+    dispatcher.register_action(failing_action)
+
+    for _ in range(2):
+        result, status = await dispatcher.execute_action(
+            "failing_action", {"text": "hi"}
+        )
+        assert status == "failed"
+
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_action_cache_ttl_and_max_size():
+    calls = 0
+
+    @action(cache={"ttl": 0.05, "max_size": 1})
+    async def cached_action(text: str):
+        nonlocal calls
+        calls += 1
+        return text
+
+    dispatcher = _get_dispatcher(action_cache=ActionResultCache())
+    dispatcher.register_action(cached_action)
+
+    await dispatcher.execute_action("cached_action", {"text": "a"})
+    await dispatcher.execute_action("cached_action", {"text": "a"})
+    assert calls == 1
+
+    # The new entry evicts the previous one.
+    await dispatcher.execute_action("cached_action", {"text": "b"})
+    await dispatcher.execute_action("cached_action", {"text": "a"})
+    assert calls == 3
+
+    await asyncio.sleep(0.1)
+    await dispatcher.execute_action("cached_action", {"text": "a"})
+    assert calls == 4
+
+
+@pytest.mark.asyncio
+async def test_action_cache_with_datastore():
+    calls = 0
+
+    @action(cache=True)
+    async def cached_action(text: str):
+        nonlocal calls
+        calls += 1
+        return ActionResult(
+            return_value=text.upper(),
+            events=[new_event_dict("BotIntent", intent="inform")],
+            context_updates={"text": text},
+        )
+
+    datastore = MemoryStore()
+    results = []
+    for _ in range(2):
+        # Each dispatcher uses the same data store.
+        dispatcher = _get_dispatcher(action_cache=ActionResultCache(datastore))
+        dispatcher.register_action(cached_action)
+
+        result, status = await dispatcher.execute_action(
+            "cached_action", {"text": "hi"}
+        )
+        assert status == "success"
+        results.append(result)
+
+    assert calls == 1
+    assert isinstance(results[1], ActionResult)
+    assert results[1].return_value == "HI"
+    assert results[1].context_updates == {"text": "hi"}
+    assert results[1].events[0]["intent"] == "inform"
+    assert results[1].events[0]["uid"] != results[0].events[0]["uid"]
+
+
+@pytest.mark.asyncio
+async def test_action_cache_disabled():
+    calls = 0
+
+    @action(cache=True)
+    async def cached_action(text: str):
+        nonlocal calls
+        calls += 1
+        return text
+
+    for action_cache in [ActionResultCache(enabled=False), None]:
+        dispatcher = _get_dispatcher(action_cache=action_cache)
+        dispatcher.register_action(cached_action)
+
+        for _ in range(2):
+            await dispatcher.execute_action("cached_action", {"text": "a"})
+
+    assert calls == 4
+
+
+def test_action_cache_key_prefix_includes_config_fingerprint():
+    def _get_key_prefix(model: str, prompt: str) -> str:
+        config = RailsConfig.from_content(
+            yaml_content=f"""
+            models:
+              - type: main
+                engine: openai
+                model: {model}
+            prompts:
+              - task: self_check_input
+                content: {prompt}
+            rails:
+              actions:
+                cache:
+                  enabled: True
+            """
+        )
+        rails = LLMRails(config, llm=FakeLLM(responses=[]))
+        return rails.runtime.action_dispatcher.action_cache.key_prefix
+
+    key_prefix = _get_key_prefix("gpt-3.5-turbo-instruct", "Check the input.")
+
+    assert key_prefix.startswith("action_cache:")
+    assert key_prefix == _get_key_prefix("gpt-3.5-turbo-instruct", "Check the input.")
+    assert key_prefix != _get_key_prefix("gpt-4", "Check the input.")
+    assert key_prefix != _get_key_prefix("gpt-3.5-turbo-instruct", "Check it.")
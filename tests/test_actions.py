@@ -13,9 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import gzip
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
+from nemoguardrails.actions import action
 from nemoguardrails.actions_server import actions_server
 
 client = TestClient(actions_server.app)
@@ -57,3 +61,77 @@ def test_get_actions():
     # Check that we have at least one config
     result = response.json()
     assert len(result) >= 1
+
+
+def test_run_batch():
+    @action(name="test_batch_echo")
+    async def echo(text: str):
+        return text.upper()
+
+    actions_server.app.action_dispatcher.register_action(echo)
+
+    response = client.post(
+        "/v1/actions/run_batch",
+        json={
+            "actions": [
+                {"action_name": "test_batch_echo", "action_parameters": {"text": "a"}},
+                {"action_name": "missing_action", "action_parameters": {}},
+                {"action_name": "test_batch_echo", "action_parameters": {"text": "b"}},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"status": "success", "result": "A"},
+        {"status": "failed", "result": None},
+        {"status": "success", "result": "B"},
+    ]
+
+
+def test_run_batch_gzip():
+    @action(name="test_batch_length")
+    async def length(text: str):
+        return len(text)
+
+    actions_server.app.action_dispatcher.register_action(length)
+
+    data = {
+        "actions": [
+            {
+                "action_name": "test_batch_length",
+                "action_parameters": {"text": "x" * 100000},
+            }
+        ]
+    }
+    response = client.post(
+        "/v1/actions/run_batch",
+        content=gzip.compress(json.dumps(data).encode("utf-8")),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [{"status": "success", "result": 100000}]
+
+
+def test_run_batch_gzip_too_large(monkeypatch):
+    monkeypatch.setattr(actions_server.app, "max_body_size", 1000)
+
+    data = {
+        "actions": [
+            {
+                "action_name": "test_batch_length",
+                "action_parameters": {"text": "x" * 100000},
+            }
+        ]
+    }
+    body = gzip.compress(json.dumps(data).encode("utf-8"))
+    assert len(body) < 1000
+
+    response = client.post(
+        "/v1/actions/run_batch",
+        content=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 413
@@ -0,0 +1,178 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import gzip
+import json
+
+import pytest
+from aioresponses import aioresponses
+from yarl import URL
+
+from nemoguardrails.actions_server.client import ActionsServerClient
+
+SERVER_URL = "http://localhost:8001"
+
+
+def _get_requests(m, path):
+    return m.requests.get(("POST", URL(SERVER_URL + path)), [])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_actions_are_batched():
+    client = ActionsServerClient(SERVER_URL)
+
+    with aioresponses() as m:
+        m.post(
+            SERVER_URL + "/v1/actions/run_batch",
+            payload={
+                "results": [
+                    {"status": "success", "result": "A"},
+                    {"status": "failed", "result": None},
+                ]
+            },
+        )
+
+        results = await asyncio.gather(
+            client.run_action("action_1", {"text": "a"}),
+            client.run_action("action_2", {}),
+        )
+
+        requests = _get_requests(m, "/v1/actions/run_batch")
+        assert len(requests) == 1
+        assert json.loads(requests[0].kwargs["data"]) == {
+            "actions": [
+                {"action_name": "action_1", "action_parameters": {"text": "a"}},
+                {"action_name": "action_2", "action_parameters": {}},
+            ]
+        }
+
+    assert results == [("A", "success"), (None, "failed")]
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_single_action():
+    client = ActionsServerClient(SERVER_URL)
+
+    with aioresponses() as m:
+        m.post(
+            SERVER_URL + "/v1/actions/run",
+            payload={"status": "success", "result": "A"},
+        )
+
+        result = await client.run_action("action_1", {"text": "a"})
+
+    assert result == ("A", "success")
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_fallback_when_batching_not_supported():
+    client = ActionsServerClient(SERVER_URL)
+
+    with aioresponses() as m:
+        m.post(SERVER_URL + "/v1/actions/run_batch", status=404)
+        m.post(
+            SERVER_URL + "/v1/actions/run",
+            payload={"status": "success", "result": "A"},
+            repeat=True,
+        )
+
+        for _ in range(2):
+            results = await asyncio.gather(
+                client.run_action("action_1", {}),
+                client.run_action("action_1", {}),
+            )
+            assert results == [("A", "success"), ("A", "success")]
+
+        # The batch endpoint is only tried once.
+        assert len(_get_requests(m, "/v1/actions/run_batch")) == 1
+        assert len(_get_requests(m, "/v1/actions/run")) == 4
+
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_large_payloads_are_compressed():
+    client = ActionsServerClient(SERVER_URL, compression_threshold=1000)
+
+    with aioresponses() as m:
+        m.post(
+            SERVER_URL + "/v1/actions/run",
+            payload={"status": "success", "result": 2000},
+        )
+
+        await client.run_action("action_1", {"text": "x" * 2000})
+
+        request = _get_requests(m, "/v1/actions/run")[0]
+        assert request.kwargs["headers"]["Content-Encoding"] == "gzip"
+        data = json.loads(gzip.decompress(request.kwargs["data"]))
+        assert data["action_parameters"]["text"] == "x" * 2000
+
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_errors_are_propagated():
+    client = ActionsServerClient(SERVER_URL)
+
+    with aioresponses() as m:
+        m.post(SERVER_URL + "/v1/actions/run", status=500)
+
+        with pytest.raises(ValueError):
+            await client.run_action("action_1", {})
+
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_request_errors_are_not_retried():
+    client = ActionsServerClient(SERVER_URL)
+
+    with aioresponses() as m:
+        m.post(SERVER_URL + "/v1/actions/run_batch", status=500)
+
+        results = await asyncio.gather(
+            client.run_action("action_1", {}),
+            client.run_action("action_2", {}),
+            return_exceptions=True,
+        )
+
+        # The actions may have been executed, so they are not sent again.
+        assert _get_requests(m, "/v1/actions/run") == []
+
+    assert all(isinstance(result, ValueError) for result in results)
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused_until_closed():
+    client = ActionsServerClient(SERVER_URL)
+
+    with aioresponses() as m:
+        m.post(
+            SERVER_URL + "/v1/actions/run",
+            payload={"status": "success", "result": "A"},
+            repeat=True,
+        )
+
+        await client.run_action("action_1", {})
+        session = client._get_session()
+        await client.run_action("action_1", {})
+        assert client._get_session() is session
+
+    await client.close()
+    assert session.closed
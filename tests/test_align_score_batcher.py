@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from nemoguardrails.library.factchecking.align_score.batcher import ScoreBatcher
+
+
+class FakeModel:
+    """Scores a pair with the fraction of the claim words found in the evidence."""
+
+    def __init__(self):
+        self.batches = []
+
+    def score(self, pairs):
+        self.batches.append(pairs)
+        return [
+            len(set(claim.split()) & set(evidence.split())) / len(claim.split())
+            for evidence, claim in pairs
+        ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_batched():
+    model = FakeModel()
+    batcher = ScoreBatcher(model.score, max_batch_hold=0.01)
+
+    results = await asyncio.gather(
+        batcher.score([("a b c", "a b")]),
+        batcher.score([("a b c", "a d"), ("a b c", "a b")]),
+    )
+
+    assert results == [[1.0], [0.5, 1.0]]
+    assert len(model.batches) == 1
+
+
+@pytest.mark.asyncio
+async def test_scores_are_cached():
+    model = FakeModel()
+    batcher = ScoreBatcher(model.score, cache_size=2)
+
+    assert await batcher.score([("a b", "a"), ("a b", "c")]) == [1.0, 0.0]
+    assert await batcher.score([("a b", "a")]) == [1.0]
+    assert len(model.batches) == 1
+
+    # The least recently used score is evicted.
+    await batcher.score([("a b", "b")])
+    await batcher.score([("a b", "c")])
+    assert model.batches[-1] == [("a b", "c")]
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size():
+    model = FakeModel()
+    batcher = ScoreBatcher(model.score, max_batch_size=2, max_batch_hold=10)
+
+    # The batch is submitted when full, without waiting for `max_batch_hold`.
+    scores = await asyncio.wait_for(batcher.score([("a", "a"), ("a", "b")]), 1)
+    assert scores == [1.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_errors_and_cancelled_requests():
+    def _fail(pairs):
+        raise RuntimeError("Model error.")
+
+    batcher = ScoreBatcher(_fail)
+    with pytest.raises(RuntimeError):
+        await batcher.score([("a", "a")])
+
+    # A request cancelled while its batch is processed does not affect the others.
+    model = FakeModel()
+    batcher = ScoreBatcher(model.score, max_batch_hold=0.01)
+
+    cancelled = asyncio.ensure_future(batcher.score([("a", "b")]))
+    other = asyncio.ensure_future(batcher.score([("a", "a")]))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await other == [1.0]
+    assert cancelled.cancelled()
@@ -0,0 +1,99 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from nemoguardrails import LLMRails, RailsConfig
+
+config = RailsConfig.from_content(
+    colang_content="""
+    define user express greeting
+      "hi"
+      "hello"
+
+    define user ask question
+      "what can you do?"
+
+    define flow
+      user express greeting
+      $name = execute fetch_name
+      bot $name
+
+    define flow
+      user ask question
+      bot explain capabilities
+
+    define bot explain capabilities
+      "I can answer questions."
+    """,
+    config={
+        "models": [],
+        "rails": {"dialog": {"user_messages": {"embeddings_only": True}}},
+    },
+)
+
+
+@pytest.mark.asyncio
+async def test_generate_batch_async():
+    rails = LLMRails(config)
+
+    running = 0
+    max_running = 0
+    use_batching = []
+
+    async def fetch_name():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        use_batching.append(
+            rails.llm_generation_actions.user_message_index.use_batching
+        )
+        await asyncio.sleep(0.05)
+        running -= 1
+
+        return "Hello John!"
+
+    rails.register_action(fetch_name)
+
+    messages_batch = [
+        [{"role": "user", "content": "hi"}],
+        [{"role": "user", "content": "what can you do?"}],
+        [{"role": "user"}],
+        [{"role": "user", "content": "hello"}],
+        [{"role": "user", "content": "hi"}],
+    ]
+
+    results = []
+    async for idx, response in rails.generate_batch_async(
+        messages_batch, concurrency=2
+    ):
+        results.append((idx, response))
+
+    assert sorted(idx for idx, _ in results) == [0, 1, 2, 3, 4]
+
+    responses = dict(results)
+    assert responses[0] == {"role": "assistant", "content": "Hello John!"}
+    assert responses[1] == {"role": "assistant", "content": "I can answer questions."}
+    assert isinstance(responses[2], Exception)
+    assert responses[4] == {"role": "assistant", "content": "Hello John!"}
+
+    # The conversations are processed concurrently, up to the limit.
+    assert max_running == 2
+
+    # The embedding searches are batched only during the batch generation.
+    assert all(use_batching)
+    assert rails.llm_generation_actions.user_message_index.use_batching is False
@@ -0,0 +1,214 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pickle
+from unittest import mock
+
+import pytest
+
+from nemoguardrails import RailsConfig
+from nemoguardrails.colang import parse_colang_file
+from nemoguardrails.colang.parse_cache import ColangParseCache
+from nemoguardrails.colang.v2_x.lang.grammar.load import load_lark_parser
+
+COLANG_1_CONTENT = """
+define user express greeting
+  "hello"
+
+define flow
+  user express greeting
+  bot express greeting
+"""
+
+COLANG_2_CONTENT = """
+import core
+
+flow main
+  user said "hi"
+  bot say "Hello!"
+"""
+
+
+def test_parse_cache_hit(tmp_path):
+    cache = ColangParseCache(str(tmp_path))
+
+    data = cache.parse_colang_file("main.co", COLANG_1_CONTENT)
+    assert cache.misses == 1
+
+    cached_data = cache.parse_colang_file("main.co", COLANG_1_CONTENT)
+    assert cache.hits == 1
+    assert cached_data == data
+    assert cached_data == parse_colang_file("main.co", COLANG_1_CONTENT)
+
+
+def test_parse_cache_v2_x(tmp_path):
+    cache = ColangParseCache(str(tmp_path))
+
+    data = cache.parse_colang_file("main.co", COLANG_2_CONTENT, version="2.x")
+    cached_data = cache.parse_colang_file("main.co", COLANG_2_CONTENT, version="2.x")
+
+    assert cache.hits == 1
+    assert cached_data["import_paths"] == ["core"]
+    assert cached_data["flows"] == data["flows"]
+
+
+def test_parse_cache_key():
+    key = ColangParseCache.get_key("main.co", COLANG_1_CONTENT)
+
+    assert key == ColangParseCache.get_key("main.co", COLANG_1_CONTENT)
+    assert key != ColangParseCache.get_key("main.co", COLANG_1_CONTENT + "\n")
+    assert key != ColangParseCache.get_key("other.co", COLANG_1_CONTENT)
+    assert key != ColangParseCache.get_key("main.co", COLANG_1_CONTENT, version="2.x")
+
+    with mock.patch("nemoguardrails.__version__", "0.0.0"):
+        assert key != ColangParseCache.get_key("main.co", COLANG_1_CONTENT)
+
+
+def test_parse_cache_corrupt_entry(tmp_path):
+    cache = ColangParseCache(str(tmp_path))
+    key = cache.get_key("main.co", COLANG_1_CONTENT)
+
+    with open(os.path.join(tmp_path, key + ".pkl"), "wb") as f:
+        f.write(b"not a pickle")
+
+    data = cache.parse_colang_file("main.co", COLANG_1_CONTENT)
+
+    assert cache.misses == 1
+    assert data == parse_colang_file("main.co", COLANG_1_CONTENT)
+
+
+def test_config_loading_uses_cache(tmp_path, monkeypatch):
+    config_path = tmp_path / "config"
+    config_path.mkdir()
+    (config_path / "config.yml").write_text("models: []")
+    (config_path / "rails.co").write_text(COLANG_1_CONTENT)
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("NEMO_GUARDRAILS_COLANG_CACHE_DIR", str(cache_dir))
+    monkeypatch.setenv("NEMO_GUARDRAILS_COLANG_CACHE", "true")
+
+    config = RailsConfig.from_path(str(config_path))
+    assert len(os.listdir(cache_dir)) == 1
+
+    with mock.patch(
+        "nemoguardrails.colang.parse_cache.parse_colang_file"
+    ) as mock_parse:
+        cached_config = RailsConfig.from_path(str(config_path))
+
+    mock_parse.assert_not_called()
+    assert cached_config.flows == config.flows
+    assert cached_config.user_messages == config.user_messages
+
+    # Only the changed file is parsed again.
+    (config_path / "rails.co").write_text(COLANG_1_CONTENT.replace('"hello"', '"hi"'))
+    RailsConfig.from_path(str(config_path))
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_config_loading_cache_disabled(tmp_path, monkeypatch):
+    config_path = tmp_path / "config"
+    config_path.mkdir()
+    (config_path / "rails.co").write_text(COLANG_1_CONTENT)
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("NEMO_GUARDRAILS_COLANG_CACHE_DIR", str(cache_dir))
+    monkeypatch.setenv("NEMO_GUARDRAILS_COLANG_CACHE", "false")
+
+    RailsConfig.from_path(str(config_path))
+
+    assert not os.path.exists(cache_dir)
+
+
+def test_config_loading_cache_disabled_by_default(tmp_path, monkeypatch):
+    config_path = tmp_path / "config"
+    config_path.mkdir()
+    (config_path / "rails.co").write_text(COLANG_1_CONTENT)
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("NEMO_GUARDRAILS_COLANG_CACHE_DIR", str(cache_dir))
+    monkeypatch.delenv("NEMO_GUARDRAILS_COLANG_CACHE", raising=False)
+
+    RailsConfig.from_path(str(config_path))
+
+    assert not os.path.exists(cache_dir)
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="Requires POSIX permissions.")
+def test_parse_cache_writable_by_others(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    os.chmod(cache_dir, 0o777)
+
+    cache = ColangParseCache(str(cache_dir))
+    key = cache.get_key("main.co", COLANG_1_CONTENT)
+    with open(os.path.join(cache_dir, key + ".pkl"), "wb") as f:
+        pickle.dump({"flows": "untrusted"}, f)
+
+    data = cache.parse_colang_file("main.co", COLANG_1_CONTENT)
+
+    # The untrusted entry is not loaded, and no new entry is written.
+    assert cache.misses == 1
+    assert data == parse_colang_file("main.co", COLANG_1_CONTENT)
+    assert os.listdir(cache_dir) == [key + ".pkl"]
+
+
+def test_grammar_cache(tmp_path, monkeypatch):
+    grammar_path = tmp_path / "test.lark"
+    grammar_path.write_text('start: "a"+\n')
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("NEMO_GUARDRAILS_COLANG_CACHE_DIR", str(cache_dir))
+    monkeypatch.setenv("NEMO_GUARDRAILS_COLANG_CACHE", "true")
+
+    load_lark_parser.cache_clear()
+    try:
+        parser = load_lark_parser(str(grammar_path))
+        assert os.listdir(cache_dir) == ["test.lark.cache"]
+
+        # A new process loads the parser from the cache folder.
+        load_lark_parser.cache_clear()
+        cached_parser = load_lark_parser(str(grammar_path))
+        assert cached_parser.parse("aa") == parser.parse("aa")
+
+        ColangParseCache(str(cache_dir)).clear()
+        assert os.listdir(cache_dir) == []
+    finally:
+        load_lark_parser.cache_clear()
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="Requires POSIX permissions.")
+def test_grammar_cache_writable_by_others(tmp_path, monkeypatch):
+    grammar_path = tmp_path / "test.lark"
+    grammar_path.write_text('start: "a"+\n')
+
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    os.chmod(cache_dir, 0o777)
+    monkeypatch.setenv("NEMO_GUARDRAILS_COLANG_CACHE_DIR", str(cache_dir))
+    monkeypatch.setenv("NEMO_GUARDRAILS_COLANG_CACHE", "true")
+
+    load_lark_parser.cache_clear()
+    try:
+        with mock.patch(
+            "nemoguardrails.colang.v2_x.lang.grammar.load.Lark"
+        ) as mock_lark:
+            load_lark_parser(str(grammar_path))
+    finally:
+        load_lark_parser.cache_clear()
+
+    # The tables are not saved anywhere, including the shared temporary folder.
+    assert mock_lark.call_args.kwargs["cache"] is False
+    assert os.listdir(cache_dir) == []
@@ -0,0 +1,195 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import shutil
+from typing import List
+
+import numpy as np
+import pytest
+
+from nemoguardrails.embeddings.basic import BasicEmbeddingsIndex
+from nemoguardrails.embeddings.index import IndexItem
+from nemoguardrails.embeddings.quantization import (
+    EmbeddingsMatrix,
+    truncate_embeddings,
+)
+from nemoguardrails.kb import kb as kb_module
+from nemoguardrails.kb.kb import KnowledgeBase
+from nemoguardrails.rails.llm.config import KnowledgeBaseConfig
+
+DOC = """
+# Cats
+
+Cats are small, carnivorous mammals.
+
+# Dogs
+
+Dogs are domesticated descendants of the wolf.
+
+# Birds
+
+Birds are warm-blooded vertebrates.
+"""
+
+
+class FakeEmbeddingsIndex(BasicEmbeddingsIndex):
+    """An embeddings index with deterministic, content-based embeddings."""
+
+    async def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return [
+            [b / 255 - 0.5 for b in hashlib.sha256(text.encode("utf-8")).digest()]
+            for text in texts
+        ]
+
+
+def _random_embeddings(count: int, size: int) -> np.ndarray:
+    return np.random.default_rng(42).normal(size=(count, size)).astype(np.float32)
+
+
+@pytest.mark.parametrize(
+    "quantization, bytes_per_value, max_error",
+    [(None, 4, 0), ("float16", 2, 1e-2), ("int8", 1, 5e-2)],
+)
+def test_embeddings_matrix(quantization, bytes_per_value, max_error):
+    embeddings = _random_embeddings(100, 32)
+
+    matrix = EmbeddingsMatrix(quantization)
+    matrix.append(embeddings[:60])
+    matrix.append(embeddings[60:])
+    matrix.quantize()
+
+    assert len(matrix) == 100
+    assert matrix.embedding_size == 32
+    assert matrix.get().dtype == np.float32
+    assert np.abs(matrix.get() - embeddings).max() <= max_error
+    assert np.array_equal(matrix.get([5, 1]), matrix.get()[[5, 1]])
+
+    # The int8 quantization also stores a scale for every embedding.
+    scales_size = 100 * 4 if quantization == "int8" else 0
+    assert matrix.nbytes == 100 * 32 * bytes_per_value + scales_size
+
+
+def test_unknown_quantization():
+    with pytest.raises(ValueError):
+        EmbeddingsMatrix("int4")
+
+
+def test_truncate_embeddings():
+    embeddings = _random_embeddings(10, 32)
+
+    truncated = truncate_embeddings(embeddings, 8)
+    assert truncated.shape == (10, 8)
+    assert np.allclose(np.linalg.norm(truncated, axis=1), 1)
+
+    assert truncate_embeddings(embeddings, None) is embeddings
+    assert truncate_embeddings(embeddings, 64) is embeddings
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("quantization", [None, "float16", "int8"])
+async def test_search_with_truncated_embeddings(quantization):
+    embeddings = _random_embeddings(200, 64)
+    items = [IndexItem(text=f"item {i}") for i in range(200)]
+
+    index = BasicEmbeddingsIndex(quantization=quantization, embedding_dimensions=16)
+    await index.add_items(items, embeddings.tolist())
+    await index.build()
+
+    assert index.embeddings_index.f == 16
+    assert index.embeddings.shape == (200, 64)
+
+    # The candidates are rescored using all the dimensions, so an item is the closest
+    # to its own embedding.
+    results = index.search_by_embedding(embeddings[7].tolist(), max_results=3)
+    assert results[0][0] is items[7]
+    assert results[0][1] == pytest.approx(0, abs=1e-2)
+    assert [distance for _, distance in results] == sorted(
+        distance for _, distance in results
+    )
+
+
+@pytest.mark.asyncio
+async def test_truncated_embeddings_are_rescored_at_full_precision():
+    embeddings = _random_embeddings(200, 64)
+    items = [IndexItem(text=f"item {i}") for i in range(200)]
+
+    index = BasicEmbeddingsIndex(quantization="int8", embedding_dimensions=16)
+    await index.add_items(items, embeddings.tolist())
+    await index.build()
+
+    # The embeddings are kept as float32 values, to rescore the candidates.
+    assert not index._embeddings.quantized
+    assert np.array_equal(index.embeddings, embeddings)
+
+    results = index.search_by_embedding(embeddings[7].tolist(), max_results=1)
+    assert results[0][0] is items[7]
+    assert results[0][1] == pytest.approx(0, abs=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_kb_with_truncated_embeddings(tmp_path, monkeypatch):
+    monkeypatch.setattr(kb_module, "CACHE_FOLDER", str(tmp_path))
+
+    async def _build_kb():
+        kb = KnowledgeBase(
+            documents=[DOC],
+            config=KnowledgeBaseConfig(
+                embedding_search_provider={
+                    "parameters": {"embedding_dimensions": 8, "quantization": "int8"}
+                }
+            ),
+            get_embedding_search_provider_instance=lambda _: FakeEmbeddingsIndex(
+                quantization="int8", embedding_dimensions=8
+            ),
+        )
+        await kb.build()
+        return kb
+
+    for i in range(3):
+        # The second time, the annoy index is loaded from the cache, and the stored
+        # embeddings are used for rescoring. The third time, the store is also removed,
+        # so the chunks are embedded again.
+        if i == 2:
+            shutil.rmtree(tmp_path / "kb")
+
+        kb = await _build_kb()
+        assert kb.index.embeddings_index.f == 8
+        assert kb.index.embeddings.shape == (3, 32)
+        assert kb.index.embeddings.dtype == np.float32
+
+        results = await kb.search_relevant_chunks(
+            "# Dogs\n\nDogs are domesticated descendants of the wolf.", max_results=1
+        )
+        assert [result["title"] for result in results] == ["Dogs"]
+
+
+@pytest.mark.asyncio
+async def test_search_with_truncated_index_without_embeddings():
+    embeddings = _random_embeddings(50, 64)
+    items = [IndexItem(text=f"item {i}") for i in range(50)]
+
+    index = BasicEmbeddingsIndex(embedding_dimensions=16)
+    await index.add_items(items, embeddings.tolist())
+    await index.build()
+
+    # An index using the same annoy index, but without the stored embeddings.
+    other_index = BasicEmbeddingsIndex(
+        index=index.embeddings_index, embedding_dimensions=16
+    )
+    await other_index.add_items(items)
+
+    results = other_index.search_by_embedding(embeddings[7].tolist(), max_results=3)
+    assert results[0][0] is items[7]
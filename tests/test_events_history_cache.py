@@ -0,0 +1,162 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from nemoguardrails import RailsConfig
+from nemoguardrails.rails.llm.history_cache import (
+    DEFAULT_DATASTORE_TTL,
+    EventsHistoryCache,
+)
+from nemoguardrails.server.datastore.memory_store import MemoryStore
+from tests.utils import TestChat
+
+
+@pytest.mark.asyncio
+async def test_lru():
+    cache = EventsHistoryCache(max_size=2)
+
+    await cache.set("a", [{"type": "A"}])
+    await cache.set("b", [{"type": "B"}])
+
+    # We access "a" so that "b" becomes the least recently used.
+    assert await cache.get("a") == [{"type": "A"}]
+    await cache.set("c", [{"type": "C"}])
+
+    assert len(cache) == 2
+    assert await cache.get("b") is None
+    assert await cache.get("a") == [{"type": "A"}]
+    assert await cache.get("c") == [{"type": "C"}]
+
+
+@pytest.mark.asyncio
+async def test_ttl():
+    cache = EventsHistoryCache(ttl=0.1)
+
+    await cache.set("a", [{"type": "A"}])
+    assert await cache.get("a") == [{"type": "A"}]
+
+    await asyncio.sleep(0.2)
+    assert await cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_datastore():
+    datastore = MemoryStore()
+    cache = EventsHistoryCache(datastore=datastore, key_prefix="test:")
+
+    await cache.set("a", [{"type": "A"}])
+
+    assert list(datastore.data.keys()) == ["test:a"]
+
+    # Another cache using the same datastore sees the events.
+    other_cache = EventsHistoryCache(datastore=datastore, key_prefix="test:")
+    assert await other_cache.get("a") == [{"type": "A"}]
+
+
+@pytest.mark.asyncio
+async def test_datastore_ttl():
+    datastore = MemoryStore()
+    cache = EventsHistoryCache(datastore=datastore, ttl=0.1)
+
+    await cache.set("a", [{"type": "A"}])
+    assert await cache.get("a") == [{"type": "A"}]
+
+    await asyncio.sleep(0.2)
+    assert await cache.get("a") is None
+
+    # Without an explicit TTL, the entries in a data store still expire.
+    assert EventsHistoryCache(datastore=datastore).ttl == DEFAULT_DATASTORE_TTL
+
+
+@pytest.mark.asyncio
+async def test_datastore_skips_events_that_cant_be_serialized():
+    datastore = MemoryStore()
+    cache = EventsHistoryCache(datastore=datastore)
+
+    await cache.set("a", [{"type": "ContextUpdate", "data": {"value": object()}}])
+
+    assert datastore.data == {}
+    assert await cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_get_last_uses_a_single_request():
+    class CountingStore(MemoryStore):
+        requests = 0
+
+        async def get(self, key):
+            self.requests += 1
+            return await super().get(key)
+
+        async def get_many(self, keys):
+            self.requests += 1
+            return [self.data.get(key) for key in keys]
+
+    datastore = CountingStore()
+    cache = EventsHistoryCache(datastore=datastore)
+    await cache.set("a", [{"type": "A"}])
+    await cache.set("c", [{"type": "C"}])
+
+    assert await cache.get_last(["a", "b", "c", "d"]) == (2, [{"type": "C"}])
+    assert await cache.get_last(["x", "y"]) == (-1, None)
+    assert datastore.requests == 2
+
+    # The in-memory cache has the same behavior.
+    cache = EventsHistoryCache()
+    await cache.set("a", [{"type": "A"}])
+    assert await cache.get_last(["a", "b"]) == (0, [{"type": "A"}])
+
+
+@pytest.mark.asyncio
+async def test_conversation_resumed_from_datastore():
+    config = RailsConfig.from_content(
+        """
+        define user express greeting
+          "hi"
+
+        define flow
+          user express greeting
+          bot express greeting
+        """
+    )
+    datastore = MemoryStore()
+
+    chat = TestChat(
+        config,
+        llm_completions=["  express greeting", '  "Hello!"'],
+    )
+    chat.app.events_history_cache = EventsHistoryCache(datastore=datastore)
+
+    messages = [{"role": "user", "content": "hi"}]
+    response = await chat.app.generate_async(messages=messages)
+    assert response["content"] == "Hello!"
+
+    # A different instance, sharing the datastore, continues the conversation
+    # from the cached events, which include the generated user intent.
+    other_chat = TestChat(config, llm_completions=[])
+    other_chat.app.events_history_cache = EventsHistoryCache(datastore=datastore)
+
+    events = await other_chat.app._get_events_for_messages(
+        messages + [response, {"role": "user", "content": "hi"}], state=None
+    )
+
+    assert any(
+        event["type"] == "UserIntent" and event["intent"] == "express greeting"
+        for event in events
+    )
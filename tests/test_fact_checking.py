@@ -17,9 +17,13 @@ import os
 
 import pytest
 from aioresponses import aioresponses
+from yarl import URL
 
 from nemoguardrails import RailsConfig
 from nemoguardrails.actions.actions import ActionResult, action
+from nemoguardrails.library.factchecking.align_score.request import (
+    alignscore_batch_request,
+)
 from tests.constants import NEMO_API_URL_GPT_43B_002
 from tests.utils import TestChat
 
@@ -251,3 +255,120 @@ async def test_fact_checking_fallback_self_check_wrong(httpx_mock):
 
         chat >> "What is NeMo Guardrails?"
         await chat.bot_async("I don't know the answer to that.")
+
+
+@pytest.mark.asyncio
+async def test_alignscore_batch_request():
+    with aioresponses() as m:
+        m.post(
+            "http://localhost:5000/alignscore_base/batch",
+            payload={"alignscores": [0.82, 0.01]},
+        )
+
+        scores = await alignscore_batch_request(
+            "http://localhost:5000/alignscore_base",
+            evidence="NeMo Guardrails is an open-source toolkit.",
+            claims=["NeMo Guardrails is open-source.", "NeMo Guardrails is closed."],
+        )
+
+    assert scores == [0.82, 0.01]
+
+
+@pytest.mark.asyncio
+async def test_alignscore_batch_request_not_supported():
+    # An AlignScore server without the batch endpoint is sent one request per claim.
+    with aioresponses() as m:
+        m.post("http://localhost:5000/alignscore_base/batch", status=404)
+        m.post(
+            "http://localhost:5000/alignscore_base",
+            payload={"alignscore": 0.82},
+            repeat=True,
+        )
+
+        scores = await alignscore_batch_request(
+            "http://localhost:5000/alignscore_base",
+            evidence="NeMo Guardrails is an open-source toolkit.",
+            claims=["NeMo Guardrails is open-source.", "It was created by Nvidia."],
+        )
+
+        requests = m.requests[("POST", URL("http://localhost:5000/alignscore_base"))]
+        assert sorted(request.kwargs["json"]["claim"] for request in requests) == [
+            "It was created by Nvidia.",
+            "NeMo Guardrails is open-source.",
+        ]
+
+    assert scores == [0.82, 0.82]
+
+
+@pytest.mark.asyncio
+async def test_fact_checking_multiple_claims_batch_not_supported(httpx_mock):
+    # The claims are still checked, one by one, when the batch endpoint is missing.
+    config = RailsConfig.from_path(os.path.join(CONFIGS_FOLDER, "fact_checking"))
+    chat = TestChat(config)
+    chat.app.register_action(retrieve_relevant_chunks, "retrieve_relevant_chunks")
+
+    httpx_mock.add_response(
+        method="POST",
+        url=NEMO_API_URL_GPT_43B_002,
+        json={"text": "  ask about guardrails"},
+    )
+
+    httpx_mock.add_response(
+        method="POST",
+        url=NEMO_API_URL_GPT_43B_002,
+        json={
+            "text": "NeMo Guardrails is a closed-source toolkit. It was created by Nvidia."
+        },
+    )
+
+    with aioresponses() as m:
+        m.post("http://localhost:5000/alignscore_base/batch", status=404)
+        m.post(
+            "http://localhost:5000/alignscore_base",
+            payload={"alignscore": 0.01},
+            repeat=True,
+        )
+
+        chat >> "What is NeMo Guardrails?"
+        await chat.bot_async("I don't know the answer to that.")
+
+
+@pytest.mark.asyncio
+async def test_fact_checking_multiple_claims(httpx_mock):
+    # The sentences of the bot message are checked with a single batch request.
+    config = RailsConfig.from_path(os.path.join(CONFIGS_FOLDER, "fact_checking"))
+    chat = TestChat(config)
+    chat.app.register_action(retrieve_relevant_chunks, "retrieve_relevant_chunks")
+
+    httpx_mock.add_response(
+        method="POST",
+        url=NEMO_API_URL_GPT_43B_002,
+        json={"text": "  ask about guardrails"},
+    )
+
+    httpx_mock.add_response(
+        method="POST",
+        url=NEMO_API_URL_GPT_43B_002,
+        json={
+            "text": "NeMo Guardrails is an open-source toolkit. It was created by Nvidia."
+        },
+    )
+
+    with aioresponses() as m:
+        m.post(
+            "http://localhost:5000/alignscore_base/batch",
+            payload={"alignscores": [0.9, 0.3]},
+        )
+
+        chat >> "What is NeMo Guardrails?"
+        await chat.bot_async(
+            "NeMo Guardrails is an open-source toolkit. It was created by Nvidia."
+        )
+
+        [request] = m.requests[
+            ("POST", URL("http://localhost:5000/alignscore_base/batch"))
+        ]
+        assert request.kwargs["json"]["claims"] == [
+            "NeMo Guardrails is an open-source toolkit.",
+            "It was created by Nvidia.",
+        ]
@@ -0,0 +1,107 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from langchain.llms.base import LLM
+
+from nemoguardrails import RailsConfig
+from nemoguardrails.library.hallucination.actions import check_hallucination
+from nemoguardrails.llm.taskmanager import LLMTaskManager
+from tests.utils import FakeLLM
+
+
+def _get_config(**hallucination_config):
+    return RailsConfig.parse_object(
+        {
+            "models": [],
+            "rails": {"config": {"hallucination": hallucination_config}},
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_check_hallucination_concurrent_sampling():
+    config = _get_config(num_extra_responses=3, max_concurrency=3)
+    llm = FakeLLM(
+        responses=[
+            "Paris is the capital of France.",
+            "The capital of France is Paris.",
+            "France's capital is Paris.",
+            "yes",
+        ]
+    )
+
+    is_hallucination = await check_hallucination(
+        llm_task_manager=LLMTaskManager(config),
+        context={
+            "bot_message": "The capital of France is Paris.",
+            "_last_bot_prompt": "What is the capital of France?",
+        },
+        llm=llm,
+        config=config,
+    )
+
+    assert not is_hallucination
+    assert llm.i == 4
+
+
+class SlowSamplingLLM(LLM):
+    """LLM for which every sampled response is slower than the previous one."""
+
+    sampled: int = 0
+    completed: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-sampling"
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs) -> str:
+        raise NotImplementedError()
+
+    async def _acall(self, prompt, stop=None, run_manager=None, **kwargs) -> str:
+        if "hypothesis" in prompt:
+            return "no"
+
+        self.sampled += 1
+        await asyncio.sleep(0.1 * self.sampled)
+        self.completed += 1
+
+        return "Paris is the capital of Germany."
+
+
+@pytest.mark.asyncio
+async def test_check_hallucination_early_exit():
+    config = _get_config(
+        num_extra_responses=3, min_extra_responses=1, max_concurrency=3
+    )
+    llm = SlowSamplingLLM()
+
+    is_hallucination = await check_hallucination(
+        llm_task_manager=LLMTaskManager(config),
+        context={
+            "bot_message": "The capital of France is Paris.",
+            "_last_bot_prompt": "What is the capital of France?",
+        },
+        llm=llm,
+        config=config,
+    )
+
+    assert is_hallucination
+
+    # All samples are started concurrently, but only the first one is awaited.
+    assert llm.sampled == 3
+    assert llm.completed == 1
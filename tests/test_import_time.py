@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# The maximum time, in seconds, for `import nemoguardrails`. This is deliberately
+# generous, so that it only fails for real regressions; set the environment variable
+# to a lower value to check a specific environment.
+IMPORT_TIME_BUDGET = float(os.environ.get("NEMO_GUARDRAILS_IMPORT_TIME_BUDGET", "2.0"))
+
+# The dependencies that must only be imported when they are actually used.
+LAZY_MODULES = [
+    "aiohttp",
+    "annoy",
+    "fastapi",
+    "fastembed",
+    "langchain_openai",
+    "presidio_analyzer",
+    "presidio_anonymizer",
+    "sentence_transformers",
+    "torch",
+    "uvicorn",
+]
+
+
+def _get_import_times(code: str) -> dict:
+    """Runs the code with `-X importtime` and returns the cumulative time for each module.
+
+    Returns:
+        A dict mapping the name of each imported module to its cumulative import
+        time, in seconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:") :].split("|")
+        import_times[name.strip()] = int(cumulative) / 1e6
+
+    return import_times
+
+
+def test_import_time_budget():
+    import_times = _get_import_times("import nemoguardrails")
+
+    assert import_times["nemoguardrails"] < IMPORT_TIME_BUDGET
+
+    for module in LAZY_MODULES:
+        assert module not in import_times, f"`{module}` should be imported lazily."
+
+    # The LLM providers from LangChain are discovered by name only (the HuggingFace
+    # pipeline is needed for `HuggingFacePipelineCompatible`).
+    assert [
+        name for name in import_times if name.startswith("langchain_community.llms.")
+    ] == ["langchain_community.llms.huggingface_pipeline"]
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import nemoguardrails.cli",
+        # Loads the actions from all the modules in the library.
+        (
+            "from nemoguardrails.actions.action_dispatcher import ActionDispatcher\n"
+            "ActionDispatcher(load_all_actions=True)\n"
+        ),
+    ],
+)
+def test_lazy_imports(code):
+    import_times = _get_import_times(code)
+
+    for module in LAZY_MODULES:
+        assert module not in import_times, f"`{module}` should be imported lazily."
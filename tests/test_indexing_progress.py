@@ -0,0 +1,225 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from nemoguardrails import LLMRails, RailsConfig
+from nemoguardrails.embeddings.basic import BasicEmbeddingsIndex
+from nemoguardrails.embeddings.progress import IndexingProgress
+from nemoguardrails.server import api
+from tests.utils import FakeLLM
+
+COLANG_CONFIG = """
+define user express greeting
+  "hello"
+  "hi"
+
+define bot express greeting
+  "Hello there!"
+
+define flow
+  user express greeting
+  bot express greeting
+"""
+
+
+def test_indexing_progress():
+    progress = IndexingProgress()
+    progress.start("flows_index", total=4)
+    progress.advance("flows_index", 1)
+
+    assert not progress.ready
+    assert progress.wait(timeout=0.01) is False
+    assert progress.to_dict() == {
+        "ready": False,
+        "progress": 0.25,
+        "stages": {"flows_index": {"total": 4, "done": 1, "finished": False}},
+    }
+
+    progress.finish("flows_index")
+    progress.set_ready()
+
+    assert progress.wait()
+    assert progress.to_dict()["progress"] == 1.0
+    assert progress.to_dict()["stages"]["flows_index"]["finished"]
+
+
+def test_shared_embeddings(monkeypatch):
+    batches = []
+    get_embeddings = BasicEmbeddingsIndex._get_embeddings
+
+    async def _get_embeddings(self, texts):
+        batches.append(texts)
+        return await get_embeddings(self, texts)
+
+    monkeypatch.setattr(BasicEmbeddingsIndex, "_get_embeddings", _get_embeddings)
+
+    config = RailsConfig.from_content(
+        colang_content=COLANG_CONFIG, yaml_content="models: []"
+    )
+    rails = LLMRails(config, llm=FakeLLM(responses=[]))
+
+    # The texts of all the indexes are embedded in a single batch, without duplicates
+    # (e.g., "user express greeting" is in the flows index and the bot messages index).
+    assert len(batches) == 1
+    assert len(batches[0]) == len(set(batches[0]))
+    assert "user express greeting" in batches[0]
+
+    generation_actions = rails.llm_generation_actions
+    assert generation_actions.user_message_index is not None
+    assert generation_actions.bot_message_index is not None
+    assert generation_actions.flows_index is not None
+
+    progress = rails.indexing_progress.to_dict()
+    assert progress["ready"]
+    assert progress["stages"]["user_message_index"]["total"] == 2
+    assert progress["stages"]["embeddings"]["total"] == len(batches[0])
+
+
+def test_rails_can_be_created_in_a_thread():
+    config = RailsConfig.from_content(
+        colang_content=COLANG_CONFIG, yaml_content="models: []"
+    )
+    progress = IndexingProgress()
+
+    thread = threading.Thread(
+        target=LLMRails,
+        kwargs={
+            "config": config,
+            "llm": FakeLLM(responses=[]),
+            "indexing_progress": progress,
+        },
+    )
+    thread.start()
+
+    assert progress.wait(timeout=30)
+    thread.join()
+
+
+def test_server_status(monkeypatch):
+    api.app.rails_config_path = os.path.join(
+        os.path.dirname(__file__), "test_configs", "simple_server"
+    )
+    monkeypatch.setattr(api, "llm_rails_instances", {})
+    monkeypatch.setattr(api, "llm_rails_indexing_progress", {})
+
+    client = TestClient(api.app)
+    response = client.post(
+        "/v1/chat/completions",
+        json={
+            "config_id": "config_1",
+            "messages": [{"content": "hi", "role": "user"}],
+        },
+    )
+    assert response.status_code == 200
+
+    response = client.get("/v1/rails/configs/status")
+    assert response.status_code == 200
+
+    result = response.json()
+    assert [config["id"] for config in result] == ["config_1"]
+    assert result[0]["ready"]
+    assert result[0]["progress"] == 1.0
+
+
+def test_indexing_progress_failed():
+    progress = IndexingProgress()
+    progress.start("kb")
+    progress.set_failed("ValueError: Invalid document.")
+
+    assert not progress.ready
+    assert progress.wait(timeout=0.01) is False
+    assert progress.to_dict()["error"] == "ValueError: Invalid document."
+
+
+def test_kb_failure_is_reported(monkeypatch):
+    async def _init_kb(self):
+        raise ValueError("Invalid document.")
+
+    monkeypatch.setattr(LLMRails, "_init_kb", _init_kb)
+
+    config = RailsConfig.from_content(
+        colang_content=COLANG_CONFIG, yaml_content="models: []"
+    )
+    progress = IndexingProgress()
+
+    with pytest.raises(ValueError):
+        LLMRails(config, llm=FakeLLM(responses=[]), indexing_progress=progress)
+
+    assert not progress.ready
+    assert progress.error == "ValueError: Invalid document."
+
+
+def test_kb_thread_is_joined_on_failure(monkeypatch):
+    kb_done = threading.Event()
+
+    async def _init_kb(self):
+        kb_done.wait(1)
+        self.kb = None
+
+    def _init_generation_actions(*args, **kwargs):
+        raise RuntimeError("Could not build the indexes.")
+
+    monkeypatch.setattr(LLMRails, "_init_kb", _init_kb)
+    monkeypatch.setattr(
+        "nemoguardrails.rails.llm.llmrails.LLMGenerationActions",
+        _init_generation_actions,
+    )
+
+    config = RailsConfig.from_content(
+        colang_content=COLANG_CONFIG, yaml_content="models: []"
+    )
+    progress = IndexingProgress()
+    threads = threading.active_count()
+
+    with pytest.raises(RuntimeError):
+        LLMRails(config, llm=FakeLLM(responses=[]), indexing_progress=progress)
+
+    assert threading.active_count() == threads
+    assert progress.error == "RuntimeError: Could not build the indexes."
+
+
+def test_server_status_failed(monkeypatch):
+    async def _init_kb(self):
+        raise ValueError("Invalid document.")
+
+    monkeypatch.setattr(LLMRails, "_init_kb", _init_kb)
+
+    api.app.rails_config_path = os.path.join(
+        os.path.dirname(__file__), "test_configs", "simple_server"
+    )
+    monkeypatch.setattr(api, "llm_rails_instances", {})
+    monkeypatch.setattr(api, "llm_rails_indexing_progress", {})
+
+    client = TestClient(api.app)
+    client.post(
+        "/v1/chat/completions",
+        json={
+            "config_id": "config_1",
+            "messages": [{"content": "hi", "role": "user"}],
+        },
+    )
+
+    response = client.get("/v1/rails/configs/status")
+    assert response.status_code == 200
+
+    [status] = response.json()
+    assert status["id"] == "config_1"
+    assert not status["ready"]
+    assert status["error"] == "ValueError: Invalid document."
@@ -26,8 +26,11 @@ try:
     import transformers
 
     from nemoguardrails.library.jailbreak_detection.heuristics.checks import (
+        check_jailbreak_heuristics,
         check_jailbreak_length_per_perplexity,
         check_jailbreak_prefix_suffix_perplexity,
+        get_heuristics_texts,
+        get_perplexities,
         get_perplexity,
     )
 
@@ -154,3 +157,69 @@ def test_get_perplexity_2():
     t0 = time()
     get_perplexity(long_prompt)
     assert time() - t0 < 2.0
+
+
+@pytest.mark.skipif(not torch_available, reason="Pytorch not installed.")
+def test_get_perplexities_matches_get_perplexity():
+    texts = ["Short string", safe, long_prompt]
+    perplexities = get_perplexities(texts)
+
+    for text, perplexity in zip(texts, perplexities):
+        assert perplexity == pytest.approx(get_perplexity(text), rel=1e-3)
+
+
+@pytest.mark.skipif(not torch_available, reason="Pytorch not installed.")
+def test_get_perplexities_isolates_errors(monkeypatch):
+    from nemoguardrails.library.jailbreak_detection.heuristics import checks
+
+    # The windows are scored in several forward passes.
+    monkeypatch.setattr(checks, "max_batch_windows", 2)
+
+    results = get_perplexities(["Short string", "", long_prompt], True)
+
+    assert results[0] == pytest.approx(get_perplexity("Short string"), rel=1e-3)
+    assert isinstance(results[1], ValueError)
+    assert results[2] == pytest.approx(get_perplexity(long_prompt), rel=1e-3)
+
+    with pytest.raises(ValueError):
+        get_perplexities(["Short string", ""])
+
+
+@pytest.mark.skipif(not torch_available, reason="Pytorch not installed.")
+def test_check_jailbreak_heuristics():
+    assert check_jailbreak_heuristics(len_ppl, 89.79, 1845.65) == {
+        "jailbreak": True,
+        "length_per_perplexity": True,
+        "prefix_suffix_perplexity": False,
+    }
+    assert check_jailbreak_heuristics(ps_ppl, 89.79, 1845.65)["jailbreak"]
+    assert not check_jailbreak_heuristics(safe, 89.79, 1845.65)["jailbreak"]
+
+
+@pytest.mark.skip(reason="Run manually.")
+@pytest.mark.skipif(not torch_available, reason="Pytorch not installed.")
+def test_perplexity_throughput():
+    prompts = [safe, len_ppl, ps_ppl, "Short string"] * 8
+
+    # Warm up
+    get_perplexity("Short string")
+
+    t0 = time()
+    for prompt in prompts:
+        check_jailbreak_length_per_perplexity(prompt, 89.79)
+        check_jailbreak_prefix_suffix_perplexity(prompt, 1845.65)
+    sequential = len(prompts) / (time() - t0)
+
+    for batch_size in [1, 4, 8, 16]:
+        t0 = time()
+        for i in range(0, len(prompts), batch_size):
+            texts = []
+            for prompt in prompts[i : i + batch_size]:
+                texts.extend(get_heuristics_texts(prompt))
+            get_perplexities(texts)
+        batched = len(prompts) / (time() - t0)
+
+        print(
+            f"Batch size {batch_size}: {batched:.2f} requests/sec "
+            f"(sequential checks: {sequential:.2f} requests/sec)"
+        )
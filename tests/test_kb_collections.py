@@ -0,0 +1,166 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+from typing import List
+
+import pytest
+
+from nemoguardrails import RailsConfig
+from nemoguardrails.actions.retrieve_relevant_chunks import retrieve_relevant_chunks
+from nemoguardrails.embeddings.basic import BasicEmbeddingsIndex
+from nemoguardrails.kb import kb as kb_module
+from nemoguardrails.kb.kb import KnowledgeBase
+from nemoguardrails.rails.llm.config import Document, KnowledgeBaseConfig
+
+PRODUCT_A_DOC = """
+# Installation
+
+Product A is installed with pip.
+
+# Pricing
+
+Product A is free.
+"""
+
+PRODUCT_B_DOC = """
+```
+tier: enterprise
+```
+
+# Installation
+
+Product B is installed with the installer.
+"""
+
+GENERAL_DOC = """
+# Support
+
+Support is available by email.
+"""
+
+
+class FakeEmbeddingsIndex(BasicEmbeddingsIndex):
+    """An embeddings index with deterministic, content-based embeddings."""
+
+    async def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return [
+            [b / 255 for b in hashlib.md5(text.encode("utf-8")).digest()[:8]]
+            for text in texts
+        ]
+
+
+@pytest.fixture(autouse=True)
+def cache_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(kb_module, "CACHE_FOLDER", str(tmp_path))
+
+
+async def _build_kb():
+    kb = KnowledgeBase(
+        documents=[
+            Document(format="md", content=PRODUCT_A_DOC, collection="product_a"),
+            Document(format="md", content=PRODUCT_B_DOC, collection="product_b"),
+            GENERAL_DOC,
+        ],
+        config=KnowledgeBaseConfig(),
+        get_embedding_search_provider_instance=lambda _: FakeEmbeddingsIndex(),
+    )
+    await kb.build()
+
+    return kb
+
+
+@pytest.mark.asyncio
+async def test_collections_are_sharded():
+    kb = await _build_kb()
+
+    assert set(kb.indexes.keys()) == {"product_a", "product_b", "default"}
+    assert kb.index is kb.indexes["default"]
+
+    # Without a filter, all the collections are searched and merged by distance.
+    results = await kb.search_relevant_chunks(
+        "# Pricing\n\nProduct A is free.", max_results=4
+    )
+    assert len(results) == 4
+    assert results[0]["title"] == "Pricing"
+    assert {result["collection"] for result in results} == {
+        "product_a",
+        "product_b",
+        "default",
+    }
+
+
+@pytest.mark.asyncio
+async def test_search_with_filter():
+    kb = await _build_kb()
+
+    results = await kb.search_relevant_chunks(
+        "How do I install it?", max_results=3, filter={"collection": "product_b"}
+    )
+    assert [result["body"] for result in results] == [
+        "Product B is installed with the installer."
+    ]
+
+    results = await kb.search_relevant_chunks(
+        "How do I install it?",
+        max_results=3,
+        filter={"collection": ["product_a", "default"]},
+    )
+    assert len(results) == 3
+    assert "product_b" not in {result["collection"] for result in results}
+
+    # The other keys are matched against the metadata of the chunks.
+    results = await kb.search_relevant_chunks(
+        "How do I install it?", max_results=3, filter={"tier": "enterprise"}
+    )
+    assert [result["collection"] for result in results] == ["product_b"]
+
+    results = await kb.search_relevant_chunks(
+        "How do I install it?", filter={"collection": "unknown"}
+    )
+    assert results == []
+
+
+@pytest.mark.asyncio
+async def test_retrieve_relevant_chunks_with_kb_filter():
+    kb = await _build_kb()
+
+    result = await retrieve_relevant_chunks(
+        context={
+            "last_user_message": "How do I install it?",
+            "kb_filter": {"collection": "product_a"},
+        },
+        kb=kb,
+    )
+
+    assert sorted(result.context_updates["relevant_chunks_sep"]) == [
+        "Product A is free.",
+        "Product A is installed with pip.",
+    ]
+
+
+def test_collections_from_kb_subfolders(tmp_path):
+    config_path = tmp_path / "config"
+    (config_path / "kb" / "product_a").mkdir(parents=True)
+    (config_path / "kb" / "general.md").write_text(GENERAL_DOC)
+    (config_path / "kb" / "product_a" / "docs.md").write_text(PRODUCT_A_DOC)
+
+    config = RailsConfig.from_path(str(config_path))
+
+    collections = {doc.path: doc.collection for doc in config.docs}
+    assert collections == {
+        str(config_path / "kb" / "general.md"): None,
+        str(config_path / "kb" / "product_a" / "docs.md"): "product_a",
+    }
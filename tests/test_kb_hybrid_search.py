@@ -0,0 +1,153 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import os
+from typing import List
+
+import pytest
+
+from nemoguardrails.embeddings.basic import BasicEmbeddingsIndex
+from nemoguardrails.embeddings.index import IndexItem
+from nemoguardrails.kb import kb as kb_module
+from nemoguardrails.kb.bm25 import BM25Index, tokenize
+from nemoguardrails.kb.kb import KnowledgeBase, _reciprocal_rank_fusion
+from nemoguardrails.rails.llm.config import KnowledgeBaseConfig
+
+PRODUCTS_DOC = """
+# Overview
+
+Our routers are fast and reliable.
+
+# XR-200
+
+The XR-200 router supports up to 64 devices.
+
+# XR-300
+
+The XR-300 router supports up to 128 devices.
+
+# Errors
+
+The E_TIMEOUT error means the router did not answer in time.
+"""
+
+
+class FakeEmbeddingsIndex(BasicEmbeddingsIndex):
+    """An embeddings index with deterministic, content-based embeddings."""
+
+    async def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return [
+            [b / 255 for b in hashlib.md5(text.encode("utf-8")).digest()[:8]]
+            for text in texts
+        ]
+
+
+@pytest.fixture(autouse=True)
+def cache_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(kb_module, "CACHE_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+async def _build_kb(hybrid_search: bool = True):
+    kb = KnowledgeBase(
+        documents=[PRODUCTS_DOC],
+        config=KnowledgeBaseConfig(hybrid_search={"enabled": hybrid_search}),
+        get_embedding_search_provider_instance=lambda _: FakeEmbeddingsIndex(),
+    )
+    await kb.build()
+
+    return kb
+
+
+def test_tokenize():
+    assert tokenize("The XR-200 raised E_TIMEOUT.") == [
+        "the",
+        "xr-200",
+        "xr",
+        "200",
+        "raised",
+        "e_timeout",
+        "e",
+        "timeout",
+    ]
+
+
+def test_bm25_index(tmp_path):
+    index = BM25Index()
+    index.build(
+        [
+            "the xr-200 router",
+            "the xr-300 router",
+            "a router for the xr-200 and the xr-200 pro",
+        ]
+    )
+
+    results = index.search("XR-200", max_results=3)
+    assert sorted(doc_id for doc_id, _ in results[:2]) == [0, 2]
+    assert results[2][0] == 1
+
+    # Only the documents matching the filter are returned.
+    results = index.search("XR-200", max_results=3, filter_fn=lambda i: i != 2)
+    assert [doc_id for doc_id, _ in results] == [0, 1]
+
+    assert index.search("unknown", max_results=3) == []
+
+    path = str(tmp_path / "index.bm25.json")
+    index.save(path)
+    loaded_index = BM25Index.load(path)
+    assert loaded_index.postings == index.postings
+    assert loaded_index.search("XR-200", max_results=3) == index.search(
+        "XR-200", max_results=3
+    )
+
+    assert BM25Index.load(str(tmp_path / "missing.json")) is None
+
+
+def test_reciprocal_rank_fusion_matches_equal_items():
+    def _items(*texts):
+        return [IndexItem(text=text, meta={"collection": "default"}) for text in texts]
+
+    # The providers can return new instances for the same chunks.
+    results = _reciprocal_rank_fusion([_items("a", "b", "c"), _items("b", "c")])
+
+    assert [item.text for item in results] == ["b", "c", "a"]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_finds_exact_identifiers(cache_folder):
+    kb = await _build_kb()
+
+    # The lexical index is persisted next to the vector index.
+    assert any(name.endswith(".bm25.json") for name in os.listdir(cache_folder))
+
+    results = await kb.search_relevant_chunks("What is E_TIMEOUT?", max_results=1)
+    assert [result["title"] for result in results] == ["Errors"]
+
+    # Only the XR-200 chunk can rank above the XR-300 one, as it shares the "xr" term.
+    results = await kb.search_relevant_chunks("XR-300", max_results=2)
+    assert "XR-300" in [result["title"] for result in results]
+
+    # All the chunks can still be found through the vector search.
+    results = await kb.search_relevant_chunks("hello", max_results=4)
+    assert len(results) == 4
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_is_disabled_by_default():
+    kb = await _build_kb(hybrid_search=False)
+
+    assert kb.lexical_indexes == {}
+    assert len(await kb.search_relevant_chunks("XR-200", max_results=2)) == 2
@@ -0,0 +1,221 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import time
+from typing import List
+
+import pytest
+
+from nemoguardrails import RailsConfig
+from nemoguardrails.embeddings.basic import BasicEmbeddingsIndex
+from nemoguardrails.kb import kb as kb_module
+from nemoguardrails.kb.kb import KnowledgeBase
+from nemoguardrails.kb.store import ChunkEmbeddingsStore
+from nemoguardrails.kb.utils import (
+    iter_markdown_topic_chunks,
+    split_markdown_in_topic_chunks,
+)
+from nemoguardrails.rails.llm.config import Document, KnowledgeBaseConfig
+
+DOC_1 = """
+# Cats
+
+Cats are small, carnivorous mammals.
+
+# Dogs
+
+Dogs are domesticated descendants of the wolf.
+"""
+
+DOC_2 = """
+# Birds
+
+Birds are warm-blooded vertebrates.
+"""
+
+
+class FakeEmbeddingsIndex(BasicEmbeddingsIndex):
+    """An embeddings index which records the texts that are embedded."""
+
+    embedded_texts = []
+
+    async def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        self.embedded_texts.extend(texts)
+        return [
+            [b / 255 for b in hashlib.md5(text.encode("utf-8")).digest()[:8]]
+            for text in texts
+        ]
+
+
+@pytest.fixture
+def embedded_texts(tmp_path, monkeypatch):
+    monkeypatch.setattr(kb_module, "CACHE_FOLDER", str(tmp_path))
+    monkeypatch.setattr(FakeEmbeddingsIndex, "embedded_texts", [])
+    return FakeEmbeddingsIndex.embedded_texts
+
+
+async def _build_kb(documents):
+    kb = KnowledgeBase(
+        documents=documents,
+        config=KnowledgeBaseConfig(),
+        get_embedding_search_provider_instance=lambda _: FakeEmbeddingsIndex(),
+    )
+    await kb.build()
+    return kb
+
+
+def test_iter_markdown_topic_chunks():
+    content = DOC_1 + "\n## Puppies\n\nYoung dogs.\n"
+
+    assert list(iter_markdown_topic_chunks(content)) == split_markdown_in_topic_chunks(
+        content
+    )
+    assert [chunk["title"] for chunk in iter_markdown_topic_chunks(content)] == [
+        "Cats",
+        "Dogs",
+        "Dogs - Puppies",
+    ]
+
+
+def test_store(tmp_path):
+    store = ChunkEmbeddingsStore(str(tmp_path))
+    store.add(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+    store.add(["c"], [[5.0, 6.0]])
+
+    # The manifest and the embeddings are loaded from disk.
+    store = ChunkEmbeddingsStore(str(tmp_path))
+    assert len(store) == 3
+    assert "b" in store
+    assert list(store.get("c")) == [5.0, 6.0]
+
+    store.compact(["c", "a"], retention=0)
+    assert store.num_rows == 2
+    assert "b" not in store
+
+    store = ChunkEmbeddingsStore(str(tmp_path))
+    assert list(store.get("a")) == [1.0, 2.0]
+    assert list(store.get("c")) == [5.0, 6.0]
+
+    # Only the requested rows are read, by their position in the given chunks.
+    read = store.get_reader(["c", "a"])
+    assert read([1]).tolist() == [[1.0, 2.0]]
+    assert read([0, 1]).tolist() == [[5.0, 6.0], [1.0, 2.0]]
+
+
+def test_store_update(tmp_path, monkeypatch):
+    store = ChunkEmbeddingsStore(str(tmp_path))
+
+    saves = []
+    save_manifest = store._save_manifest
+    monkeypatch.setattr(
+        store, "_save_manifest", lambda: saves.append(1) or save_manifest()
+    )
+
+    # The manifest is saved once, after all the batches are added.
+    with store.update():
+        store.add(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+        store.add(["b", "c"], [[3.0, 4.0], [5.0, 6.0]])
+        assert saves == []
+    assert len(saves) == 1
+
+    store = ChunkEmbeddingsStore(str(tmp_path))
+    assert [list(store.get(h)) for h in "abc"] == [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]
+
+    # The batches added before an error are kept.
+    with pytest.raises(RuntimeError):
+        with store.update():
+            store.add(["d"], [[7.0, 8.0]])
+            raise RuntimeError("Embedding failed.")
+
+    assert "d" in ChunkEmbeddingsStore(str(tmp_path))
+
+
+def test_shared_store(tmp_path, monkeypatch):
+    store_1 = ChunkEmbeddingsStore(str(tmp_path))
+    store_2 = ChunkEmbeddingsStore(str(tmp_path))
+
+    # Each store appends after the rows added by the other one.
+    store_1.add(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+    store_2.add(["b", "c"], [[3.0, 4.0], [5.0, 6.0]])
+    store_1.add(["d"], [[7.0, 8.0]])
+
+    store = ChunkEmbeddingsStore(str(tmp_path))
+    assert store.num_rows == 4
+    assert [list(store.get(h)) for h in "abcd"] == [
+        [1.0, 2.0],
+        [3.0, 4.0],
+        [5.0, 6.0],
+        [7.0, 8.0],
+    ]
+
+    # The rows recently used by the other store are kept.
+    store_1.compact(["a", "d"])
+    assert store_1.num_rows == 4
+    assert list(store_2.get("c")) == [5.0, 6.0]
+
+    # An hour later, only the rows used in the meantime are kept.
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 3600)
+    store_2.touch(["c"])
+    store_1.compact(["a", "d"], retention=60)
+    assert sorted(store_1.rows) == ["a", "c", "d"]
+
+    # The other store can still read the rows it has loaded.
+    assert list(store_2.get("c")) == [5.0, 6.0]
+
+
+@pytest.mark.asyncio
+async def test_only_changed_chunks_are_embedded(embedded_texts):
+    kb = await _build_kb([DOC_1, DOC_2])
+    assert len(embedded_texts) == 3
+
+    results = await kb.search_relevant_chunks("# Birds", max_results=3)
+    assert len(results) == 3
+
+    # Building the same documents again uses the existing index.
+    embedded_texts.clear()
+    await _build_kb([DOC_1, DOC_2])
+    assert embedded_texts == []
+
+    # When a document changes, only the changed chunk is embedded.
+    kb = await _build_kb([DOC_1.replace("the wolf", "wolves"), DOC_2])
+    assert embedded_texts == ["# Dogs\n\nDogs are domesticated descendants of wolves."]
+
+    results = await kb.search_relevant_chunks("# Cats", max_results=3)
+    assert {result["title"] for result in results} == {"Cats", "Dogs", "Birds"}
+
+
+@pytest.mark.asyncio
+async def test_documents_are_read_when_building(tmp_path, embedded_texts):
+    config_path = tmp_path / "config"
+    (config_path / "kb").mkdir(parents=True)
+    (config_path / "kb" / "animals.md").write_text(DOC_1)
+
+    config = RailsConfig.from_path(str(config_path))
+    assert config.docs == [
+        Document(format="md", path=str(config_path / "kb" / "animals.md"))
+    ]
+
+    kb = await _build_kb(config.docs)
+    assert len(embedded_texts) == 2
+    assert kb.chunks == []
+
+
+def test_document_requires_content_or_path():
+    assert Document(format="md", content="").get_content() == ""
+
+    with pytest.raises(ValueError):
+        Document(format="md")
@@ -115,6 +115,35 @@ def test_llama_guard_check_input_unsafe():
     chat << "I'm sorry, I can't respond to that."
 
 
+def test_llama_guard_check_input_cached():
+    """
+    Test that the result of llama_guard_check_input is cached for identical inputs
+    """
+    config = RailsConfig.from_content(
+        colang_content=COLANG_CONFIG, yaml_content=YAML_CONFIG
+    )
+    config.rails.actions.cache.enabled = True
+    chat = TestChat(config, llm_completions=[])
+
+    llama_guard_llm = FakeLLM(
+        responses=[
+            "unsafe",  # llama_guard_check_input, only called for the first message
+        ]
+    )
+    chat.app.register_action_param("llama_guard_llm", llama_guard_llm)
+
+    chat >> "Unsafe input"
+    chat << "I'm sorry, I can't respond to that."
+    chat >> "Unsafe input"
+    chat << "I'm sorry, I can't respond to that."
+
+    action_cache = chat.app.runtime.action_dispatcher.action_cache
+    assert action_cache.get_stats()["llama_guard_check_input"] == {
+        "hits": 1,
+        "misses": 1,
+    }
+
+
 def test_llama_guard_check_input_error():
     """
     Test the chat flow when the llama_guard_check_input action raises an error
@@ -289,3 +289,106 @@ def test_stop_configuration_parameter():
     # Check if the stop tokens are correctly set in the rendered prompt
     for stop_token in expected_stop_tokens:
         assert stop_token in task_prompt.stop
+
+
+def test_task_prompt_prefix():
+    """Test the static prefix of a string prompt."""
+    config = RailsConfig.from_content(
+        yaml_content=textwrap.dedent(
+            """
+            models:
+             - type: main
+               engine: openai
+               model: gpt-3.5-turbo-instruct
+            instructions:
+            - type: general
+              content: Be helpful.
+            prompts:
+            - task: summarize_text
+              content: |-
+                  {{ general_instructions }}
+                  Text: {{ user_input }}
+                  Summarize the above text.
+            """
+        )
+    )
+
+    llm_task_manager = LLMTaskManager(config)
+
+    assert llm_task_manager.get_task_prompt_prefix("summarize_text") == (
+        "Be helpful.\nText: "
+    )
+
+
+def test_task_prompt_prefix_messages():
+    """Test the static prefix of a messages prompt."""
+    config = RailsConfig.from_content(
+        yaml_content=textwrap.dedent(
+            """
+            models:
+             - type: main
+               engine: openai
+               model: gpt-3.5-turbo
+            instructions:
+            - type: general
+              content: Be helpful.
+            prompts:
+            - task: summarize_text
+              messages:
+                - type: system
+                  content: "{{ general_instructions }}"
+                - type: system
+                  content: Summarize the text from the user.
+                - type: user
+                  content: "{{ user_input }}"
+            """
+        )
+    )
+
+    llm_task_manager = LLMTaskManager(config)
+
+    assert llm_task_manager.get_task_prompt_prefix("summarize_text") == [
+        {"type": "system", "content": "Be helpful."},
+        {"type": "system", "content": "Summarize the text from the user."},
+    ]
+
+
+def test_prompt_prefix_hook():
+    """Test that the prompt prefix hook receives the static prefix."""
+    config = RailsConfig.from_content(
+        yaml_content=textwrap.dedent(
+            """
+            models:
+             - type: main
+               engine: openai
+               model: gpt-3.5-turbo-instruct
+            prompts:
+            - task: summarize_text
+              content: |-
+                  Summarize the following text.
+                  {% if user_input %}Text: {{ user_input }}{% endif %}
+            """
+        )
+    )
+
+    calls = []
+
+    def hook(task_name, prompt, prefix):
+        calls.append((task_name, prompt, prefix))
+        return prompt[len(prefix) :]
+
+    llm_task_manager = LLMTaskManager(config)
+    llm_task_manager.register_prompt_prefix_hook(hook)
+
+    task_prompt = llm_task_manager.render_task_prompt(
+        task="summarize_text", context={"user_input": "test."}
+    )
+
+    assert task_prompt == "\nText: test."
+    assert calls == [
+        (
+            "summarize_text",
+            "Summarize the following text.\nText: test.",
+            "Summarize the following text.",
+        )
+    ]
@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+import sys
+from time import time
+
+import numpy as np
+import pytest
+
+from nemoguardrails.embeddings.basic import BasicEmbeddingsIndex
+from nemoguardrails.embeddings.index import IndexItem
+
+NUM_ITEMS = 20000
+NUM_QUERIES = 200
+EMBEDDING_SIZE = 768
+K = 10
+
+
+def _get_dataset():
+    """Generates clustered embeddings, with the variance decreasing over the dimensions.
+
+    This is similar to the embeddings of the Matryoshka models, which concentrate most
+    of the information in the first dimensions.
+    """
+    rng = np.random.default_rng(0)
+    scale = np.linspace(1.0, 0.1, EMBEDDING_SIZE, dtype=np.float32)
+
+    centers = rng.normal(size=(NUM_ITEMS // 20, EMBEDDING_SIZE)).astype(np.float32)
+    embeddings = centers[rng.integers(len(centers), size=NUM_ITEMS)]
+    embeddings += 0.5 * rng.normal(size=embeddings.shape).astype(np.float32)
+    embeddings *= scale
+
+    queries = embeddings[rng.integers(NUM_ITEMS, size=NUM_QUERIES)]
+    queries = queries + 0.2 * rng.normal(size=queries.shape).astype(np.float32) * scale
+
+    return embeddings, queries
+
+
+def _get_exact_results(embeddings, queries):
+    normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    similarities = queries @ normalized.T
+    return [set(np.argsort(-row)[:K]) for row in similarities]
+
+
+def _python_lists_size(embeddings) -> int:
+    """The size of the embeddings as lists of Python floats, as they used to be stored."""
+    row = embeddings[0].tolist()
+    return len(embeddings) * (
+        sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    )
+
+
+@pytest.mark.skip(reason="Run manually.")
+def test_recall_vs_memory(tmp_path):
+    embeddings, queries = _get_dataset()
+    exact_results = _get_exact_results(embeddings, queries)
+    items = [IndexItem(text=str(i)) for i in range(NUM_ITEMS)]
+
+    print(f"\n{NUM_ITEMS} embeddings of size {EMBEDDING_SIZE}, recall@{K}:")
+    print(f"  python lists (before): {_python_lists_size(embeddings) / 2**20:.0f}MB")
+
+    for quantization in [None, "float16", "int8"]:
+        for embedding_dimensions in [None, 256, 128]:
+            index = BasicEmbeddingsIndex(
+                quantization=quantization, embedding_dimensions=embedding_dimensions
+            )
+
+            t0 = time()
+            asyncio.run(index.add_items(items, embeddings))
+            asyncio.run(index.build())
+            build_time = time() - t0
+
+            ann_file = str(tmp_path / "index.ann")
+            index.embeddings_index.save(ann_file)
+            ann_size = os.path.getsize(ann_file)
+
+            t0 = time()
+            recall = 0
+            for query, exact in zip(queries, exact_results):
+                results = index._search_ids(query, K)[0]
+                recall += len(exact.intersection(results)) / K
+            search_time = (time() - t0) / NUM_QUERIES
+
+            print(
+                f"  {quantization or 'float32'}, {embedding_dimensions or 'all'} dims: "
+                f"recall {recall / NUM_QUERIES:.3f}, "
+                f"embeddings {index._embeddings.nbytes / 2**20:.0f}MB, "
+                f"annoy {ann_size / 2**20:.0f}MB, "
+                f"build {build_time:.1f}s, search {search_time * 1000:.2f}ms"
+            )
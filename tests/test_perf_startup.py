@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+import statistics
+from time import time
+
+import pytest
+
+COLANG_CONTENT = """
+import core
+import llm
+import guardrails
+import avatars
+import timing
+import utils
+
+flow main
+  user said "hi"
+  bot say "Hello!"
+"""
+
+
+def _time_to_first_process_events(start_time: float) -> dict:
+    """Measures the startup of a worker, until the first events are processed."""
+    import asyncio
+
+    started_at = time()
+
+    from nemoguardrails import LLMRails, RailsConfig
+    from tests.utils import FakeLLM
+
+    imported_at = time()
+
+    config = RailsConfig.from_content(
+        colang_content=COLANG_CONTENT,
+        yaml_content="""
+            colang_version: "2.x"
+            models: []
+        """,
+    )
+    rails = LLMRails(config, llm=FakeLLM(responses=[]))
+
+    initialized_at = time()
+
+    output_events, _ = asyncio.run(
+        rails.runtime.process_events(
+            events=[{"type": "UtteranceUserActionFinished", "final_transcript": "hi"}],
+            state={},
+            blocking=True,
+        )
+    )
+    assert output_events[0]["script"] == "Hello!"
+
+    finished_at = time()
+
+    return {
+        "spawn": started_at - start_time,
+        "import": imported_at - started_at,
+        "init": initialized_at - imported_at,
+        "process_events": finished_at - initialized_at,
+        "total": finished_at - start_time,
+    }
+
+
+@pytest.mark.skip(reason="Run manually.")
+@pytest.mark.parametrize("workers", [1, 4])
+def test_startup_time(workers):
+    # We use fresh processes, like the server workers, so nothing is cached in memory.
+    ctx = multiprocessing.get_context("spawn")
+
+    for run in ["cold", "warm"]:
+        with ctx.Pool(workers) as pool:
+            results = pool.map(_time_to_first_process_events, [time()] * workers)
+
+        print(f"\n{run} start with {workers} workers:")
+        for key in results[0]:
+            values = [result[key] for result in results]
+            print(
+                f"  {key}: mean {statistics.mean(values):.3f}s, max {max(values):.3f}s"
+            )
@@ -0,0 +1,199 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from nemoguardrails import LLMRails, RailsConfig
+from nemoguardrails.actions import action
+from nemoguardrails.actions.llm.speculation import SpeculativeTasks
+from nemoguardrails.context import llm_stats_var
+from nemoguardrails.rails.llm.config import Document
+from tests.utils import FakeLLM
+
+COLANG_CONFIG = """
+define user express greeting
+  "hello"
+
+define user ask question
+  "what is this?"
+
+define bot express greeting
+  "Hello there!"
+
+define bot answer question
+  "This is a test."
+
+define flow
+  user express greeting
+  $result = execute lookup
+  bot express greeting
+
+define flow
+  user ask question
+  $result = execute lookup(text=$user_message)
+  bot answer question
+
+define subflow check input
+  $allowed = execute check_message(text=$user_message)
+  if not $allowed
+    stop
+"""
+
+
+def _get_rails(llm_completions, prefetch):
+    config = RailsConfig.from_content(
+        colang_content=COLANG_CONFIG,
+        yaml_content="""
+            models: []
+            rails:
+              input:
+                flows:
+                  - check input
+        """,
+    )
+    rails = LLMRails(config, llm=FakeLLM(responses=llm_completions))
+
+    events = []
+
+    @action()
+    async def check_message(text: str):
+        await asyncio.sleep(0.05)
+        events.append("check finished")
+        return text != "blocked"
+
+    @action(prefetch=prefetch)
+    async def lookup(context: dict, text: str = ""):
+        events.append("lookup started")
+        await asyncio.sleep(0.05)
+        return context.get("last_user_message")
+
+    rails.register_action(check_message)
+    rails.register_action(lookup)
+
+    return rails, events
+
+
+@pytest.mark.asyncio
+async def test_prefetched_action_is_used():
+    rails, events = _get_rails(
+        ["  express greeting"], prefetch=["context.last_user_message"]
+    )
+
+    response = await rails.generate_async(messages=[{"role": "user", "content": "hi"}])
+
+    assert response["content"] == "Hello there!"
+
+    # The action is started when the user message is known, and executed only once.
+    assert events == ["check finished", "lookup started"]
+
+    # The `retrieve_relevant_chunks` action is also prefetched.
+    stats = llm_stats_var.get().get_stats()
+    assert stats["prefetched_tasks"] == 2
+    assert "prefetched_tasks_discarded" not in stats
+
+
+@pytest.mark.asyncio
+async def test_prefetched_action_with_different_params():
+    rails, events = _get_rails(["  ask question"], prefetch=True)
+
+    response = await rails.generate_async(
+        messages=[{"role": "user", "content": "what?"}]
+    )
+
+    assert response["content"] == "This is a test."
+
+    # The `text` parameter is not known when prefetching, so the action is executed again.
+    assert events == ["check finished", "lookup started", "lookup started"]
+
+    stats = llm_stats_var.get().get_stats()
+    assert stats["prefetched_tasks"] == 2
+    assert stats["prefetched_tasks_discarded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_prefetch_when_blocked():
+    rails, events = _get_rails([], prefetch=True)
+
+    # When the input rails block the message, the user message is not generated.
+    await rails.generate_async(messages=[{"role": "user", "content": "blocked"}])
+
+    assert events == ["check finished"]
+
+    stats = llm_stats_var.get().get_stats()
+    assert "prefetched_tasks" not in stats
+
+
+@pytest.mark.asyncio
+async def test_retrieval_is_prefetched():
+    config = RailsConfig.from_content(
+        colang_content="""
+            define user express greeting
+              "hello"
+
+            define flow
+              user express greeting
+              bot express greeting
+        """,
+        yaml_content="""
+            models: []
+        """,
+    )
+    config.docs = [Document(format="md", content="# Greetings\n\nSay hello to users.")]
+    llm = FakeLLM(responses=["  express greeting", "  Hi!"])
+    rails = LLMRails(config, llm=llm)
+
+    response = await rails.generate_async(messages=[{"role": "user", "content": "hi"}])
+
+    assert response["content"] == "Hi!"
+
+    stats = llm_stats_var.get().get_stats()
+    assert stats["prefetched_tasks"] == 1
+    assert "prefetched_tasks_discarded" not in stats
+
+
+@pytest.mark.asyncio
+async def test_no_prefetch_for_input_rails_checks(monkeypatch):
+    rails, events = _get_rails([], prefetch=True)
+
+    started = []
+    start = SpeculativeTasks.start
+
+    def _start(self, name, *args, **kwargs):
+        started.append(name)
+        return start(self, name, *args, **kwargs)
+
+    monkeypatch.setattr(SpeculativeTasks, "start", _start)
+
+    result = await rails.check_input_async("hi")
+
+    assert result.passed
+    assert started == []
+
+
+@pytest.mark.asyncio
+async def test_no_prefetch_for_unused_actions():
+    rails, events = _get_rails(["  express greeting"], prefetch=True)
+
+    @action(prefetch=True)
+    async def unused_action():
+        events.append("unused action started")
+
+    rails.register_action(unused_action)
+
+    await rails.generate_async(messages=[{"role": "user", "content": "hi"}])
+
+    assert "unused action started" not in events
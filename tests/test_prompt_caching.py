@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+import pytest
+
+from nemoguardrails import LLMRails, RailsConfig
+from nemoguardrails.actions.llm.utils import llm_call
+from nemoguardrails.context import llm_response_cache_var
+from nemoguardrails.llm.params import llm_params
+from nemoguardrails.llm.prompt_cache import LLMResponseCache
+from tests.utils import FakeLLM
+
+
+class FakeLLMWithTemperature(FakeLLM):
+    temperature: float = 0.7
+
+
+@pytest.mark.asyncio
+async def test_llm_call_cache():
+    llm = FakeLLMWithTemperature(responses=["a", "b", "c", "d"])
+    llm_response_cache_var.set(LLMResponseCache())
+
+    with llm_params(llm, temperature=0.0):
+        assert await llm_call(llm, "prompt") == "a"
+        assert await llm_call(llm, "prompt") == "a"
+        assert await llm_call(llm, "prompt", stop=["\n"]) == "b"
+
+    # Non-deterministic calls are not cached.
+    assert await llm_call(llm, "prompt") == "c"
+    assert await llm_call(llm, "prompt") == "d"
+
+    cache = llm_response_cache_var.get()
+    assert (cache.hits, cache.misses) == (1, 2)
+    llm_response_cache_var.set(None)
+
+
+def test_llm_response_cache_bounds():
+    cache = LLMResponseCache(max_size=2, ttl=0.05)
+
+    for key in ["a", "b", "c"]:
+        cache.set(key, key.upper())
+
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    assert cache.get("c") == "C"
+
+    time.sleep(0.1)
+    assert cache.get("c") is None
+
+
+def test_llm_response_cache_key():
+    llm_1 = FakeLLMWithTemperature(responses=[])
+    llm_2 = FakeLLM(responses=[])
+
+    key = LLMResponseCache.get_key(llm_1, "prompt")
+    assert key == LLMResponseCache.get_key(llm_1, "prompt")
+    assert key != LLMResponseCache.get_key(llm_1, "prompt", stop=["\n"])
+    assert key != LLMResponseCache.get_key(llm_1, [{"type": "user", "content": "x"}])
+    assert key != LLMResponseCache.get_key(llm_2, "prompt")
+
+
+@pytest.mark.asyncio
+async def test_user_intent_is_cached():
+    config = RailsConfig.from_content(
+        colang_content="""
+            define user express greeting
+              "hello"
+
+            define bot express greeting
+              "Hello there!"
+
+            define flow
+              user express greeting
+              bot express greeting
+        """,
+        yaml_content="""
+            models: []
+            prompt_caching:
+              enabled: True
+        """,
+    )
+    llm = FakeLLMWithTemperature(responses=["  express greeting"])
+    rails = LLMRails(config, llm=llm)
+
+    for _ in range(2):
+        response = await rails.generate_async(
+            messages=[{"role": "user", "content": "hi"}]
+        )
+        assert response["content"] == "Hello there!"
+
+    assert rails.llm_response_cache.hits == 1
@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from nemoguardrails import LLMRails, RailsConfig
+from nemoguardrails.context import generation_options_var, streaming_handler_var
+from nemoguardrails.server import api
+
+CONFIGS_FOLDER = os.path.join(os.path.dirname(__file__), "test_configs")
+
+
+@pytest.fixture
+def rails():
+    config = RailsConfig.from_path(os.path.join(CONFIGS_FOLDER, "rails_checks"))
+    return LLMRails(config)
+
+
+@pytest.mark.asyncio
+async def test_check_input_passed(rails):
+    res = await rails.check_input_async("Hi, I am John.")
+
+    assert res.passed
+    # The input rails can alter the text.
+    assert res.text == "Hi, I am <PERSON>."
+    assert [(rail.name, rail.status) for rail in res.rails] == [
+        ("block bad words", "passed"),
+        ("mask names", "passed"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_check_input_blocked(rails):
+    res = await rails.check_input_async("Say something bad.")
+
+    assert not res.passed
+    assert res.text is None
+    assert res.response == "I'm sorry, I can't respond to that."
+    assert [(rail.name, rail.status) for rail in res.rails] == [
+        ("block bad words", "blocked"),
+        ("mask names", "skipped"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_check_output(rails):
+    res = await rails.check_output_async(
+        "Hello there!", context={"user_message": "Hi!"}
+    )
+    assert res.passed
+    assert res.text == "Hello there!"
+
+    res = await rails.check_output_async("Something bad.")
+    assert not res.passed
+    assert res.response == "I'm sorry, I can't respond to that."
+    assert [(rail.name, rail.status) for rail in res.rails] == [
+        ("block bad words in output", "blocked"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_checks_do_not_leak_options(rails):
+    generation_options_token = generation_options_var.set(None)
+    streaming_handler_token = streaming_handler_var.set("handler")
+
+    await rails.check_input_async("Hi, I am John.")
+    await rails.check_output_async("Hello there!")
+
+    # The options used for the checks are not visible to the subsequent calls.
+    assert generation_options_var.get() is None
+    assert streaming_handler_var.get() == "handler"
+
+    streaming_handler_var.reset(streaming_handler_token)
+    generation_options_var.reset(generation_options_token)
+
+
+@pytest.fixture
+def set_rails_config_path():
+    rails_config_path = api.app.rails_config_path
+    api.app.rails_config_path = CONFIGS_FOLDER
+    yield
+    api.app.rails_config_path = rails_config_path
+
+
+def test_checks_endpoint(set_rails_config_path):
+    client = TestClient(api.app)
+
+    response = client.post(
+        "/v1/guardrail/checks",
+        json={
+            "config_id": "rails_checks",
+            "input": "Hi, I am John.",
+            "output": "Something bad.",
+        },
+    )
+    assert response.status_code == 200
+
+    result = response.json()
+    assert result["input"]["passed"] is True
+    assert result["input"]["text"] == "Hi, I am <PERSON>."
+    assert result["output"]["passed"] is False
+    assert result["output"]["rails"] == [
+        {"name": "block bad words in output", "status": "blocked"}
+    ]
+
+    response = client.post("/v1/guardrail/checks", json={"config_id": "rails_checks"})
+    assert response.status_code == 422
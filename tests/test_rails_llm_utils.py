@@ -13,7 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from nemoguardrails.rails.llm.utils import get_history_cache_key
+from nemoguardrails.rails.llm.utils import (
+    get_history_cache_key,
+    get_history_cache_keys,
+)
 
 
 def test_basic():
@@ -55,3 +58,39 @@ def test_with_context():
         )
         == '{"user_name": "John"}:hi:Hello!:How are you?'
     )
+
+
+def test_history_cache_keys():
+    messages = [
+        {"role": "context", "content": {"user_name": "John"}},
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "Hello!"},
+        {"role": "user", "content": "How are you?"},
+    ]
+
+    keys = get_history_cache_keys(messages)
+
+    assert len(keys) == len(messages) + 1
+    assert keys[0] == ""
+    assert len(set(keys)) == len(keys)
+
+    # The key for a prefix does not depend on the rest of the messages.
+    for i in range(len(messages) + 1):
+        assert get_history_cache_keys(messages[0:i])[-1] == keys[i]
+
+
+def test_history_cache_keys_boundaries():
+    assert (
+        get_history_cache_keys(
+            [
+                {"role": "user", "content": "a:b"},
+                {"role": "assistant", "content": "c"},
+            ]
+        )[-1]
+        != get_history_cache_keys(
+            [
+                {"role": "user", "content": "a"},
+                {"role": "assistant", "content": "b:c"},
+            ]
+        )[-1]
+    )
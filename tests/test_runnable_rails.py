@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 from typing import List, Optional
 
 import pytest
@@ -512,6 +513,77 @@ def test_mocked_rag_with_fact_checking():
     assert result == "I'm sorry, I can't respond to that."
 
 
+@pytest.mark.asyncio
+async def test_string_in_string_out_async():
+    llm = FakeLLM(responses=["Paris."])
+    config = RailsConfig.from_content(config={"models": []})
+    model_with_rails = RunnableRails(config, llm=llm)
+
+    prompt = PromptTemplate.from_template("The capital of France is ")
+    chain = prompt | model_with_rails
+
+    result = await chain.ainvoke(input={})
+
+    assert result == "Paris."
+
+
+def test_batch():
+    llm = FakeLLM(responses=["Paris.", "Paris."])
+    config = RailsConfig.from_content(config={"models": []})
+    model_with_rails = RunnableRails(config, llm=llm)
+
+    prompt = PromptTemplate.from_template("The capital of {country} is ")
+    chain = prompt | model_with_rails
+
+    result = chain.batch([{"country": "France"}, {"country": "France"}])
+
+    assert result == ["Paris.", "Paris."]
+
+
+@pytest.mark.asyncio
+async def test_abatch_concurrency():
+    config = RailsConfig.from_content(config={"models": []})
+    model_with_rails = RunnableRails(config, llm=FakeLLM(responses=[]))
+
+    running = 0
+    max_running = 0
+
+    async def passthrough_fn(context: dict, events: List[dict]):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+
+        return "Paris.", "Paris."
+
+    model_with_rails.rails.llm_generation_actions.passthrough_fn = passthrough_fn
+
+    result = await model_with_rails.abatch(
+        [{"input": "The capital of France is "}] * 6,
+        config={"max_concurrency": 2},
+    )
+
+    assert result == [{"output": "Paris."}] * 6
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_astream():
+    llm = FakeLLM(responses=["The capital of France is Paris."], streaming=True)
+    config = RailsConfig.from_content(config={"models": [], "streaming": True})
+    model_with_rails = RunnableRails(config, llm=llm)
+
+    prompt = ChatPromptTemplate.from_messages([("human", "What is the capital?")])
+    chain = prompt | model_with_rails
+
+    chunks = []
+    async for chunk in chain.astream(input={}):
+        chunks.append(chunk.content)
+
+    assert chunks == ["The ", "capital ", "of ", "France ", "is ", "Paris."]
+
+
 @pytest.mark.skip(reason="Only for manual tests.")
 def test_live_rag():
     import bs4
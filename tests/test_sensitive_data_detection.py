@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+
 import pytest
 
 from nemoguardrails import RailsConfig
@@ -196,3 +198,94 @@ def test_masking_retrieval():
 
     chat >> "Hi!"
     chat << "Hello there!"
+
+
+@pytest.mark.asyncio
+async def test_batched_analysis_shared_between_calls(monkeypatch):
+    from nemoguardrails.library.sensitive_data_detection import actions
+
+    class FakeNlpEngine:
+        batches = []
+
+        def process_batch(self, texts, language):
+            self.batches.append(list(texts))
+            for text in texts:
+                yield text, {"text": text}
+
+    class FakeAnalyzer:
+        nlp_engine = FakeNlpEngine()
+
+        def analyze(self, text, language, entities, ad_hoc_recognizers, nlp_artifacts):
+            assert nlp_artifacts == {"text": text}
+            return ["PERSON"] if "John" in text else []
+
+    analyzer = FakeAnalyzer()
+    monkeypatch.setattr(actions, "_get_analyzer", lambda: analyzer)
+    monkeypatch.setattr(actions, "_analysis_cache", actions.OrderedDict())
+
+    config = RailsConfig.from_content(
+        yaml_content="""
+            models: []
+            rails:
+              config:
+                sensitive_data_detection:
+                  input:
+                    entities:
+                      - PERSON
+        """
+    )
+
+    results = await asyncio.gather(
+        actions.detect_sensitive_data("input", "Hi! I am John!", config),
+        actions.detect_sensitive_data("input", "Hi there!", config),
+    )
+    assert results == [True, False]
+
+    # The concurrent texts are processed as a single batch.
+    assert FakeNlpEngine.batches == [["Hi! I am John!", "Hi there!"]]
+
+    # And a second check on the same text reuses the analysis.
+    assert await actions.detect_sensitive_data("input", "Hi! I am John!", config)
+    assert len(FakeNlpEngine.batches) == 1
+
+
+def test_batchers_are_bound_to_their_loop(monkeypatch):
+    from nemoguardrails.library.sensitive_data_detection import actions
+
+    class FakeNlpEngine:
+        def process_batch(self, texts, language):
+            for text in texts:
+                yield text, {}
+
+    class FakeAnalyzer:
+        nlp_engine = FakeNlpEngine()
+
+        def analyze(self, text, language, entities, ad_hoc_recognizers, nlp_artifacts):
+            return ["PERSON"] if "John" in text else []
+
+    monkeypatch.setattr(actions, "_get_analyzer", lambda: FakeAnalyzer())
+    monkeypatch.setattr(actions, "_analysis_cache", actions.OrderedDict())
+
+    config = RailsConfig.from_content(
+        yaml_content="""
+            models: []
+            rails:
+              config:
+                sensitive_data_detection:
+                  input:
+                    entities:
+                      - PERSON
+        """
+    )
+
+    async def _detect(text):
+        batcher = actions._get_batcher()
+        assert batcher is actions._get_batcher()
+        return batcher, await actions.detect_sensitive_data("input", text, config)
+
+    # Like the sync `generate`, every call runs in a new event loop.
+    batcher_1, result_1 = asyncio.run(_detect("I am John"))
+    batcher_2, result_2 = asyncio.run(_detect("I am Jane"))
+
+    assert (result_1, result_2) == (True, False)
+    assert batcher_1 is not batcher_2
@@ -0,0 +1,199 @@
+# SPDX-FileCopyrightText: Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from nemoguardrails import LLMRails, RailsConfig
+from nemoguardrails.actions import action
+from nemoguardrails.context import llm_stats_var
+from nemoguardrails.rails.llm.config import Document
+from tests.utils import FakeLLM
+
+COLANG_CONFIG = """
+define user express greeting
+  "hello"
+
+define bot express greeting
+  "Hello there!"
+
+define bot refuse to respond
+  "I'm sorry, I can't respond to that."
+
+define flow
+  user express greeting
+  bot express greeting
+
+define subflow check input
+  $allowed = execute check_message(text=$user_message)
+  if not $allowed
+    bot refuse to respond
+    stop
+
+define subflow rewrite input
+  $user_message = execute rewrite_message(text=$user_message)
+"""
+
+
+def _get_rails(input_flows, llm_completions):
+    config = RailsConfig.from_content(
+        colang_content=COLANG_CONFIG,
+        yaml_content=f"""
+            models: []
+            rails:
+              input:
+                flows: {input_flows}
+                speculative_dialog: True
+        """,
+    )
+    llm = FakeLLM(responses=llm_completions)
+    rails = LLMRails(config, llm=llm)
+
+    events = []
+
+    @action()
+    async def check_message(text: str):
+        events.append("check started")
+        await asyncio.sleep(0.05)
+        events.append("check finished")
+        return text != "blocked"
+
+    @action()
+    async def rewrite_message(text: str):
+        await asyncio.sleep(0.05)
+        return text.upper()
+
+    rails.register_action(check_message)
+    rails.register_action(rewrite_message)
+
+    return rails, llm, events
+
+
+@pytest.mark.asyncio
+async def test_speculative_user_intent_is_used():
+    rails, llm, events = _get_rails(["check input"], ["  express greeting"])
+
+    original_acall = llm._acall
+
+    async def _acall(*args, **kwargs):
+        events.append("llm call")
+        return await original_acall(*args, **kwargs)
+
+    object.__setattr__(llm, "_acall", _acall)
+
+    response = await rails.generate_async(messages=[{"role": "user", "content": "hi"}])
+
+    assert response["content"] == "Hello there!"
+    assert llm.i == 1
+
+    # The user intent was generated while the input rail was running.
+    assert events == ["check started", "llm call", "check finished"]
+
+    stats = llm_stats_var.get().get_stats()
+    assert stats["speculative_tasks"] == 1
+    assert "speculative_tasks_discarded" not in stats
+
+
+@pytest.mark.asyncio
+async def test_speculative_user_intent_is_discarded_when_blocked():
+    rails, llm, _ = _get_rails(["check input"], ["  express greeting"])
+
+    response = await rails.generate_async(
+        messages=[{"role": "user", "content": "blocked"}]
+    )
+
+    assert response["content"] == "I'm sorry, I can't respond to that."
+
+    stats = llm_stats_var.get().get_stats()
+    assert stats["speculative_tasks"] == 1
+    assert stats["speculative_tasks_discarded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_speculative_user_intent_is_discarded_when_rewritten():
+    rails, llm, _ = _get_rails(
+        ["rewrite input"], ["  express greeting", "  express greeting"]
+    )
+
+    response = await rails.generate_async(messages=[{"role": "user", "content": "hi"}])
+
+    assert response["content"] == "Hello there!"
+
+    # The user intent was generated again, for the rewritten message.
+    assert llm.i == 2
+
+    stats = llm_stats_var.get().get_stats()
+    assert stats["speculative_tasks_discarded"] == 1
+    assert stats["speculative_llm_calls_discarded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_speculative_user_intent_in_generation_log():
+    rails, llm, _ = _get_rails(["check input"], ["  express greeting"])
+
+    response = await rails.generate_async(
+        messages=[{"role": "user", "content": "hi"}],
+        options={"log": {"activated_rails": True}},
+    )
+
+    assert response.response[0]["content"] == "Hello there!"
+
+    # The speculative LLM call is attributed to the `generate_user_intent` action.
+    actions = [
+        action
+        for rail in response.log.activated_rails
+        for action in rail.executed_actions
+    ]
+    generate_user_intent = [
+        action for action in actions if action.action_name == "generate_user_intent"
+    ][0]
+    assert len(generate_user_intent.llm_calls) == 1
+    assert response.log.stats.llm_calls_count == 1
+
+
+@pytest.mark.asyncio
+async def test_speculative_retrieval():
+    config = RailsConfig.from_content(
+        colang_content=COLANG_CONFIG,
+        yaml_content="""
+            models: []
+            rails:
+              input:
+                flows:
+                  - check input
+                speculative_dialog: True
+        """,
+    )
+    config.docs = [Document(format="md", content="# Greetings\n\nSay hello to users.")]
+    rails = LLMRails(config, llm=FakeLLM(responses=["  express greeting"]))
+
+    @action()
+    async def check_message(text: str):
+        await asyncio.sleep(0.05)
+        return True
+
+    rails.register_action(check_message)
+
+    response = await rails.generate_async(messages=[{"role": "user", "content": "hi"}])
+
+    assert response["content"] == "Hello there!"
+
+    # The retrieval is prefetched, and only the user intent is speculative.
+    stats = llm_stats_var.get().get_stats()
+    assert stats["speculative_tasks"] == 1
+    assert stats["prefetched_tasks"] == 1
+    assert "speculative_tasks_discarded" not in stats
+    assert "prefetched_tasks_discarded" not in stats
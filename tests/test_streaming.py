@@ -249,3 +249,98 @@ async def test_streaming_single_llm_call_with_next_step_override_and_dynamic_mes
 
     # Wait for proper cleanup, otherwise we get a Runtime Error
     await asyncio.sleep(1)
+
+
+@pytest.fixture
+def output_rails_streaming_config():
+    return RailsConfig.from_content(
+        config={
+            "models": [],
+            "streaming": True,
+            "rails": {
+                "output": {
+                    "flows": ["check output"],
+                    "streaming": {"enabled": True, "chunk_size": 2},
+                }
+            },
+        },
+        colang_content="""
+        define user express greeting
+          "hi"
+
+        define flow
+          user express greeting
+          bot express greeting
+
+        define bot refuse to respond
+          "I'm sorry, I can't respond to that."
+
+        define flow check output
+          $allowed = execute check_chunk
+          if not $allowed
+            bot refuse to respond
+            stop
+        """,
+    )
+
+
+@pytest.mark.asyncio
+async def test_streaming_output_rails(output_rails_streaming_config):
+    """The output rails are applied on chunks, while the message is streamed."""
+    chat = TestChat(
+        output_rails_streaming_config,
+        llm_completions=[
+            "express greeting",
+            '  "Hello there! How are you today?"',
+        ],
+        streaming=True,
+    )
+
+    checked = []
+
+    def check_chunk(context: dict):
+        checked.append(context["bot_message"])
+        return True
+
+    chat.app.register_action(check_chunk)
+
+    chunks = []
+    async for chunk in chat.app.stream_async(
+        messages=[{"role": "user", "content": "Hi!"}],
+    ):
+        chunks.append(chunk)
+
+    assert chunks == ["Hello there! ", "How are ", "you today?"]
+
+    # The output rails are not applied again on the full message.
+    assert checked == ["Hello there! ", "How are ", "you today?"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_output_rails_blocked(output_rails_streaming_config):
+    """When a chunk is blocked, the rest of the message is not streamed."""
+    chat = TestChat(
+        output_rails_streaming_config,
+        llm_completions=[
+            "express greeting",
+            '  "Hello there! This is bad and should not be streamed."',
+        ],
+        streaming=True,
+    )
+
+    def check_chunk(context: dict):
+        return "bad" not in context["bot_message"]
+
+    chat.app.register_action(check_chunk)
+
+    chunks = []
+    async for chunk in chat.app.stream_async(
+        messages=[{"role": "user", "content": "Hi!"}],
+    ):
+        chunks.append(chunk)
+
+    assert chunks == [
+        "Hello there! ",
+        "This is ",
+        "I'm sorry, I can't respond to that.",
+    ]
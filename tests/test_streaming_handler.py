@@ -244,3 +244,62 @@ async def test_suffix_with_stop_and_pipe_4():
         ],
         final_chunks=["This is a message", "."],
     )
+
+
+@pytest.mark.asyncio
+async def test_stop_across_chunks_in_long_completion():
+    chunks = [f"token{i} " for i in range(1000)] + ["Us", "er", ":", " more"]
+    await _test_pattern_case(
+        stop=["User:"],
+        chunks=chunks,
+        final_chunks=chunks[0:1000],
+    )
+
+
+@pytest.mark.asyncio
+async def test_top_k_nonempty_lines():
+    streaming_handler = StreamingHandler()
+    await streaming_handler.enable_buffering()
+
+    task = asyncio.create_task(streaming_handler.wait_top_k_nonempty_lines(k=2))
+    await asyncio.sleep(0)
+
+    for chunk in ["# comment\n", "\n", "line ", "1\nli", "ne 2", "\n  "]:
+        await streaming_handler.push_chunk(chunk)
+        assert not task.done()
+
+    await streaming_handler.push_chunk("\nline 3")
+    top_k_lines = await asyncio.wait_for(task, timeout=1)
+
+    assert top_k_lines == "line 1\nline 2"
+    assert streaming_handler.buffer == "  \nline 3"
+
+
+@pytest.mark.skip(reason="Run manually.")
+@pytest.mark.asyncio
+async def test_streaming_handler_performance():
+    """Micro-benchmark for streams of 4k tokens with a suffix and stop chunks."""
+    from time import time
+
+    num_tokens = 4000
+    num_runs = 20
+
+    t0 = time()
+    for _ in range(num_runs):
+        streaming_handler = StreamingHandler()
+        streaming_handler.set_pattern(prefix='  "', suffix='"')
+        streaming_handler.stop = ["\nUser:", "\nuser intent:", "\nbot intent:"]
+
+        await streaming_handler.push_chunk('  "')
+        for i in range(num_tokens):
+            await streaming_handler.push_chunk(f"word{i % 100} ")
+        await streaming_handler.push_chunk('"')
+        await streaming_handler.push_chunk("")
+
+        assert len(streaming_handler.completion) > num_tokens
+
+    took = time() - t0
+    print(
+        f"Processed {num_runs * num_tokens} tokens in {took:.2f} seconds "
+        f"({1e6 * took / (num_runs * num_tokens):.2f} us/token)."
+    )
@@ -13,7 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from nemoguardrails.llm.providers import get_llm_provider_names
+import threading
+import time
+
+import pytest
+
+from nemoguardrails.llm.providers import get_llm_provider_names, providers
 
 
 def test_get_llm_provider_names():
@@ -55,3 +60,55 @@ def test_get_llm_provider_names():
 
     for provider_name in supported_providers:
         assert provider_name in provider_names
+
+
+def test_lazy_provider_concurrent_import(monkeypatch):
+    imports = []
+
+    def import_provider():
+        imports.append(1)
+        # Give the other threads the time to request the provider.
+        time.sleep(0.05)
+        return object
+
+    monkeypatch.setattr(providers, "_providers", dict(providers._providers))
+    monkeypatch.setitem(providers._lazy_providers, "test_lazy", import_provider)
+
+    results = []
+    errors = []
+
+    def get_provider():
+        try:
+            results.append(providers._get_provider_cls("test_lazy"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=get_provider) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert results == [object] * 8
+    assert len(imports) == 1
+
+
+def test_lazy_provider_failed_import(monkeypatch):
+    attempts = []
+
+    def import_provider():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ImportError("Transient error.")
+        return object
+
+    monkeypatch.setattr(providers, "_providers", dict(providers._providers))
+    monkeypatch.setitem(providers._lazy_providers, "test_lazy", import_provider)
+
+    with pytest.raises(ImportError):
+        providers._get_provider_cls("test_lazy")
+
+    # The provider is still available and the import can be retried.
+    assert "test_lazy" in get_llm_provider_names()
+    assert providers._get_provider_cls("test_lazy") is object
@@ -12,6 +12,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+from time import time
+
 import pytest
 
 from nemoguardrails import LLMRails, RailsConfig
@@ -127,3 +130,53 @@ def test_actions_1():
             "role": "assistant",
         }
     ]
+
+
+@pytest.mark.asyncio
+async def test_process_events_concurrent_conversations():
+    """Independent conversations should not wait for each other."""
+    rails = LLMRails(
+        config=RailsConfig.from_content(
+            """
+            import core
+
+            flow main
+              user said "hi"
+              $result = await SlowAction()
+              bot say $result
+            """,
+            """
+            colang_version: "2.x"
+            """,
+        )
+    )
+
+    async def slow_action():
+        await asyncio.sleep(0.5)
+        return "Done!"
+
+    rails.register_action(slow_action, "SlowAction")
+
+    # We start a few conversations.
+    states = []
+    for _ in range(5):
+        _, state = await rails.process_events_async([], state=None)
+        states.append(state)
+
+    t0 = time()
+    results = await asyncio.gather(
+        *[
+            rails.process_events_async(
+                [{"type": "UtteranceUserActionFinished", "final_transcript": "hi"}],
+                state=state,
+                blocking=True,
+            )
+            for state in states
+        ]
+    )
+
+    # Sequential processing would take at least 2.5 seconds.
+    assert time() - t0 < 1.5
+
+    for output_events, _ in results:
+        assert output_events[0]["script"] == "Done!"